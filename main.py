@@ -2,16 +2,79 @@ import streamlit as st
 import yaml
 from yaml.loader import SafeLoader
 import streamlit_authenticator as stauth
-from pathlib import Path
-import sys
-import pandas as pd
+import time
 
 
 # Import modules
-from src.pdf_parser import extract_text_from_pdf, save_to_vector_db, chat_with_context
-from src.chat_over_vector_db import find_relevant_chunks
+from src.pdf_parser import count_pdf_pages, chat_with_context_stream
+from src.chat_over_vector_db import search_chunks
+from src.context_packer import pack_context
 from src.display import render_chunk_as_table_or_text, markdown_to_df
+from src.dashboard_views import load_view
 from src.viz import plot_trend_chart
+from src.embedder import warm_up
+from src.tracing import span, trace
+from src.ingest_jobs import ACTIVE as ACTIVE_JOBS, FAILED, INDEXED, list_jobs, markdown_path, resume_jobs, retry_job, submit_job
+
+
+# ---- Warm the shared embedder once per process ----
+@st.cache_resource(show_spinner="Loading embedding model...")
+def warm_embedder():
+    warm_up()
+    return True
+
+warm_embedder()
+
+
+# ---- Resume ingestion jobs a previous server process left unfinished ----
+@st.cache_resource(show_spinner=False)
+def start_ingest_jobs():
+    return resume_jobs()
+
+start_ingest_jobs()
+
+CHAT_RETRIEVAL_K = 8
+JOBS_SHOWN = 10
+JOB_STATUS_ICONS = {"queued": "⏳", "extracting": "📄", "embedding": "🧮", "indexed": "✅", "failed": "❌"}
+
+
+def render_ingest_jobs(jobs):
+    if not jobs:
+        return
+    st.markdown("#### 📦 Ingestion Jobs")
+    for job in jobs:
+        label = f"{JOB_STATUS_ICONS[job['status']]} {job['file_name']} · {job['status']}"
+        if job["status"] in ACTIVE_JOBS:
+            fraction = job["done"] / job["total"] if job["total"] else 0.0
+            st.progress(fraction, text=f"{label} ({job['done']}/{job['total'] or '?'})")
+            continue
+        with st.expander(label, expanded=False):
+            for failed in job["failed_ranges"]:
+                st.warning(f"⚠️ Pages {failed['pages']} could not be extracted: {failed['error']}")
+            if job["status"] == FAILED:
+                st.error(f"❌ {job['error']}")
+                if st.button("🔁 Retry", key=f"retry_{job['id']}"):
+                    retry_job(job["id"])
+                    st.rerun()
+            elif job["status"] == INDEXED:
+                st.write(f"✅ {job['new_chunks']} new chunk(s) indexed.")
+                try:
+                    with open(markdown_path(job["id"]), encoding="utf-8") as f:
+                        markdown_text = f.read()
+                except FileNotFoundError:
+                    markdown_text = ""
+                if markdown_text:
+                    st.download_button("📥 Download Markdown", markdown_text, "summary.md", key=f"md_{job['id']}")
+                    st.markdown(markdown_text)
+
+
+@st.fragment(run_every=2)
+def live_ingest_jobs(user):
+    """Polls job progress without rerunning the rest of the page."""
+    jobs = list_jobs(user=user, limit=JOBS_SHOWN)
+    render_ingest_jobs(jobs)
+    if not any(job["status"] in ACTIVE_JOBS for job in jobs):
+        st.rerun()
 
 # ---- Load config.yaml ----
 with open('config.yaml') as file:
@@ -48,6 +111,8 @@ elif st.session_state.get("authentication_status"):
     user_config = config["credentials"]["usernames"].get(username, {})
     role = user_config.get("role", "analyst")
     company = user_config.get("company", None)
+    # The admin metrics page (pages/) checks this
+    st.session_state["role"] = role
 
     st.sidebar.success(f"👤 Logged in as: **{name}**")
     st.sidebar.write(f"🔑 Role: `{role}`")
@@ -68,87 +133,75 @@ elif st.session_state.get("authentication_status"):
         uploaded_file = st.file_uploader("Upload an annual report (PDF)", type=["pdf"])
 
         if uploaded_file:
-            with st.spinner("📄 Parsing and indexing the PDF..."):
-                try:
-                    markdown_text, file_path = extract_text_from_pdf(uploaded_file)
-                    word_count = len(markdown_text.split())
-
-                    if word_count > 8000:
-                        st.warning("📄 File is too large to process (exceeds 8,000 words). Please upload a smaller PDF.")
-                    elif not markdown_text or word_count < 50:
-                        st.warning("⚠️ PDF could not be parsed correctly. Try a different file.")
-                    else:
-                        save_to_vector_db(markdown_text, metadata={
-                            "source": "pdf_from_user",
-                            "role": "analyst",
-                            "user": username
-                        })
-                        st.success("✅ Uploaded & indexed successfully.")
-                        st.session_state["uploaded"] = markdown_text
-                        st.markdown(f"📄 File path: `{file_path}`")
-                        st.download_button("📥 Download Markdown", markdown_text, "summary.md")
-                        st.markdown(markdown_text)
-
-                except Exception as e:
-                    st.error("❌ Error uploading or parsing the PDF.")
-                    st.exception(e)
+            # Extraction and indexing run in the background job queue. Each upload is
+            # submitted once; reruns while it stays in the uploader reuse its job.
+            upload_key = f"ingest_job_{uploaded_file.file_id}"
+            if upload_key not in st.session_state:
+                metadata = {
+                    "source": "pdf_from_user",
+                    "role": "analyst",
+                    "user": username
+                }
+                pdf = uploaded_file.getvalue()
+                st.session_state[upload_key] = (
+                    submit_job(uploaded_file.name, pdf, metadata=metadata, user=username),
+                    count_pdf_pages(pdf),
+                )
+            job_id, page_count = st.session_state[upload_key]
+            st.info(f"📬 `{uploaded_file.name}` ({page_count} page(s)) is queued as job `{job_id}`. "
+                    "Tables PyMuPDF can read are parsed locally, the rest goes to OCR. You can keep working.")
+
+        jobs = list_jobs(user=username, limit=JOBS_SHOWN)
+        if any(job["status"] in ACTIVE_JOBS for job in jobs):
+            live_ingest_jobs(username)
+        else:
+            render_ingest_jobs(jobs)
 
     # ---------------- ROLE-BASED DASHBOARD with Charts ----------------
     elif role in ["ceo", "inventory_manager", "owner"]:
         st.subheader(f"📊 {role.replace('_', ' ').title()} Dashboard")
 
-        with st.spinner("📈 Loading financial data..."):
-            if role == "ceo" and company:
-                chunks = find_relevant_chunks("summary", role="ceo", company=company)
-            elif role == "inventory_manager":
-                chunks = find_relevant_chunks("inventory", role="inventory_manager")
-            elif role == "owner":
-                chunks = find_relevant_chunks("segment", role="owner")
-            else:
-                chunks = []
+        with trace("dashboard", role=role, company=company):
+            with st.spinner("📈 Loading financial data..."):
+                # Precomputed at ingest; only views touched by new chunks are rebuilt
+                with span("load_view"):
+                    view = load_view(role, company)
+                chunks = view["chunks"] if view else []
 
-        if not chunks:
-            st.warning("⚠️ No dashboard data available yet for this role.")
-        else:
-            unique_chunks = []
-            seen_tables = set()
-            for chunk in chunks:
-                if chunk not in seen_tables:
-                    unique_chunks.append(chunk)
-                    seen_tables.add(chunk)
-            for chunk in unique_chunks:
-                df = markdown_to_df(chunk)
-                if df is not None:
-                    st.markdown("#### 📄 Table View")
-                    st.dataframe(df, use_container_width=True)
-                    for col in df.columns[1:]:
-                        df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', ''), errors='coerce')
-
-                    num_cols = df.select_dtypes(include=["float64", "int64"]).columns.tolist()
-                    if len(num_cols) >= 1:
-                        try:
-                            x_col = df.columns[0]
-                            y_cols = [col for col in df.columns if col != x_col]
-                            st.markdown("#### 📊 Chart View")
-                            plot_trend_chart(df, x_col=x_col, y_cols=y_cols, title=f"{role.title()} Trends")
-                            st.download_button("📥 Download CSV", df.to_csv(index=False), file_name=f"{role}_{x_col}_data.csv")
-                        except:
-                            st.info("Chart not available for this table.")
-                else:
-                    render_chunk_as_table_or_text(chunk)
+            if not chunks:
+                st.warning("⚠️ No dashboard data available yet for this role.")
+            else:
+                for chunk in chunks:
+                    df = markdown_to_df(chunk["content"], chunk["id"])
+                    if df is not None:
+                        st.markdown("#### 📄 Table View")
+                        st.dataframe(df, use_container_width=True)
+
+                        num_cols = df.select_dtypes(include=["float64", "int64"]).columns.tolist()
+                        if len(num_cols) >= 1:
+                            try:
+                                x_col = df.columns[0]
+                                y_cols = [col for col in num_cols if col != x_col]
+                                st.markdown("#### 📊 Chart View")
+                                plot_trend_chart(df, x_col=x_col, y_cols=y_cols, title=f"{role.title()} Trends")
+                                st.download_button("📥 Download CSV", df.to_csv(index=False), file_name=f"{role}_{x_col}_data.csv")
+                            except:
+                                st.info("Chart not available for this table.")
+                    else:
+                        render_chunk_as_table_or_text(chunk["content"])
 
         query = st.text_input("🔎 Type a question to narrow your data view:")
         if query and st.button("🔍 Filter My Tables"):
-            with st.spinner("Searching vector DB..."):
+            with trace("filter", role=role, company=company), st.spinner("Searching vector DB..."):
                 if role == "ceo" and company:
-                    result_chunks = find_relevant_chunks(query, role="ceo", company=company)
+                    result_chunks = search_chunks(query, role="ceo", company=company)
                 else:
-                    result_chunks = find_relevant_chunks(query, role=role)
+                    result_chunks = search_chunks(query, role=role)
                 if not result_chunks:
                     st.warning("No results found.")
                 else:
                     for rc in result_chunks:
-                        render_chunk_as_table_or_text(rc)
+                        render_chunk_as_table_or_text(rc["content"], rc["id"])
 
     # ---------------- UNIVERSAL CHATBOT (Every Role) ----------------
     st.divider()
@@ -168,15 +221,32 @@ elif st.session_state.get("authentication_status"):
         # Save user's message to this user's chat history
         st.session_state[chat_key].append({"role": "user", "message": role_query})
 
-        with st.chat_message("assistant"):
-            with st.spinner("🤖 FINBOT is thinking..."):
-                if role == "ceo":
-                    context_chunks = find_relevant_chunks(role_query, role=role, company=company)
+        with trace("chat", role=role, company=company):
+            with st.chat_message("assistant"):
+                with st.spinner("🤖 FINBOT is thinking..."):
+                    if role == "ceo":
+                        hits = search_chunks(role_query, role=role, company=company, k=CHAT_RETRIEVAL_K)
+                    else:
+                        hits = search_chunks(role_query, role=role, k=CHAT_RETRIEVAL_K)
+                    # Best-scoring whole chunks, deduplicated, within the prompt token budget
+                    with span("pack_context"):
+                        context_text, packed = pack_context(hits)
+                    context_text = context_text or "No relevant context found."
+
+                # Tokens are rendered as they arrive; write_stream returns the full text.
+                # Near-identical questions over the same sources come whole from the answer cache.
+                timings = {}
+                answer = st.write_stream(chat_with_context_stream(role_query, context_text, timings=timings,
+                                                                  role=role, company=company, sources=packed))
+                if not isinstance(answer, str):
+                    answer = "".join(str(part) for part in answer)
+                cached = timings.get("cached")
+                if cached is not None:
+                    asked = int((time.time() - cached["created_at"]) // 60)
+                    st.caption(f"⚡ Served from answer cache: a similar question (“{cached['question']}”) "
+                               f"was answered {asked} min ago from the same sources.")
                 else:
-                    context_chunks = find_relevant_chunks(role_query, role=role)
-                context_text = "\n\n".join(context_chunks) if context_chunks else "No relevant context found."
-                answer = chat_with_context(role_query, context_text)
-                st.markdown(answer)
+                    st.caption(f"⏱️ First token {timings.get('ttft', 0):.2f}s · total {timings.get('total', 0):.2f}s")
 
         # Save assistant's reply to this user's chat history
         st.session_state[chat_key].append({"role": "assistant", "message": answer})
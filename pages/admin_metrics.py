@@ -0,0 +1,82 @@
+import time
+
+import pandas as pd
+import streamlit as st
+
+from src.llm_client import llm_metrics
+from src.embedder import embedder_metrics
+from src.embedding_cache import cache_stats
+from src.query_cache import cache_metrics
+from src.answer_cache import answer_cache_stats
+from src.tracing import SLOW_REQUEST_SECONDS, histogram_summary, prometheus_text, slow_requests
+
+st.title("🛠️ Admin · Request Latency")
+
+# Analysts only; the role is set by main.py after login
+if not st.session_state.get("authentication_status") or st.session_state.get("role") != "analyst":
+    st.warning("🔒 Log in as an analyst on the main page to view metrics.")
+    st.stop()
+
+min_seconds = st.sidebar.number_input("Slow request threshold (s)", min_value=0.0,
+                                      value=SLOW_REQUEST_SECONDS, step=0.25)
+if st.sidebar.button("🔄 Refresh"):
+    st.rerun()
+
+# ---- Recent slow requests ----
+st.subheader("🐢 Recent Slow Requests")
+slow = slow_requests(min_seconds)
+if not slow:
+    st.info(f"No request in this process took longer than {min_seconds:.2f}s.")
+else:
+    st.dataframe(pd.DataFrame([
+        {
+            "request_id": t["request_id"],
+            "request": t["name"],
+            "started": time.strftime("%H:%M:%S", time.localtime(t["started_at"])),
+            "seconds": t["seconds"],
+            "slowest stage": max(t["stages"], key=t["stages"].get) if t["stages"] else "",
+            "role": t["attrs"].get("role"),
+            "company": t["attrs"].get("company"),
+            "error": t["error"],
+        }
+        for t in slow
+    ]), use_container_width=True)
+
+    chosen = st.selectbox("Stage breakdown for request", [t["request_id"] for t in slow])
+    trace = next(t for t in slow if t["request_id"] == chosen)
+    stages = pd.DataFrame(
+        sorted(trace["stages"].items(), key=lambda item: -item[1]), columns=["stage", "seconds"]
+    )
+    st.bar_chart(stages.set_index("stage"))
+    st.caption(f"⏱️ Total {trace['seconds']:.3f}s. Stages nest (encode includes a model load) and "
+               "OCR ranges run in parallel, so they need not add up to the total.")
+    st.dataframe(pd.DataFrame(trace["spans"]), use_container_width=True)
+
+# ---- Retrieval caches ----
+st.subheader("🧠 Query and Result Caches")
+caches = cache_metrics()
+cols = st.columns(3)
+for col, name in zip(cols, ("query_vectors", "results")):
+    stats = caches[name]
+    rate = "n/a" if stats["hit_rate"] is None else f"{stats['hit_rate']:.0%}"
+    col.metric(name.replace("_", " ").title() + " hit rate", rate,
+               help=f"{stats['size']}/{stats['maxsize']} entries, {stats['evictions']} evicted, {stats['expired']} expired")
+answers = answer_cache_stats()
+rate = "n/a" if answers["hit_rate"] is None else f"{answers['hit_rate']:.0%}"
+cols[2].metric("Answer cache hit rate", rate,
+               help=f"{answers['entries']} answers, {answers['stale']} dropped as stale, {answers['evicted']} evicted")
+
+# ---- Histograms ----
+st.subheader("📊 Latency Histograms")
+for metric, series in histogram_summary().items():
+    st.markdown(f"**{metric}** (p50/p95/p99 are bucket upper bounds)")
+    st.dataframe(pd.DataFrame.from_dict(series, orient="index").sort_values("sum", ascending=False),
+                 use_container_width=True)
+
+with st.expander("Mistral API and embedder"):
+    st.json({"llm": llm_metrics(), "embedder": embedder_metrics(), "embedding_cache": cache_stats()})
+
+prom = prometheus_text()
+st.download_button("📥 Download Prometheus metrics", prom, "metrics.prom", mime="text/plain")
+with st.expander("Prometheus text"):
+    st.code(prom, language="text")
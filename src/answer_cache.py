@@ -0,0 +1,144 @@
+# src/answer_cache.py
+import hashlib
+import threading
+import time
+
+import numpy as np
+
+from src.lexical_index import tokenize
+from src.metadata_index import normalize_value
+
+SIMILARITY_THRESHOLD = 0.92     # cosine between question embeddings
+MAX_ENTRIES_PER_SCOPE = 256
+ANSWER_TTL = 6 * 3600           # seconds
+
+# (role, company) -> list of entries, least recently used first
+_scopes = {}
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stale": 0, "stored": 0, "evicted": 0}
+
+
+def sources_key(sources):
+    """Order-independent key of the `{"id", "content"}` chunks an answer was built from.
+
+    Retrieval orders chunks by a question-dependent score, so paraphrases
+    that find the same chunks pack them in a different order.
+    """
+    return frozenset((s["id"], hashlib.md5(s["content"].encode()).hexdigest()) for s in sources)
+
+
+def scope_key(role, company=None):
+    # Only CEOs retrieve company-specific data, so other roles share one scope
+    return role, normalize_value("company", company) if role == "ceo" else None
+
+
+def number_terms(question):
+    """Years, periods and figures in `question`; "FY24" must not answer "FY23"."""
+    return frozenset(t for t in tokenize(question) if any(c.isdigit() for c in t))
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype="float32")
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _question_vector(question):
+    from src.chat_over_vector_db import query_vector
+    return _unit(query_vector(question))
+
+
+def _chunks_changed(entry):
+    """True once any chunk the answer was built from has left the corpus."""
+    from src.shards import existing_ids
+    ids = {chunk_id for chunk_id, _ in entry["sources"]}
+    return existing_ids(list(ids)) != ids
+
+
+def lookup(question, role, company, sources, threshold=None):
+    """A stored answer for a near-identical question over the same chunks, else None.
+
+    The most similar question in the role/company scope that passes
+    `threshold`, names the same years and figures and was answered from
+    exactly the chunks in `sources` (in any order) is returned. A similar
+    question answered from other chunks is a plain miss; its entry is only
+    dropped once one of its chunks has been removed or rewritten.
+    """
+    threshold = SIMILARITY_THRESHOLD if threshold is None else threshold
+    vector = _question_vector(question)
+    numbers = number_terms(question)
+    key = sources_key(sources)
+    now = time.time()
+
+    with _lock:
+        entries = _scopes.get(scope_key(role, company), [])
+        entries[:] = [e for e in entries if now - e["created_at"] < ANSWER_TTL]
+        best, best_sim, other = None, threshold, None
+        for entry in entries:
+            if entry["numbers"] != numbers:
+                continue
+            sim = float(np.dot(entry["vector"], vector))
+            if sim < threshold:
+                continue
+            if entry["sources"] != key:
+                other = entry
+            elif sim >= best_sim:
+                best, best_sim = entry, sim
+        if best is not None:
+            entries[:] = [e for e in entries if e is not best] + [best]
+            best["hits"] += 1
+            _stats["hits"] += 1
+            return {"answer": best["answer"], "question": best["question"], "similarity": best_sim,
+                    "created_at": best["created_at"], "hits": best["hits"]}
+        _stats["misses"] += 1
+
+    if other is not None and _chunks_changed(other):
+        with _lock:
+            kept = [e for e in entries if e is not other]
+            _stats["stale"] += len(entries) - len(kept)
+            entries[:] = kept
+    return None
+
+
+def store(question, role, company, sources, answer):
+    """Remember `answer` for `question`, built from the chunks in `sources`."""
+    if not answer:
+        return
+    entry = {
+        "question": question,
+        "vector": _question_vector(question),
+        "numbers": number_terms(question),
+        "sources": sources_key(sources),
+        "answer": answer,
+        "created_at": time.time(),
+        "hits": 0,
+    }
+    with _lock:
+        entries = _scopes.setdefault(scope_key(role, company), [])
+        entries[:] = [e for e in entries if e["question"] != question]
+        entries.append(entry)
+        _stats["stored"] += 1
+        while len(entries) > MAX_ENTRIES_PER_SCOPE:
+            entries.pop(0)
+            _stats["evicted"] += 1
+
+
+def clear():
+    with _lock:
+        _scopes.clear()
+
+
+def answer_cache_stats():
+    with _lock:
+        stats = dict(_stats)
+        stats["entries"] = sum(len(e) for e in _scopes.values())
+    total = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / total if total else None
+    return stats
+
+
+def reset():
+    clear()
+    with _lock:
+        for name in _stats:
+            _stats[name] = 0
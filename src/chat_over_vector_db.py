@@ -1,30 +1,102 @@
 # src/chat_over_vector_db.py
-import json
-import faiss
-import numpy as np
-from sentence_transformers import SentenceTransformer
+from src import query_cache
+from src.embedder import DEFAULT_MODEL_PATH, encode
+from src.shards import filter_shards, index_version, search_shards, search_shards_batch
+from src.tracing import span
+from src.vector_store import LEXICAL_WEIGHT
+
 
 def load_vector_data(role=None, company=None):
-    with open("db/docs.jsonl", "r", encoding="utf-8") as f:
-        docs = [json.loads(line) for line in f]
-    if role:
-        docs = [d for d in docs if role in d["metadata"].get("role", [])]
-    if company:
-        docs = [d for d in docs if d["metadata"].get("company") == company]
-    return docs
+    return filter_shards(role, company)
 
-def find_relevant_chunks(query, role, company=None, k=5):
-    docs = load_vector_data(role, company)
-    if not docs: return []
 
-    corpus = [d["content"] for d in docs]
-    embedder = SentenceTransformer('./model_cache/all-MiniLM-L6-v2', device='cpu')
-    print("Model loaded successfully")
+def query_vectors(queries):
+    """Embeddings for `queries`, kept in memory across reruns and users.
+
+    The ones not cached yet are encoded together in one model call. Queries
+    stay out of the on-disk embedding cache, which only grows with the corpus.
+    """
+    vectors = [query_cache.query_vectors.get((DEFAULT_MODEL_PATH, q)) for q in queries]
+    missing = list(dict.fromkeys(q for q, v in zip(queries, vectors) if v is None))
+    if missing:
+        with span("encode"):
+            encoded = dict(zip(missing, encode(missing)))
+        for query, vector in encoded.items():
+            query_cache.query_vectors.put((DEFAULT_MODEL_PATH, query), vector)
+        vectors = [encoded[q] if v is None else v for q, v in zip(queries, vectors)]
+    return vectors
+
+
+def query_vector(query):
+    return query_vectors([query])[0]
+
+
+def _to_hits(results):
+    return [
+        {"id": doc["id"], "content": doc["content"], "metadata": doc["metadata"],
+         "distance": dist, "score": score}
+        for score, dist, doc in results
+    ]
+
+
+def _request(req, lexical_weight):
+    """`(query, role[, company[, k]])` or a dict -> a full request dict."""
+    if not isinstance(req, dict):
+        req = dict(zip(("query", "role", "company", "k"), req))
+    return {"company": None, "k": 5, "lexical_weight": lexical_weight, **req}
+
+
+def search_chunks_batch(requests, lexical_weight=LEXICAL_WEIGHT):
+    """Top-k docs for many `(query, role, company, k)` requests at once.
+
+    Cached results (shared with `search_chunks`) are reused; the other
+    queries are encoded in one model call, grouped by role/company filter
+    and searched with one FAISS call per shard and group. Returns one hit
+    list per request, the same as `search_chunks` gives for each.
+    """
+    requests = [_request(r, lexical_weight) for r in requests]
+    out, pending = [], []
+    for i, req in enumerate(requests):
+        req["cache_key"] = (req["query"], req["role"], req["company"], req["k"], req["lexical_weight"],
+                            query_cache.generation(), index_version(req["company"]))
+        out.append(query_cache.results.get(req["cache_key"]))
+        if out[i] is None:
+            pending.append(i)
+
+    if pending:
+        dense = [i for i in pending if requests[i]["lexical_weight"] < 1]
+        vectors = dict(zip(dense, query_vectors([requests[i]["query"] for i in dense])))
+        with span("search"):
+            results = search_shards_batch([requests[i] for i in pending], [vectors.get(i) for i in pending])
+        for i, result in zip(pending, results):
+            out[i] = _to_hits(result)
+            query_cache.results.put(requests[i]["cache_key"], out[i])
+    return [[dict(hit) for hit in hits] for hits in out]
+
+
+def search_chunks(query, role, company=None, k=5, lexical_weight=LEXICAL_WEIGHT):
+    """Top-k docs for `query` as dicts with id, content, metadata, distance and score.
+
+    BM25 and vector rankings are fused; `lexical_weight=0` is pure vector
+    search. `distance` is None for docs only the lexical index found.
+    Results are cached per index version, so repeated dashboard and chat
+    queries skip the search until the corpus changes.
+    """
+    key = (query, role, company, k, lexical_weight, query_cache.generation(), index_version(company))
+    hits = query_cache.results.get(key)
+    if hits is None:
+        query_vec = query_vector(query) if lexical_weight < 1 else None
+        # A company query touches one shard; cross-company roles fan out over all of them.
+        with span("search"):
+            hits = _to_hits(search_shards(query, query_vec, k=k, lexical_weight=lexical_weight,
+                                          role=role, company=company))
+        query_cache.results.put(key, hits)
+    return [dict(hit) for hit in hits]
+
+
+def find_relevant_chunks(query, role, company=None, k=5):
+    return [hit["content"] for hit in search_chunks(query, role, company, k)]
 
-    vectors = embedder.encode(corpus)
 
-    index = faiss.IndexFlatL2(vectors.shape[1])
-    index.add(np.array(vectors).astype("float32"))
-    query_vec = embedder.encode([query])
-    D, I = index.search(np.array(query_vec).astype("float32"), k)
-    return [corpus[i] for i in I[0]]
+def find_relevant_chunks_batch(requests):
+    return [[hit["content"] for hit in hits] for hits in search_chunks_batch(requests)]
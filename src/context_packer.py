@@ -0,0 +1,127 @@
+# src/context_packer.py
+import hashlib
+import re
+import threading
+
+from src.embedder import DEFAULT_MODEL_PATH
+
+CONTEXT_TOKEN_BUDGET = 2000
+NEAR_DUPLICATE_JACCARD = 0.85
+
+_counter = None
+_counter_lock = threading.Lock()
+
+
+def _load_token_counter():
+    # The chat model's own tokenizer: Ministral 8B uses Tekken, bundled with mistral_common ...
+    try:
+        from mistral_common.tokens.tokenizers.mistral import MistralTokenizer
+    except ImportError:
+        pass
+    else:
+        tokenizer = MistralTokenizer.v3(is_tekken=True).instruct_tokenizer.tokenizer
+        return lambda text: len(tokenizer.encode(text, bos=False, eos=False))
+    # ... or, without mistral_common, the bundled MiniLM tokenizer, which needs no download.
+    try:
+        from tokenizers import Tokenizer
+
+        tokenizer = Tokenizer.from_file(f"{DEFAULT_MODEL_PATH}/tokenizer.json")
+        tokenizer.no_truncation()
+        tokenizer.no_padding()
+        return lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids)
+    except Exception:
+        return lambda text: len(text) // 4 + 1
+
+
+def count_tokens(text):
+    global _counter
+    if _counter is None:
+        with _counter_lock:
+            if _counter is None:
+                _counter = _load_token_counter()
+    return _counter(text)
+
+
+def compact_table_whitespace(text):
+    """Strip the column padding from markdown table rows; other lines are kept."""
+    lines = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("|") and stripped.endswith("|") and len(stripped) > 1:
+            cells = [c.strip() for c in stripped[1:-1].split("|")]
+            if all(re.fullmatch(r":?-+:?", c) for c in cells if c):
+                cells = ["---" for _ in cells]
+            lines.append("| " + " | ".join(cells) + " |")
+        else:
+            lines.append(line.rstrip())
+    return "\n".join(lines).strip()
+
+
+def _shingles(text):
+    return set(re.findall(r"[\w.,%₹−-]+", text.lower()))
+
+
+def _is_near_duplicate(shingles, kept, threshold):
+    for other in kept:
+        union = len(shingles | other)
+        if union and len(shingles & other) / union >= threshold:
+            return True
+    return False
+
+
+def truncate_rows(text, budget_tokens):
+    """The longest run of leading lines (table rows) that fits in `budget_tokens`."""
+    lines = text.splitlines()
+    lo, hi = 0, len(lines)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens("\n".join(lines[:mid])) <= budget_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return "\n".join(lines[:lo])
+
+
+def pack_context(hits, budget_tokens=CONTEXT_TOKEN_BUDGET, near_duplicate=NEAR_DUPLICATE_JACCARD,
+                 separator="\n\n"):
+    """Build the LLM context from retrieved hits.
+
+    Hits (dicts with `content` and a fused `score` or a `distance`) are
+    taken best first, table padding is compacted, exact and near duplicates are
+    dropped, and whole chunks are added while they fit in `budget_tokens`
+    counted with the chat tokenizer. A best chunk larger than the whole budget
+    is cut at a row boundary rather than leaving the context empty. Returns
+    `(context_text, packed_hits)`.
+    """
+    if all("score" in h for h in hits):
+        ranked = sorted(hits, key=lambda h: -h["score"])
+    else:
+        ranked = sorted(hits, key=lambda h: h.get("distance", 0.0))
+    sep_tokens = count_tokens(separator)
+
+    packed, texts, kept_shingles, seen = [], [], [], set()
+    used = 0
+    for hit in ranked:
+        text = compact_table_whitespace(hit["content"])
+        digest = hashlib.md5(text.encode()).hexdigest()
+        if not text or digest in seen:
+            continue
+        shingles = _shingles(text)
+        if _is_near_duplicate(shingles, kept_shingles, near_duplicate):
+            continue
+
+        cost = count_tokens(text) + (sep_tokens if texts else 0)
+        if not texts and cost > budget_tokens:
+            text = truncate_rows(text, budget_tokens)
+            if not text:
+                continue
+            cost = count_tokens(text)
+        if used + cost > budget_tokens:
+            continue
+        used += cost
+        seen.add(digest)
+        kept_shingles.append(shingles)
+        texts.append(text)
+        packed.append(hit)
+
+    return separator.join(texts), packed
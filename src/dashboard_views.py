@@ -0,0 +1,115 @@
+# src/dashboard_views.py
+import json
+import os
+import re
+import threading
+import time
+
+from src import vector_store
+from src.chat_over_vector_db import search_chunks
+from src.metadata_index import normalize_roles, normalize_value
+
+VIEWS_DIR = "views"        # db/views/<role>__<company>.json
+DASHBOARD_QUERIES = {
+    "ceo": "summary",
+    "inventory_manager": "inventory",
+    "owner": "segment",
+}
+COMPANY_SCOPED_ROLES = {"ceo"}   # other dashboards span every company
+VIEW_K = 5
+
+_views = {}
+_views_lock = threading.Lock()
+
+
+def view_key(role, company=None):
+    """Dashboards are per company only for company-scoped roles."""
+    company = normalize_value("company", company) if role in COMPANY_SCOPED_ROLES else None
+    return role, company
+
+
+def view_path(role, company=None):
+    role, company = view_key(role, company)
+    slug = re.sub(r"[^\w-]+", "_", company or "all")
+    return os.path.join(vector_store.DB_DIR, VIEWS_DIR, f"{role}__{slug}.json")
+
+
+def build_view(role, company=None):
+    """Run the role's fixed dashboard query and store the deduplicated chunks."""
+    role, company = view_key(role, company)
+    query = DASHBOARD_QUERIES[role]
+    hits = search_chunks(query, role=role, company=company, k=VIEW_K)
+
+    chunks, seen = [], set()
+    for hit in hits:
+        if hit["content"] not in seen:
+            seen.add(hit["content"])
+            chunks.append({"id": hit["id"], "content": hit["content"], "metadata": hit["metadata"]})
+    view = {"role": role, "company": company, "query": query, "built_at": time.time(), "chunks": chunks}
+
+    path = view_path(role, company)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(view, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return view
+
+
+def load_view(role, company=None):
+    """The stored dashboard view, built on first use. None for roles without a dashboard."""
+    role, company = view_key(role, company)
+    if role not in DASHBOARD_QUERIES or (role in COMPANY_SCOPED_ROLES and not company):
+        return None
+    path = view_path(role, company)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return build_view(role, company)
+
+    key = os.path.abspath(path)
+    with _views_lock:
+        cached = _views.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            view = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return build_view(role, company)
+    with _views_lock:
+        _views[key] = (mtime, view)
+    return view
+
+
+def affected_views(docs):
+    """(role, company) keys whose dashboards can change when `docs` are added."""
+    keys = set()
+    for doc in docs:
+        metadata = doc.get("metadata", {})
+        for role in normalize_roles(metadata.get("role")):
+            if role not in DASHBOARD_QUERIES:
+                continue
+            role, company = view_key(role, metadata.get("company"))
+            if role in COMPANY_SCOPED_ROLES and not company:
+                continue
+            keys.add((role, company))
+    return keys
+
+
+def refresh_views(docs):
+    """Rebuild only the views touched by newly ingested `docs`. Returns their keys."""
+    keys = affected_views(docs)
+    for role, company in sorted(keys, key=lambda k: (k[0], k[1] or "")):
+        build_view(role, company)
+    return keys
+
+
+def clear_views():
+    """Drop every stored view, e.g. after a rebuild; they are rebuilt on next use."""
+    views_dir = os.path.join(vector_store.DB_DIR, VIEWS_DIR)
+    if not os.path.isdir(views_dir):
+        return
+    for name in os.listdir(views_dir):
+        if name.endswith(".json"):
+            os.remove(os.path.join(views_dir, name))
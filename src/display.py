@@ -1,25 +1,25 @@
-import pandas as pd
-from io import StringIO
 import streamlit as st
+from src.table_parser import cached_table
+from src.table_store import load_table
+from src.tracing import span
 
-def markdown_to_df(md):
+def markdown_to_df(md, chunk_id=None):
+    """Typed DataFrame for the table in `md`; None if there is no table.
+
+    Chunks indexed with their tables load the stored frame without parsing;
+    others are parsed once and cached by chunk id.
+    """
     try:
-        lines = [l for l in md.split('\n') if '|' in l]
-        if len(lines) < 3:
-            return None
-        header = lines[0]
-        rows = lines[2:]
-        csv = "\n".join([header] + rows)
-        df = pd.read_csv(StringIO(csv), sep="|", engine="python")
-        df = df.dropna(axis=1, how="all")
-        df.columns = [c.strip() for c in df.columns]
-        return df
-    except:
+        with span("table_load"):
+            df = load_table(chunk_id) if chunk_id else None
+            return df if df is not None else cached_table(md, chunk_id)
+    except Exception:
         return None
 
-def render_chunk_as_table_or_text(text_chunk):
-    df = markdown_to_df(text_chunk)
-    if df is not None:
-        st.dataframe(df, use_container_width=True)
-    else:
-        st.markdown(text_chunk)
+def render_chunk_as_table_or_text(text_chunk, chunk_id=None):
+    df = markdown_to_df(text_chunk, chunk_id)
+    with span("render"):
+        if df is not None:
+            st.dataframe(df, use_container_width=True)
+        else:
+            st.markdown(text_chunk)
@@ -0,0 +1,210 @@
+# src/doc_store.py
+import json
+import os
+import sqlite3
+import threading
+
+from src.lexical_index import term_counts
+
+STORE_FILE = "docs.sqlite"
+MMAP_BYTES = 256 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    row INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    content TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, row)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS doc_lengths (
+    row INTEGER PRIMARY KEY,
+    length INTEGER NOT NULL
+);
+"""
+
+# SQLite caps the number of bound parameters per statement.
+_BATCH = 500
+
+
+def _to_doc(record):
+    return {"id": record[0], "content": record[1], "metadata": json.loads(record[2])}
+
+
+def _insert_terms(conn, rows_docs):
+    """BM25 postings and lengths for `(row, doc)` pairs, inside the caller's transaction."""
+    postings, lengths = [], []
+    for row, doc in rows_docs:
+        length, counts = term_counts(doc["content"])
+        lengths.append((row, length))
+        postings.extend((term, row, tf) for term, tf in counts.items())
+    conn.executemany("INSERT OR IGNORE INTO doc_lengths (row, length) VALUES (?, ?)", lengths)
+    conn.executemany("INSERT OR IGNORE INTO postings (term, row, tf) VALUES (?, ?, ?)", postings)
+
+
+class DocStore:
+    """Docs keyed by FAISS row in a memory-mapped SQLite file.
+
+    `row` is the doc's position in the vector index, so a search result can
+    be turned back into content with a primary-key lookup instead of a scan.
+    The BM25 postings of every doc live in the same file (see
+    `src/lexical_index.py`) and are written in the same transaction.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA mmap_size={MMAP_BYTES}")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def ids(self):
+        return [r[0] for r in self._conn().execute("SELECT id FROM docs ORDER BY row")]
+
+    def get(self, doc_id):
+        record = self._conn().execute(
+            "SELECT id, content, metadata FROM docs WHERE id = ?", (doc_id,)
+        ).fetchone()
+        return _to_doc(record) if record else None
+
+    def get_rows(self, rows):
+        """Docs for `rows`, in the order given; unknown rows are skipped."""
+        rows = [int(r) for r in rows]
+        found = {}
+        conn = self._conn()
+        for start in range(0, len(rows), _BATCH):
+            batch = rows[start:start + _BATCH]
+            marks = ",".join("?" * len(batch))
+            for record in conn.execute(
+                f"SELECT row, id, content, metadata FROM docs WHERE row IN ({marks})", batch
+            ):
+                found[record[0]] = _to_doc(record[1:])
+        return [found[r] for r in rows if r in found]
+
+    def existing_ids(self, ids):
+        ids = list(ids)
+        found = set()
+        conn = self._conn()
+        for start in range(0, len(ids), _BATCH):
+            batch = ids[start:start + _BATCH]
+            marks = ",".join("?" * len(batch))
+            found.update(r[0] for r in conn.execute(f"SELECT id FROM docs WHERE id IN ({marks})", batch))
+        return found
+
+    def iter_docs(self, start_row=0):
+        cursor = self._conn().execute(
+            "SELECT id, content, metadata FROM docs WHERE row >= ? ORDER BY row", (start_row,)
+        )
+        for record in cursor:
+            yield _to_doc(record)
+
+    def append(self, docs):
+        """Append docs after the last row and return the first new row."""
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                first_row = conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM docs").fetchone()[0]
+                conn.executemany(
+                    "INSERT INTO docs (row, id, content, metadata) VALUES (?, ?, ?, ?)",
+                    [
+                        (first_row + i, d["id"], d["content"], json.dumps(d["metadata"]))
+                        for i, d in enumerate(docs)
+                    ],
+                )
+                _insert_terms(conn, ((first_row + i, d) for i, d in enumerate(docs)))
+            return first_row
+
+    def replace_all(self, docs):
+        """Rewrite the store with `docs` as rows 0..n-1 in one transaction."""
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM docs")
+                conn.execute("DELETE FROM postings")
+                conn.execute("DELETE FROM doc_lengths")
+                conn.executemany(
+                    "INSERT INTO docs (row, id, content, metadata) VALUES (?, ?, ?, ?)",
+                    [(i, d["id"], d["content"], json.dumps(d["metadata"])) for i, d in enumerate(docs)],
+                )
+                _insert_terms(conn, enumerate(docs))
+            conn.execute("VACUUM")
+
+    def index_terms(self):
+        """Write postings for docs stored before postings existed. Returns how many."""
+        conn = self._conn()
+        if conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0] == \
+                conn.execute("SELECT COUNT(*) FROM doc_lengths").fetchone()[0]:
+            return 0
+        with self._write_lock:
+            with conn:
+                missing = [
+                    (record[0], {"content": record[1]}) for record in conn.execute(
+                        "SELECT row, content FROM docs WHERE row NOT IN (SELECT row FROM doc_lengths)"
+                    ).fetchall()
+                ]
+                _insert_terms(conn, missing)
+        return len(missing)
+
+    def term_stats(self, terms):
+        """`(doc count, total length, {term: document frequency})` for BM25."""
+        conn = self._conn()
+        docs, length = conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM doc_lengths").fetchone()
+        df = {}
+        terms = list(terms)
+        for start in range(0, len(terms), _BATCH):
+            batch = terms[start:start + _BATCH]
+            marks = ",".join("?" * len(batch))
+            df.update(conn.execute(
+                f"SELECT term, COUNT(*) FROM postings WHERE term IN ({marks}) GROUP BY term", batch
+            ))
+        return docs, length, df
+
+    def postings(self, term):
+        """`(row, tf, doc length)` for every doc containing `term`."""
+        return self._conn().execute(
+            "SELECT p.row, p.tf, l.length FROM postings p JOIN doc_lengths l ON l.row = p.row WHERE p.term = ?",
+            (term,),
+        ).fetchall()
+
+
+def migrate_jsonl(jsonl_path, store, order=None):
+    """Copy a legacy docs.jsonl into `store`, keeping the first copy of each id.
+
+    `order` (the old doc_ids.json) puts docs back on the rows the existing
+    FAISS index was built with; docs missing from it follow in file order.
+    """
+    docs = {}
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                doc = json.loads(line)
+                docs.setdefault(doc["id"], doc)
+
+    ordered = [docs[i] for i in (order or []) if i in docs]
+    placed = {d["id"] for d in ordered}
+    ordered += [d for i, d in docs.items() if i not in placed]
+    store.replace_all(ordered)
+    return len(ordered)
@@ -0,0 +1,106 @@
+# src/embedder.py
+import threading
+import time
+
+import numpy as np
+
+from src.tracing import span
+
+DEFAULT_MODEL_PATH = "./model_cache/all-MiniLM-L6-v2"
+DEFAULT_DEVICE = "cpu"
+
+# One loaded model per (path, device) for the whole process. Streamlit runs
+# every session in its own thread, so loads and encodes go through locks.
+_models = {}
+_encode_locks = {}
+_registry_lock = threading.Lock()
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def _load_model(model_path, device):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_path, device=device)
+
+
+def _empty_metrics():
+    return {
+        "loads": 0,
+        "load_seconds": 0.0,
+        "encode_calls": 0,
+        "encoded_texts": 0,
+        "encode_seconds": 0.0,
+    }
+
+
+def _record(key, **values):
+    with _metrics_lock:
+        m = _metrics.setdefault(key, _empty_metrics())
+        for name, value in values.items():
+            m[name] += value
+
+
+def get_embedder(model_path=DEFAULT_MODEL_PATH, device=DEFAULT_DEVICE):
+    key = (model_path, device)
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _registry_lock:
+        model = _models.get(key)
+        if model is None:
+            start = time.perf_counter()
+            with span("model_load"):
+                model = _load_model(model_path, device)
+            elapsed = time.perf_counter() - start
+            _models[key] = model
+            _encode_locks[key] = threading.Lock()
+            _record(key, loads=1, load_seconds=elapsed)
+            print(f"Model loaded successfully: {model_path} ({elapsed:.2f}s)")
+    return model
+
+
+def register_embedder(model, model_path=DEFAULT_MODEL_PATH, device=DEFAULT_DEVICE):
+    """Install an already-built model (or any object with `encode`) in the registry."""
+    key = (model_path, device)
+    with _registry_lock:
+        _models[key] = model
+        _encode_locks[key] = threading.Lock()
+
+
+def clear_embedders():
+    with _registry_lock:
+        _models.clear()
+        _encode_locks.clear()
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def encode(texts, model_path=DEFAULT_MODEL_PATH, device=DEFAULT_DEVICE, batch_size=32):
+    """Encode texts with the shared model and return a float32 matrix."""
+    key = (model_path, device)
+    model = get_embedder(model_path, device)
+    texts = list(texts)
+
+    start = time.perf_counter()
+    # HF fast tokenizers are not safe to share across threads mid-encode.
+    with _encode_locks[key]:
+        vectors = model.encode(texts, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    _record(key, encode_calls=1, encoded_texts=len(texts), encode_seconds=elapsed)
+
+    return np.asarray(vectors, dtype="float32").reshape(len(texts), -1)
+
+
+def warm_up(model_paths=(DEFAULT_MODEL_PATH,), device=DEFAULT_DEVICE):
+    for path in model_paths:
+        encode(["warm up"], model_path=path, device=device)
+
+
+def embedder_metrics():
+    with _metrics_lock:
+        return {
+            f"{path}@{device}": dict(m)
+            for (path, device), m in _metrics.items()
+        }
@@ -0,0 +1,160 @@
+# src/embedding_cache.py
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+from filelock import FileLock
+
+from src import embedder
+
+CACHE_DIR = "cache/embeddings"   # <model>/vectors.f32 + ids.txt + meta.json
+VECTORS_FILE = "vectors.f32"     # float32 rows, memory-mapped for reads
+IDS_FILE = "ids.txt"             # content hash per line; line n = row n
+META_FILE = "meta.json"
+LOCK_FILE = ".write.lock"
+
+# model dir -> {"ids_size", "rows": {hash: row}, "dim", "vectors": memmap|None}
+_tables = {}
+_tables_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def content_hash(text):
+    """Same digest as the chunk ids in save_to_vector_db."""
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+def model_dir(model_path=None, cache_dir=None):
+    name = os.path.basename(os.path.normpath(model_path or embedder.DEFAULT_MODEL_PATH))
+    return os.path.join(cache_dir or CACHE_DIR, re.sub(r"[^\w.-]+", "_", name))
+
+
+def _refresh(path):
+    """Bring the in-memory id table up to date with rows appended on disk."""
+    ids_path = os.path.join(path, IDS_FILE)
+    try:
+        size = os.path.getsize(ids_path)
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            dim = json.load(f)["dim"]
+    except (FileNotFoundError, json.JSONDecodeError):
+        _tables.pop(path, None)
+        return None
+
+    table = _tables.get(path)
+    if table is None or table["dim"] != dim or size < table["ids_size"]:
+        table = _tables[path] = {"ids_size": 0, "rows": {}, "dim": dim, "vectors": None}
+    if size == table["ids_size"]:
+        return table
+
+    with open(ids_path, "r", encoding="utf-8") as f:
+        f.seek(table["ids_size"])
+        data = f.read(size - table["ids_size"])
+    # Only whole lines are committed rows.
+    data = data[:data.rfind("\n") + 1]
+    rows = table["rows"]
+    for key in data.splitlines():
+        rows.setdefault(key, len(rows))
+    table["ids_size"] += len(data.encode())
+    n = len(rows)
+    table["vectors"] = np.memmap(os.path.join(path, VECTORS_FILE), dtype="float32", mode="r",
+                                 shape=(n, dim)) if n else None
+    return table
+
+
+def _lookup(path, keys):
+    """`{key: vector}` for the cached keys."""
+    with _tables_lock:
+        table = _refresh(path)
+        if table is None or table["vectors"] is None:
+            return {}
+        rows, vectors = table["rows"], table["vectors"]
+        return {key: np.array(vectors[rows[key]]) for key in set(keys) if key in rows}
+
+
+def _append(path, keys, vectors):
+    """Append rows under the write lock; the id line is written after its vector."""
+    os.makedirs(path, exist_ok=True)
+    with FileLock(os.path.join(path, LOCK_FILE)):
+        with _tables_lock:
+            table = _refresh(path)
+            if table is not None and table["dim"] != vectors.shape[1]:
+                print(f"⚠️ Embedding cache {path} has dim {table['dim']}, model gives {vectors.shape[1]}; resetting.")
+                for name in (VECTORS_FILE, IDS_FILE, META_FILE):
+                    if os.path.exists(os.path.join(path, name)):
+                        os.remove(os.path.join(path, name))
+                _tables.pop(path, None)
+                table = None
+            if table is None:
+                with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+                    json.dump({"dim": int(vectors.shape[1]), "dtype": "float32"}, f)
+                open(os.path.join(path, IDS_FILE), "a").close()
+                table = _refresh(path)
+
+            fresh = [(k, v) for k, v in zip(keys, vectors) if k not in table["rows"]]
+            if not fresh:
+                return
+            n, dim = len(table["rows"]), table["dim"]
+            with open(os.path.join(path, VECTORS_FILE), "ab") as f:
+                # Drop bytes left by a writer that died before committing its ids.
+                f.truncate(n * dim * 4)
+                f.write(np.ascontiguousarray([v for _, v in fresh], dtype="float32").tobytes())
+            with open(os.path.join(path, IDS_FILE), "a", encoding="utf-8") as f:
+                f.write("".join(f"{k}\n" for k, _ in fresh))
+            _refresh(path)
+
+
+def _dim(path, model_path):
+    with _tables_lock:
+        table = _refresh(path)
+    if table is not None:
+        return table["dim"]
+    return embedder.encode(["dim"], model_path=model_path).shape[1]
+
+
+def encode_cached(texts, model_path=None, cache_dir=None):
+    """`embedder.encode(texts)`, reading stored vectors and embedding only the missing texts."""
+    model_path = model_path or embedder.DEFAULT_MODEL_PATH
+    texts = list(texts)
+    path = model_dir(model_path, cache_dir)
+    if not texts:
+        return np.empty((0, _dim(path, model_path)), dtype="float32")
+
+    keys = [content_hash(t) for t in texts]
+    found = _lookup(path, keys)
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in found:
+            missing.setdefault(key, text)
+    with _tables_lock:
+        _stats["hits"] += sum(1 for key in keys if key in found)
+        _stats["misses"] += len(missing)
+
+    if missing:
+        vectors = embedder.encode(list(missing.values()), model_path=model_path)
+        if found and len(next(iter(found.values()))) != vectors.shape[1]:
+            # The model behind this name changed; nothing cached is usable.
+            found, missing = {}, dict(zip(keys, texts))
+            vectors = embedder.encode(list(missing.values()), model_path=model_path)
+        found.update(zip(missing, vectors))
+        _append(path, list(missing), vectors)
+
+    return np.stack([found[key] for key in keys]).astype("float32", copy=False)
+
+
+def cache_stats():
+    with _tables_lock:
+        stats = dict(_stats)
+    total = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / total if total else None
+    return stats
+
+
+def clear_cache_state():
+    """Forget in-memory tables and counters (files stay on disk)."""
+    with _tables_lock:
+        _tables.clear()
+        _stats.update(hits=0, misses=0)
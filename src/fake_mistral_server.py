@@ -0,0 +1,166 @@
+# src/fake_mistral_server.py
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FAKE_ANSWER = "| Metric | FY2023-24 |\n|---|---|\n| Revenue | 9,14,472 |\n| Net Profit | 79,020 |"
+
+
+class FakeMistralServer:
+    """Local HTTP server speaking the subset of the Mistral API the app uses.
+
+    Point the real SDK at `url` (`MISTRAL_SERVER_URL`) to exercise the pooled
+    client offline. `latency` is added to every request and `error_rate` of
+    requests fail with `error_status`, so rate limiting, retries and the
+    connection pool can be load-tested without tokens.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, error_status=429,
+                 answer=FAKE_ANSWER, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.answer = answer
+        self.requests = 0
+        self.failures = 0
+        self.connections = set()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _should_fail(self):
+        with self._lock:
+            self.requests += 1
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.failures += 1
+            return fail
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _begin(self):
+                with server._lock:
+                    server.connections.add(self.client_address)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                if server.latency:
+                    time.sleep(server.latency)
+                if server._should_fail():
+                    self._send_json(server.error_status, {"message": "fake failure", "type": "fake_error"})
+                    return None
+                return body
+
+            def do_POST(self):
+                body = self._begin()
+                if body is None:
+                    return
+                if self.path == "/v1/files":
+                    name = re.search(rb'filename="([^"]*)"', body)
+                    self._send_json(200, {
+                        "id": str(uuid.uuid4()),
+                        "object": "file",
+                        "size_bytes": len(body),
+                        "created_at": int(time.time()),
+                        "filename": name.group(1).decode() if name else "upload.pdf",
+                        "purpose": "ocr",
+                        "sample_type": "ocr_input",
+                        "source": "upload",
+                    })
+                elif self.path == "/v1/chat/completions":
+                    request = json.loads(body or b"{}")
+                    if request.get("stream"):
+                        self._stream(request)
+                    else:
+                        self._send_json(200, {
+                            "id": str(uuid.uuid4()),
+                            "object": "chat.completion",
+                            "model": request.get("model", "fake"),
+                            "created": int(time.time()),
+                            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+                            "choices": [{
+                                "index": 0,
+                                "finish_reason": "stop",
+                                "message": {"role": "assistant", "content": server.answer},
+                            }],
+                        })
+                else:
+                    self._send_json(404, {"message": f"unknown path {self.path}"})
+
+            def do_GET(self):
+                if self._begin() is None:
+                    return
+                match = re.fullmatch(r"/v1/files/([^/]+)/url", self.path.split("?")[0])
+                if match:
+                    self._send_json(200, {"url": f"{server.url}/signed/{match.group(1)}"})
+                else:
+                    self._send_json(404, {"message": f"unknown path {self.path}"})
+
+            def _stream(self, request):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                def send(data):
+                    chunk = f"data: {data}\n\n".encode()
+                    self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                    self.wfile.flush()
+
+                chunk_id = str(uuid.uuid4())
+                tokens = re.findall(r"\S+\s*|\s+", server.answer)
+                for i, token in enumerate(tokens):
+                    send(json.dumps({
+                        "id": chunk_id,
+                        "model": request.get("model", "fake"),
+                        "choices": [{
+                            "index": 0,
+                            "delta": {"content": token},
+                            "finish_reason": "stop" if i == len(tokens) - 1 else None,
+                        }],
+                    }))
+                send("[DONE]")
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+        return Handler
@@ -0,0 +1,251 @@
+# src/ingest_jobs.py
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from src import vector_store
+from src.tracing import trace
+
+JOBS_FILE = "jobs.sqlite"
+JOBS_DIR = "jobs"            # db/jobs/<id>.pdf while pending, <id>.md once extracted
+MAX_INGEST_WORKERS = 2       # PDFs processed at once; each fans out its own page ranges
+
+QUEUED, EXTRACTING, EMBEDDING, INDEXED, FAILED = "queued", "extracting", "embedding", "indexed", "failed"
+ACTIVE = (QUEUED, EXTRACTING, EMBEDDING)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    user TEXT,
+    metadata TEXT NOT NULL,
+    status TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    new_chunks INTEGER NOT NULL DEFAULT 0,
+    failed_ranges TEXT NOT NULL DEFAULT '[]',
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+_COLUMNS = ("id", "file_name", "sha256", "user", "metadata", "status", "done", "total",
+            "new_chunks", "failed_ranges", "error", "created_at", "updated_at")
+
+_pool = None
+_running = set()
+_lock = threading.Lock()
+
+
+def jobs_dir():
+    return os.path.join(vector_store.DB_DIR, JOBS_DIR)
+
+
+def _connect():
+    os.makedirs(vector_store.DB_DIR, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(vector_store.DB_DIR, JOBS_FILE), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(_SCHEMA)
+    return conn
+
+
+def _to_job(record):
+    job = dict(zip(_COLUMNS, record))
+    job["metadata"] = json.loads(job["metadata"])
+    job["failed_ranges"] = json.loads(job["failed_ranges"])
+    return job
+
+
+def _update(job_id, **fields):
+    fields["updated_at"] = time.time()
+    if "failed_ranges" in fields:
+        fields["failed_ranges"] = json.dumps(fields["failed_ranges"])
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(f"UPDATE jobs SET {', '.join(f'{k} = ?' for k in fields)} WHERE id = ?",
+                         (*fields.values(), job_id))
+    finally:
+        conn.close()
+
+
+def get_job(job_id):
+    conn = _connect()
+    try:
+        record = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    return _to_job(record) if record else None
+
+
+def list_jobs(user=None, limit=20):
+    """Most recent jobs first, optionally only `user`'s."""
+    query = f"SELECT {', '.join(_COLUMNS)} FROM jobs"
+    args = ()
+    if user is not None:
+        query += " WHERE user = ?"
+        args = (user,)
+    conn = _connect()
+    try:
+        records = conn.execute(query + " ORDER BY created_at DESC LIMIT ?", (*args, limit)).fetchall()
+    finally:
+        conn.close()
+    return [_to_job(r) for r in records]
+
+
+def markdown_path(job_id):
+    return os.path.join(jobs_dir(), f"{job_id}.md")
+
+
+def _pdf_path(job_id):
+    return os.path.join(jobs_dir(), f"{job_id}.pdf")
+
+
+def _executor():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=MAX_INGEST_WORKERS, thread_name_prefix="ingest")
+        return _pool
+
+
+def _schedule(job_id):
+    with _lock:
+        if job_id in _running:
+            return False
+        _running.add(job_id)
+    _executor().submit(_run_safely, job_id)
+    return True
+
+
+def submit_job(file_name, pdf_bytes, metadata=None, user=None):
+    """Queue a PDF for extraction and indexing and return its job id at once.
+
+    The same PDF submitted again by the same user while their earlier job
+    for it is queued, running or failed returns that job; failed jobs are
+    restarted with `retry_job`. Indexed jobs are not reused, so a PDF can be
+    ingested again after a rebuild or clean.
+    """
+    digest = hashlib.sha256(pdf_bytes).hexdigest()
+    conn = _connect()
+    try:
+        existing = conn.execute(
+            "SELECT id FROM jobs WHERE sha256 = ? AND user IS ? AND status != ? ORDER BY created_at DESC LIMIT 1",
+            (digest, user, INDEXED),
+        ).fetchone()
+        if existing:
+            return existing[0]
+
+        job_id = uuid.uuid4().hex[:12]
+        os.makedirs(jobs_dir(), exist_ok=True)
+        tmp_path = f"{_pdf_path(job_id)}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(pdf_bytes)
+        os.replace(tmp_path, _pdf_path(job_id))
+        now = time.time()
+        with conn:
+            conn.execute(
+                "INSERT INTO jobs (id, file_name, sha256, user, metadata, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, file_name, digest, user, json.dumps(metadata or {"role": "analyst"}), QUEUED, now, now),
+            )
+    finally:
+        conn.close()
+    _schedule(job_id)
+    return job_id
+
+
+def resume_jobs():
+    """Reschedule jobs a previous process left queued or half done. Returns their ids."""
+    conn = _connect()
+    try:
+        ids = [r[0] for r in conn.execute(
+            f"SELECT id FROM jobs WHERE status IN ({', '.join('?' for _ in ACTIVE)}) ORDER BY created_at", ACTIVE
+        )]
+    finally:
+        conn.close()
+    return [job_id for job_id in ids if _schedule(job_id)]
+
+
+def retry_job(job_id):
+    """Queue a failed job again; its PDF is kept until it is indexed."""
+    job = get_job(job_id)
+    if job is None or job["status"] != FAILED:
+        return False
+    _update(job_id, status=QUEUED, error=None, failed_ranges=[])
+    return _schedule(job_id)
+
+
+def _run_safely(job_id):
+    try:
+        run_job(job_id)
+    except Exception as e:
+        traceback.print_exc()
+        _update(job_id, status=FAILED, error=f"{type(e).__name__}: {e}")
+    finally:
+        with _lock:
+            _running.discard(job_id)
+
+
+def run_job(job_id):
+    """Extract every page range, then index the extracted markdown.
+
+    The job is indexed only when every range was extracted; otherwise what
+    was extracted is indexed and the job fails until retried. Extraction results are in the parse cache and indexing skips chunks that
+    are already stored, so a job restarted halfway only redoes what is missing.
+    """
+    from src.pdf_parser import extract_pdf_in_ranges, save_parts_to_vector_db
+
+    job = get_job(job_id)
+    with open(_pdf_path(job_id), "rb") as f:
+        upload = io.BytesIO(f.read())
+    upload.name = job["file_name"]
+
+    with trace("ingest_job", job=job_id, file=job["file_name"]):
+        _update(job_id, status=EXTRACTING, done=0, total=0, error=None)
+        parts, failed = [], []
+        results = extract_pdf_in_ranges(upload, metadata=job["metadata"], local_first=True, index=False)
+        for done, result in enumerate(results, start=1):
+            if result["error"] is not None:
+                failed.append({"pages": result["pages"], "error": f"{type(result['error']).__name__}: {result['error']}"})
+            elif result["markdown"]:
+                parts.append(result)
+            _update(job_id, done=done, total=result["total_ranges"], failed_ranges=failed)
+
+        parts.sort(key=lambda r: int(r["pages"].split("–")[0]))
+        with open(markdown_path(job_id), "w", encoding="utf-8") as f:
+            f.write("\n\n".join(r["markdown"] for r in parts))
+
+        # One ingest for the whole PDF, so each shard's index files are written once
+        _update(job_id, status=EMBEDDING, done=0, total=len(parts))
+        new_docs = save_parts_to_vector_db([(r["markdown"], r["metadata"]) for r in parts])
+        _update(job_id, done=len(parts), new_chunks=len(new_docs))
+
+    if failed:
+        # The PDF is kept so a retry re-runs the missing ranges; the parse cache skips the rest
+        _update(job_id, status=FAILED,
+                error=f"{len(failed)} page range(s) could not be extracted; the other {len(parts)} were indexed."
+                if parts else "No page range could be extracted.")
+    elif parts:
+        _update(job_id, status=INDEXED)
+        os.remove(_pdf_path(job_id))
+    else:
+        _update(job_id, status=FAILED, error="No page range could be extracted.")
+
+
+def wait_for(job_id, timeout=60.0, interval=0.05):
+    """Block until the job has finished (for tools and tests). Returns the job."""
+    deadline = time.monotonic() + timeout
+    while True:
+        job = get_job(job_id)
+        if job["status"] not in ACTIVE or time.monotonic() > deadline:
+            return job
+        time.sleep(interval)
@@ -0,0 +1,115 @@
+# src/lexical_index.py
+import heapq
+import math
+import re
+from collections import Counter
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+DIGIT_GROUP_RE = re.compile(r"(?<=\d),(?=\d)")
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-/&.'][a-z0-9]+)*%?")
+PART_RE = re.compile(r"[-/&]")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "by", "for", "from", "how", "in", "is", "it",
+    "much", "of", "on", "or", "the", "to", "was", "were", "what", "which", "with",
+}
+
+
+def tokenize(text):
+    """Lowercased terms that keep financial tokens whole.
+
+    `Debt/EBITDA`, `Stock-in-Trade` and `FY2023–24` stay single terms (their
+    parts are added too), Indian digit grouping is dropped so `1,52,770` is
+    one number, and `FY24`/`FY2023-24` also yield the bare year.
+    """
+    text = text.lower().replace("–", "-").replace("—", "-").replace("−", "-")
+    text = DIGIT_GROUP_RE.sub("", text)
+    terms = []
+    for token in TOKEN_RE.findall(text):
+        if token in STOPWORDS:
+            continue
+        terms.append(token)
+        if PART_RE.search(token):
+            terms.extend(p for p in PART_RE.split(token) if p and p not in STOPWORDS)
+        if token.startswith("fy") and token[2:3].isdigit():
+            terms.append(token[2:])
+    return terms
+
+
+def term_counts(content):
+    """`(length, {term: tf})` for one doc, as stored in the postings table."""
+    terms = tokenize(content)
+    return len(terms), Counter(terms)
+
+
+def empty_stats():
+    return {"docs": 0, "length": 0, "df": {}}
+
+
+def merge_stats(stats):
+    """Corpus statistics of several stores (shards) searched as one."""
+    merged = empty_stats()
+    for s in stats:
+        merged["docs"] += s["docs"]
+        merged["length"] += s["length"]
+        for term, df in s["df"].items():
+            merged["df"][term] = merged["df"].get(term, 0) + df
+    return merged
+
+
+class LexicalIndex:
+    """BM25 over the term/row/tf postings kept in a doc store, keyed by FAISS row.
+
+    Postings are written with the docs (see `DocStore.append`), so an append
+    only inserts the new docs' rows instead of re-serialising the index.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def stats(self, query):
+        """Doc count, total length and per-term document frequency for `query`."""
+        docs, length, df = self.store.term_stats(set(tokenize(query)))
+        return {"docs": docs, "length": length, "df": df}
+
+    def scores(self, query, rows=None, stats=None):
+        """BM25 score per matching row, limited to `rows` when given.
+
+        `stats` (from `merge_stats`) puts several stores on one scale; by
+        default this store's own statistics are used.
+        """
+        stats = stats or self.stats(query)
+        n = stats["docs"]
+        if not n:
+            return {}
+        allowed = None if rows is None else set(int(r) for r in rows)
+        avg_length = stats["length"] / n or 1.0
+        scores = {}
+        for term in set(tokenize(query)):
+            df = stats["df"].get(term)
+            if not df:
+                continue
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for row, tf, length in self.store.postings(term):
+                if allowed is not None and row not in allowed:
+                    continue
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+                scores[row] = scores.get(row, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+        return scores
+
+    def search(self, query, k, rows=None, stats=None):
+        """Top-k `(score, row)` pairs, best first; ties go to the lower row."""
+        best = heapq.nsmallest(k, ((-s, r) for r, s in self.scores(query, rows, stats).items()))
+        return [(-s, r) for s, r in best]
+
+
+def reciprocal_rank_fusion(rankings, weights, k=60):
+    """Fuse ranked row lists: score = sum(weight / (k + rank)), rank from 1."""
+    fused = {}
+    for ranking, weight in zip(rankings, weights):
+        if not weight:
+            continue
+        for rank, row in enumerate(ranking, start=1):
+            fused[row] = fused.get(row, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,208 @@
+# src/llm_client.py
+import os
+import random
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+
+import httpx
+from mistralai import Mistral
+from mistralai.models import SDKError
+
+REQUESTS_PER_SECOND = 4.0       # sustained rate across all sessions in this process
+BURST = 8                       # token bucket capacity
+MAX_CONCURRENT_CALLS = 8        # in-flight calls across all sessions
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5              # seconds; full jitter on base * 2**attempt
+BACKOFF_CAP = 8.0
+TIMEOUT_SECONDS = 120.0
+POOL_CONNECTIONS = 16
+RETRY_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class CallMetrics:
+    """Per-call latency log with a per-operation summary."""
+
+    def __init__(self, maxlen=1000):
+        self.calls = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, op, seconds, ok, attempt, status=None):
+        with self._lock:
+            self.calls.append({"op": op, "seconds": seconds, "ok": ok, "attempt": attempt, "status": status})
+
+    def summary(self):
+        with self._lock:
+            calls = list(self.calls)
+        out = {}
+        for op in sorted({c["op"] for c in calls}):
+            ok = sorted(c["seconds"] for c in calls if c["op"] == op and c["ok"])
+            failed = [c for c in calls if c["op"] == op and not c["ok"]]
+
+            def pct(p):
+                return ok[min(len(ok) - 1, int(p * len(ok)))] if ok else None
+
+            out[op] = {
+                "calls": len(ok) + len(failed),
+                "errors": len(failed),
+                "retried": sum(1 for c in calls if c["op"] == op and c["attempt"] > 0),
+                "p50": pct(0.50),
+                "p95": pct(0.95),
+                "max": ok[-1] if ok else None,
+            }
+        return out
+
+
+def _status_of(exc):
+    if isinstance(exc, SDKError):
+        return exc.status_code
+    return None
+
+
+def is_retryable(exc):
+    if isinstance(exc, SDKError):
+        return exc.status_code in RETRY_STATUS
+    return isinstance(exc, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError))
+
+
+class PooledMistral:
+    """Mistral SDK client with keep-alive pooling, rate limiting and retries.
+
+    Exposes the same `files.upload`, `files.get_signed_url`, `chat.complete`
+    and `chat.stream` calls as `mistralai.Mistral`, so it drops into the
+    existing call sites. One instance is meant to be shared process-wide.
+    """
+
+    def __init__(self, api_key, server_url=None, rate=REQUESTS_PER_SECOND, burst=BURST,
+                 max_concurrent=MAX_CONCURRENT_CALLS, max_retries=MAX_RETRIES,
+                 timeout=TIMEOUT_SECONDS, pool_connections=POOL_CONNECTIONS,
+                 backoff_base=BACKOFF_BASE, backoff_cap=BACKOFF_CAP):
+        self.http = httpx.Client(
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(max_connections=pool_connections, max_keepalive_connections=pool_connections),
+        )
+        self.sdk = Mistral(api_key=api_key, server_url=server_url, client=self.http,
+                           timeout_ms=int(timeout * 1000))
+        self.bucket = TokenBucket(rate, burst)
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.metrics = CallMetrics()
+
+        self.files = SimpleNamespace(upload=self._upload, get_signed_url=self._signed_url)
+        self.chat = SimpleNamespace(complete=self._complete, stream=self._stream)
+
+    def close(self):
+        self.http.close()
+
+    def _backoff(self, attempt):
+        time.sleep(random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt)))
+
+    def _call(self, op, fn, before_attempt=None):
+        for attempt in range(self.max_retries + 1):
+            if before_attempt:
+                before_attempt()
+            self.bucket.acquire()
+            with self.slots:
+                start = time.perf_counter()
+                try:
+                    result = fn()
+                except Exception as e:
+                    self.metrics.record(op, time.perf_counter() - start, False, attempt, _status_of(e))
+                    if attempt == self.max_retries or not is_retryable(e):
+                        raise
+                else:
+                    self.metrics.record(op, time.perf_counter() - start, True, attempt)
+                    return result
+            self._backoff(attempt)
+
+    def _upload(self, file, purpose=None, **kwargs):
+        content = file.get("content") if isinstance(file, dict) else None
+
+        def rewind():
+            # Retries must re-send the whole file.
+            if hasattr(content, "seek"):
+                content.seek(0)
+
+        return self._call("files.upload", lambda: self.sdk.files.upload(file=file, purpose=purpose, **kwargs), rewind)
+
+    def _signed_url(self, file_id, **kwargs):
+        return self._call("files.get_signed_url", lambda: self.sdk.files.get_signed_url(file_id=file_id, **kwargs))
+
+    def _complete(self, model, messages, **kwargs):
+        return self._call("chat.complete", lambda: self.sdk.chat.complete(model=model, messages=messages, **kwargs))
+
+    def _stream(self, model, messages, **kwargs):
+        """Stream events; retries only happen before the first event arrives."""
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            with self.slots:
+                start = time.perf_counter()
+                try:
+                    events = self.sdk.chat.stream(model=model, messages=messages, **kwargs)
+                    iterator = iter(events)
+                    first = next(iterator, None)
+                except Exception as e:
+                    self.metrics.record("chat.stream", time.perf_counter() - start, False, attempt, _status_of(e))
+                    if attempt == self.max_retries or not is_retryable(e):
+                        raise
+                else:
+                    ok = False
+                    try:
+                        if first is not None:
+                            yield first
+                            yield from iterator
+                        ok = True
+                    finally:
+                        self.metrics.record("chat.stream", time.perf_counter() - start, ok, attempt)
+                    return
+            self._backoff(attempt)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _api_key():
+    try:
+        import streamlit as st
+        return st.secrets["MISTRAL_API_KEY"]
+    except Exception:
+        return os.environ.get("MISTRAL_API_KEY")
+
+
+def get_client():
+    """The shared pooled client. `MISTRAL_SERVER_URL` points it at another server, e.g. the fake one."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = PooledMistral(api_key=_api_key(), server_url=os.environ.get("MISTRAL_SERVER_URL"))
+    return _client
+
+
+def llm_metrics():
+    return _client.metrics.summary() if _client is not None else {}
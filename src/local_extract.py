@@ -0,0 +1,136 @@
+# src/local_extract.py
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+
+STATEMENT_PATTERNS = {
+    "balance_sheet": re.compile(r"balance\s+sheet|statement\s+of\s+financial\s+position", re.I),
+    "profit_and_loss": re.compile(r"profit\s*(and|&)\s*loss|statement\s+of\s+profit|income\s+statement", re.I),
+    "cash_flow": re.compile(r"cash\s+flows?", re.I),
+}
+NUMBER_RE = re.compile(r"^[(\-−+]?\s*(₹\s*)?\d[\d,]*(\.\d+)?\s*\)?\s*(%|x|cr|crore|lakh|mn)?$", re.I)
+
+MIN_TABLE_ROWS = 3          # header + at least two data rows
+MIN_NUMERIC_SHARE = 0.5     # of the non-empty value cells (all but the first column)
+MAX_UNLABELLED_SHARE = 0.3  # of the rows with values, those with an empty label
+MAX_LABEL_LINES = 2         # a longer label is several line items merged into one cell
+MIN_TEXT_CHARS = 20         # below this a page is treated as scanned
+PAGES_PER_TASK = 8
+
+
+def detect_statement(text):
+    for statement, pattern in STATEMENT_PATTERNS.items():
+        if pattern.search(text):
+            return statement
+    return None
+
+
+def _clean_cell(cell):
+    if cell is None:
+        return ""
+    return re.sub(r"\s+", " ", str(cell)).strip().replace("|", "/")
+
+
+def table_to_markdown(rows):
+    """Render rows as the pipe table format used throughout the corpus."""
+    rows = [[_clean_cell(c) for c in row] for row in rows]
+    width = max(len(r) for r in rows)
+    rows = [r + [""] * (width - len(r)) for r in rows]
+    lines = ["| " + " | ".join(rows[0]) + " |", "|" + "|".join(["---"] * width) + "|"]
+    lines += ["| " + " | ".join(r) + " |" for r in rows[1:]]
+    return "\n".join(lines)
+
+
+def _is_blank(value):
+    return not value or value in ("-", "—", "–")
+
+
+def _is_garbled(rows):
+    """True when find_tables merged several line items into one row.
+
+    Such tables stack labels in one cell ("Assets\nNon-Current Assets\n...")
+    and numbers in another ("5,70,503 75,351"), leaving value-only rows
+    whose labels are lost.
+    """
+    body = rows[1:]
+    for row in body:
+        if row[0] and len([l for l in str(row[0]).splitlines() if l.strip()]) > MAX_LABEL_LINES:
+            return True
+        for cell in row[1:]:
+            if sum(1 for token in str(cell or "").split() if NUMBER_RE.match(token)) > 1:
+                return True
+    with_values = [row for row in body if any(not _is_blank(_clean_cell(c)) for c in row[1:])]
+    unlabelled = sum(1 for row in with_values if not _clean_cell(row[0]))
+    return bool(with_values) and unlabelled / len(with_values) > MAX_UNLABELLED_SHARE
+
+
+def is_confident_table(rows):
+    if len(rows) < MIN_TABLE_ROWS or max(len(r) for r in rows) < 2:
+        return False
+    if _is_garbled(rows):
+        return False
+    values = [_clean_cell(c) for r in rows[1:] for c in r[1:]]
+    values = [v for v in values if not _is_blank(v)]
+    if not values:
+        return False
+    numeric = sum(1 for v in values if NUMBER_RE.match(v))
+    return numeric / len(values) >= MIN_NUMERIC_SHARE
+
+
+def parse_page(page):
+    """Classify one page as `parsed`, `fallback` (needs remote OCR) or `empty`."""
+    text = page.get_text()
+    result = {"page": page.number, "status": "empty", "markdown": "", "statement": None}
+
+    if len(text.strip()) < MIN_TEXT_CHARS:
+        # No usable text layer: scanned pages go to OCR, blank pages are skipped.
+        if page.get_images():
+            result["status"] = "fallback"
+        return result
+
+    result["statement"] = detect_statement(text)
+    tables = [t.extract() for t in page.find_tables().tables]
+    tables = [rows for rows in tables if rows]
+    confident = [rows for rows in tables if is_confident_table(rows)]
+
+    if confident and len(confident) == len(tables):
+        result["status"] = "parsed"
+        result["markdown"] = "\n\n".join(table_to_markdown(rows) for rows in confident)
+    else:
+        # Statements, doubtful tables and narrative KPI pages (ARPU, customer counts)
+        result["status"] = "fallback"
+    return result
+
+
+def _parse_pages(pdf_bytes, page_numbers):
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        return [parse_page(doc.load_page(n)) for n in page_numbers]
+    finally:
+        doc.close()
+
+
+def extract_local(pdf_bytes, max_workers=None):
+    """Parse every page with PyMuPDF, in a process pool for multi-batch PDFs.
+
+    Workers are spawned, not forked: this runs on ingest threads inside the
+    multi-threaded app, where forking can deadlock.
+
+    Returns one result dict per page, ordered by page number.
+    """
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        page_count = len(doc)
+    batches = [
+        list(range(start, min(start + PAGES_PER_TASK, page_count)))
+        for start in range(0, page_count, PAGES_PER_TASK)
+    ]
+    if len(batches) <= 1:
+        return _parse_pages(pdf_bytes, batches[0]) if batches else []
+
+    max_workers = max_workers or min(len(batches), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        parts = pool.map(_parse_pages, [pdf_bytes] * len(batches), batches)
+        return [page for part in parts for page in part]
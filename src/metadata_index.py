@@ -0,0 +1,94 @@
+# src/metadata_index.py
+import json
+import os
+
+import numpy as np
+
+FIELDS = ("role", "company", "statement", "fiscal_year")
+
+
+def normalize_roles(value):
+    """`"ceo"`, `["ceo", "analyst"]` and `None` all become a list of role names."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = [value]
+    return [str(v).strip() for v in value if str(v).strip()]
+
+
+def normalize_value(field, value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    if field == "fiscal_year":
+        # "FY2023–24", "2023—24" and "2023-24" are the same year.
+        value = value.replace("–", "-").replace("—", "-")
+        if value.upper().startswith("FY"):
+            value = value[2:].strip()
+    return value or None
+
+
+def doc_tags(metadata):
+    tags = [("role", r) for r in normalize_roles(metadata.get("role"))]
+    for field in FIELDS[1:]:
+        value = normalize_value(field, metadata.get(field))
+        if value is not None:
+            tags.append((field, value))
+    return tags
+
+
+class MetadataIndex:
+    """Maps (field, value) to the FAISS rows of the docs carrying that tag."""
+
+    def __init__(self, postings=None):
+        self.postings = {field: {} for field in FIELDS}
+        for field, values in (postings or {}).items():
+            for value, rows in values.items():
+                self.postings.setdefault(field, {})[value] = set(rows)
+
+    def add(self, row, metadata):
+        for field, value in doc_tags(metadata):
+            self.postings[field].setdefault(value, set()).add(row)
+
+    def rows_for(self, role=None, company=None, statement=None, fiscal_year=None):
+        """Sorted int64 rows matching every given filter, or None if unfiltered."""
+        wanted = [
+            ("role", role and str(role).strip()),
+            ("company", normalize_value("company", company)),
+            ("statement", normalize_value("statement", statement)),
+            ("fiscal_year", normalize_value("fiscal_year", fiscal_year)),
+        ]
+        wanted = [(field, value) for field, value in wanted if value]
+        if not wanted:
+            return None
+
+        # Intersect starting from the smallest posting list.
+        sets = sorted((self.postings[f].get(v, set()) for f, v in wanted), key=len)
+        rows = set(sets[0])
+        for other in sets[1:]:
+            rows &= other
+        return np.array(sorted(rows), dtype="int64")
+
+    def to_json(self):
+        return {
+            field: {value: sorted(rows) for value, rows in values.items()}
+            for field, values in self.postings.items()
+        }
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def from_docs(cls, docs):
+        meta = cls()
+        for row, doc in enumerate(docs):
+            meta.add(row, doc.get("metadata", {}))
+        return meta
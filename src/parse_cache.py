@@ -0,0 +1,80 @@
+# src/parse_cache.py
+import hashlib
+import os
+import threading
+import time
+
+CACHE_DIR = "cache/parsed"
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+
+_evict_lock = threading.Lock()
+
+
+def cache_key(pdf_bytes, prompt, model):
+    """SHA-256 over the PDF bytes, the extraction prompt and the model name."""
+    h = hashlib.sha256()
+    h.update(hashlib.sha256(pdf_bytes).digest())
+    h.update(prompt.encode())
+    h.update(b"\0")
+    h.update(model.encode())
+    return h.hexdigest()
+
+
+def entry_path(key, cache_dir=None):
+    return os.path.join(cache_dir or CACHE_DIR, key[:2], f"{key}.md")
+
+
+def get(key, cache_dir=None):
+    path = entry_path(key, cache_dir)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            markdown = f.read()
+    except FileNotFoundError:
+        return None
+    # Bump mtime so eviction drops the least recently used entries first.
+    now = time.time()
+    try:
+        os.utime(path, (now, now))
+    except FileNotFoundError:
+        pass
+    return markdown
+
+
+def put(key, markdown, cache_dir=None, max_bytes=None):
+    path = entry_path(key, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(markdown)
+    os.replace(tmp_path, path)
+    evict(cache_dir, max_bytes)
+    return path
+
+
+def evict(cache_dir=None, max_bytes=None):
+    """Delete least recently used entries until the cache fits in `max_bytes`."""
+    cache_dir = cache_dir or CACHE_DIR
+    max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    with _evict_lock:
+        entries = []
+        total = 0
+        for root, _, files in os.walk(cache_dir):
+            for name in files:
+                if not name.endswith(".md"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -1,112 +1,345 @@
 # src/pdf_parser.py
-from mistralai import Mistral
-import tempfile, uuid, os, re, json
-from sentence_transformers import SentenceTransformer
-import numpy as np, faiss
-import streamlit as st
+import tempfile, uuid, os, re, io, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PyPDF2 import PdfReader, PdfWriter
+from src import answer_cache, parse_cache, query_cache
+from src.llm_client import get_client
+from src.local_extract import extract_local
+from src.shards import ingest_sharded
+from src.table_store import save_tables
+from src.dashboard_views import clear_views, refresh_views
+from src.tracing import bind, record_stage, span
 
 
-def extract_text_from_pdf(uploaded_file):
+EXTRACTION_MODEL = "ministral-8b-latest"
+PAGES_PER_RANGE = 4
+MAX_EXTRACTION_WORKERS = 4
+EXTRACTION_PROMPT = (
+    "Extract all financial tables (Balance Sheet, P&L, Cash Flow) and KPIs "
+    "in clean markdown format suitable for dashboards and charting."
+)
+
+
+def _extract_remote(pdf_bytes, file_name, prompt_text, model, client=None):
+    client = client or get_client()
     temp_path = os.path.join(tempfile.gettempdir(), f"upload_{uuid.uuid4()}.pdf")
 
     with open(temp_path, "wb") as f:
-        f.write(uploaded_file.read())
+        f.write(pdf_bytes)
 
-    client = Mistral(api_key=st.secrets["MISTRAL_API_KEY"])
+    try:
+        with open(temp_path, "rb") as f, span("ocr_upload"):
+            file_upload = client.files.upload(
+                file={
+                    "file_name": file_name,
+                    "content": f
+                },
+                purpose="ocr"
+            )
 
-    with open(temp_path, "rb") as f:
-        file_upload = client.files.upload(
-            file={
-                "file_name": uploaded_file.name,
-                "content": f
-            },
-            purpose="ocr"
-        )
+        # ✅ Correct: use keyword argument
+        with span("ocr_signed_url"):
+            signed_url = client.files.get_signed_url(file_id=file_upload.id).url
+
+        with span("ocr_extract"):
+            response = client.chat.complete(
+                model=model,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": prompt_text},
+                            {"type": "document_url", "document_url": signed_url}
+                        ]
+                    }
+                ]
+            )
+    except BaseException:
+        # Callers only get the path (and remove it) on success
+        os.remove(temp_path)
+        raise
 
-    # ✅ Correct: use keyword argument
-    signed_url = client.files.get_signed_url(file_id=file_upload.id).url
+    return response.choices[0].message.content.strip(), temp_path
 
-    prompt_text = (
-        "Extract all financial tables (Balance Sheet, P&L, Cash Flow) and KPIs "
-        "in clean markdown format suitable for dashboards and charting."
-    )
 
-    response = client.chat.complete(
-        model="ministral-8b-latest",
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": prompt_text},
-                    {"type": "document_url", "document_url": signed_url}
-                ]
-            }
-        ]
+def extract_text_from_pdf(uploaded_file, prompt_text=EXTRACTION_PROMPT, model=EXTRACTION_MODEL):
+    """Return `(markdown, path)` for an uploaded PDF.
+
+    Results are cached by the SHA-256 of the PDF bytes, prompt and model, so
+    re-uploading a report skips the OCR round trip; `path` is then the
+    cached markdown file instead of a temp copy of the PDF.
+    """
+    pdf_bytes = uploaded_file.read()
+    key = parse_cache.cache_key(pdf_bytes, prompt_text, model)
+
+    cached = parse_cache.get(key)
+    if cached is not None:
+        print(f"⚡ Parse cache hit for {uploaded_file.name}")
+        return cached, parse_cache.entry_path(key)
+
+    markdown, temp_path = _extract_remote(pdf_bytes, uploaded_file.name, prompt_text, model)
+    if markdown:
+        parse_cache.put(key, markdown)
+    return markdown, temp_path
+
+
+def count_pdf_pages(pdf_bytes):
+    return len(PdfReader(io.BytesIO(pdf_bytes)).pages)
+
+
+def split_pdf_pages(pdf_bytes, pages_per_range=PAGES_PER_RANGE, pages=None):
+    """Split a PDF into `(first, last, bytes)` parts of at most `pages_per_range` pages.
+
+    Page numbers are 0-based and inclusive, like output/pages_0_3.pdf. With
+    `pages`, only those pages are kept and each part is a contiguous run.
+    """
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    if pages is None:
+        pages = range(len(reader.pages))
+
+    runs = []
+    for n in sorted(pages):
+        if runs and n == runs[-1][-1] + 1 and len(runs[-1]) < pages_per_range:
+            runs[-1].append(n)
+        else:
+            runs.append([n])
+
+    parts = []
+    for run in runs:
+        writer = PdfWriter()
+        for n in run:
+            writer.add_page(reader.pages[n])
+        buf = io.BytesIO()
+        writer.write(buf)
+        parts.append((run[0], run[-1], buf.getvalue()))
+    return parts
+
+
+def _page_label(first, last):
+    return f"{first + 1}–{last + 1}" if last > first else str(first + 1)
+
+
+def _extract_range(pdf_bytes, part, file_name, prompt_text, model, client):
+    first, last, part_bytes = part
+    key = parse_cache.cache_key(pdf_bytes, f"{prompt_text}\npages {first}-{last}", model)
+    cached = parse_cache.get(key)
+    if cached is not None:
+        return cached
+
+    stem = os.path.splitext(file_name)[0]
+    markdown, temp_path = _extract_remote(
+        part_bytes, f"{stem}_pages_{first}_{last}.pdf", prompt_text, model, client=client
     )
+    os.remove(temp_path)
+    if markdown:
+        parse_cache.put(key, markdown)
+    return markdown
 
-    return response.choices[0].message.content.strip(), temp_path
+
+def extract_pdf_in_ranges(uploaded_file, metadata=None, pages_per_range=PAGES_PER_RANGE,
+                          max_workers=MAX_EXTRACTION_WORKERS, prompt_text=EXTRACTION_PROMPT,
+                          model=EXTRACTION_MODEL, client=None, local_first=False, index=True):
+    """Extract a large PDF range by range and index each range as it finishes.
+
+    Ranges run concurrently on at most `max_workers` threads. Yields one dict
+    per range in completion order with its 1-based `pages`, the `markdown`,
+    the chunks it added (`new_docs`), any `error` and the `source`.
+
+    With `local_first`, PyMuPDF parses the financial tables of digitally
+    generated pages first (see src/local_extract.py); only pages it cannot
+    parse with confidence are sent to the remote model. With `index=False`
+    nothing is saved; each result carries the `metadata` to save it with.
+    """
+    pdf_bytes = uploaded_file.read()
+    base_metadata = metadata or {"role": "analyst"}
+
+    local_pages = []
+    remote_pages = None
+    if local_first:
+        with span("local_extract"):
+            pages = extract_local(pdf_bytes)
+        local_pages = [p for p in pages if p["status"] == "parsed"]
+        remote_pages = [p["page"] for p in pages if p["status"] == "fallback"]
+    parts = split_pdf_pages(pdf_bytes, pages_per_range, pages=remote_pages)
+    total = len(local_pages) + len(parts)
+
+    for page in local_pages:
+        label = _page_label(page["page"], page["page"])
+        page_metadata = {**base_metadata, "pages": label}
+        if page["statement"] and "statement" not in base_metadata:
+            page_metadata["statement"] = page["statement"]
+        result = {"pages": label, "markdown": page["markdown"], "new_docs": [], "error": None,
+                  "total_ranges": total, "source": "local", "metadata": page_metadata}
+        try:
+            if index:
+                result["new_docs"] = save_to_vector_db(page["markdown"], metadata=page_metadata)
+        except Exception as e:
+            result["error"] = e
+        yield result
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Workers record their OCR spans under the caller's request id
+        futures = {
+            pool.submit(bind(_extract_range), pdf_bytes, part, uploaded_file.name, prompt_text, model, client): part
+            for part in parts
+        }
+        for future in as_completed(futures):
+            first, last, _ = futures[future]
+            pages = _page_label(first, last)
+            result = {"pages": pages, "markdown": "", "new_docs": [], "error": None,
+                      "total_ranges": total, "source": "remote", "metadata": {**base_metadata, "pages": pages}}
+            try:
+                result["markdown"] = future.result()
+                if result["markdown"] and index:
+                    result["new_docs"] = save_to_vector_db(result["markdown"], metadata=result["metadata"])
+            except Exception as e:
+                result["error"] = e
+            yield result
 
 
-def save_to_vector_db(text, metadata=None):
+def save_to_vector_db(text, metadata=None, rebuild=False):
+    """Chunk `text` and append the unseen chunks to the vector DB.
+
+    Only new chunks are embedded; pass `rebuild=True` to compact the docs
+    file and re-embed the whole corpus. Table chunks are also stored as
+    typed Parquet frames (see `src/table_store.py`).
+    """
+    return save_parts_to_vector_db([(text, metadata)], rebuild=rebuild)
+
+
+def save_parts_to_vector_db(parts, rebuild=False):
+    """`save_to_vector_db` for several `(text, metadata)` parts in one ingest.
+
+    The shard index files are written once for all parts instead of once
+    per part, which matters for a PDF extracted range by range.
+    """
     import hashlib
 
     def hash_id(content):
         return hashlib.md5(content.encode()).hexdigest()
 
-    os.makedirs("db", exist_ok=True)
-
-    # Chunk the content
-    chunks = re.split(r"\n{2,}", text.strip())
-    chunks = [c for c in chunks if len(c) > 50]
-
-    # Load existing docs if present
-    existing_docs = []
-    docs_path = "db/docs.jsonl"
-    if os.path.exists(docs_path):
-        with open(docs_path, "r", encoding="utf-8") as f:
-            existing_docs = [json.loads(l) for l in f]
-    existing_ids = {doc["id"] for doc in existing_docs}
-
-    # New + unique chunks
-    new_docs = []
-    for c in chunks:
-        doc_id = hash_id(c)
-        if doc_id not in existing_ids:
-            new_docs.append({
-                "id": doc_id,
-                "content": c,
-                "metadata": metadata or {"role": "analyst"}
-            })
-            existing_ids.add(doc_id)
-
-    all_docs = existing_docs + new_docs
-
-    # Save final docs
-    with open(docs_path, "w", encoding="utf-8") as f:
-        for doc in all_docs:
-            f.write(json.dumps(doc) + "\n")
-
-    # Rebuild FAISS
-    embedder = SentenceTransformer("./model_cache/all-MiniLM-L6-v2", device="cpu")
-    print("Model loaded successfully")
-
-    vectors = embedder.encode([d["content"] for d in all_docs])
-    index = faiss.IndexFlatL2(vectors.shape[1])
-    index.add(np.array(vectors).astype("float32"))
-    faiss.write_index(index, "db/vector_index.faiss")
-
-    print(f"✅ Saved {len(new_docs)} new chunks. Total index: {len(all_docs)}")
-
-
-
-def chat_with_context(query, context_text):
-    client = Mistral(api_key=st.secrets["MISTRAL_API_KEY"])
-    response = client.chat.complete(
-        model="ministral-8b-latest",
-        messages=[
-            {"role": "system", "content": "You are a helpful financial assistant. Use only the context provided."},
-            {"role": "user", "content": f"Context:\n{context_text[:8000]}"},
-            {"role": "user", "content": query}
-        ]
-    )
-    return response.choices[0].message.content.strip()
+    docs = []
+    for text, metadata in parts:
+        # Chunk the content
+        chunks = re.split(r"\n{2,}", text.strip())
+        chunks = [c for c in chunks if len(c) > 50]
+        docs.extend(
+            {"id": hash_id(c), "content": c, "metadata": metadata or {"role": "analyst"}}
+            for c in chunks
+        )
+    with span("embed_index"):
+        new_docs, total = ingest_sharded(docs, rebuild=rebuild)
+    if new_docs or rebuild:
+        # Before the views refresh, so they never read cached results
+        query_cache.invalidate()
+    if rebuild:
+        answer_cache.clear()
+    # Typed frames for the dashboard, so table chunks are never re-parsed on render
+    with span("store_tables"):
+        save_tables(docs)
+    # Only the dashboards whose role/company got new chunks are rebuilt
+    with span("refresh_views"):
+        if rebuild:
+            clear_views()
+        else:
+            refresh_views(new_docs)
+
+    print(f"✅ Saved {len(new_docs)} new chunks. Total index: {total}")
+    return new_docs
+
+
+
+CHAT_MODEL = "ministral-8b-latest"
+CHAT_SYSTEM_PROMPT = "You are a helpful financial assistant. Use only the context provided."
+
+# Most recent streamed answers: {"ttft": s, "total": s, "chars": n}.
+chat_timings = deque(maxlen=200)
+
+
+def _chat_messages(query, context_text):
+    return [
+        {"role": "system", "content": CHAT_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Context:\n{context_text}"},
+        {"role": "user", "content": query}
+    ]
+
+
+def _answer_sources(context_text, sources):
+    # Without the packed chunks, the context itself is the only source
+    return sources if sources else [{"id": "context", "content": context_text}]
+
+
+def cached_answer(query, context_text, role=None, company=None, sources=None):
+    """The answer cache entry for `query` in the role/company scope, else None.
+
+    `sources` are the packed chunks behind `context_text`. Without a `role`
+    the cache is not used.
+    """
+    if role is None:
+        return None
+    with span("answer_cache"):
+        return answer_cache.lookup(query, role, company, _answer_sources(context_text, sources))
+
+
+def chat_with_context(query, context_text, role=None, company=None, sources=None):
+    """Answer `query` from `context_text`.
+
+    With a `role`, near-identical questions already answered in that
+    role/company scope from the same chunks (`sources`, the packed hits)
+    are served from `src/answer_cache.py` without calling the model.
+    """
+    cached = cached_answer(query, context_text, role, company, sources)
+    if cached is not None:
+        return cached["answer"]
+
+    client = get_client()
+    with span("llm_chat"):
+        response = client.chat.complete(
+            model=CHAT_MODEL,
+            messages=_chat_messages(query, context_text)
+        )
+    answer = response.choices[0].message.content.strip()
+    if role is not None:
+        answer_cache.store(query, role, company, _answer_sources(context_text, sources), answer)
+    return answer
+
+
+def chat_with_context_stream(query, context_text, client=None, timings=None, role=None, company=None,
+                             sources=None):
+    """Yield the answer token by token as the model streams it.
+
+    Time to first token and total generation time are written into
+    `timings` (if given) and appended to `chat_timings` once the stream ends.
+    With a `role`, the answer cache is used as in `chat_with_context`; a
+    cached answer is yielded whole and its entry put in `timings["cached"]`.
+    """
+    timings = {} if timings is None else timings
+    cached = cached_answer(query, context_text, role, company, sources)
+    if cached is not None:
+        timings["cached"] = cached
+        yield cached["answer"]
+        return
+
+    client = client or get_client()
+    start = time.perf_counter()
+    parts = []
+
+    for event in client.chat.stream(model=CHAT_MODEL, messages=_chat_messages(query, context_text)):
+        delta = event.data.choices[0].delta.content if event.data.choices else None
+        if not delta:
+            continue
+        if "ttft" not in timings:
+            timings["ttft"] = time.perf_counter() - start
+        parts.append(delta)
+        yield delta
+
+    timings["total"] = time.perf_counter() - start
+    timings.setdefault("ttft", timings["total"])
+    answer = "".join(parts)
+    timings["chars"] = len(answer)
+    chat_timings.append(dict(timings))
+    record_stage("llm_first_token", timings["ttft"], start)
+    record_stage("llm_generation", timings["total"] - timings["ttft"], start + timings["ttft"])
+    if role is not None:
+        answer_cache.store(query, role, company, _answer_sources(context_text, sources), answer)
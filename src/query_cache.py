@@ -0,0 +1,90 @@
+# src/query_cache.py
+import threading
+import time
+from collections import OrderedDict
+
+QUERY_VECTOR_CACHE_SIZE = 2048
+QUERY_VECTOR_TTL = 24 * 3600     # seconds; vectors only change with the model
+RESULT_CACHE_SIZE = 512
+RESULT_TTL = 600                 # seconds; ingest also invalidates explicitly
+
+
+class TTLCache:
+    """Thread-safe LRU with a per-entry time to live and hit/miss counters."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expired = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._data[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else None,
+                "evictions": self.evictions,
+                "expired": self.expired,
+            }
+
+
+query_vectors = TTLCache(QUERY_VECTOR_CACHE_SIZE, QUERY_VECTOR_TTL)
+results = TTLCache(RESULT_CACHE_SIZE, RESULT_TTL)
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def generation():
+    return _generation
+
+
+def invalidate():
+    """Drop cached retrieval results; called whenever the corpus changes."""
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        results.clear()
+
+
+def cache_metrics():
+    return {"query_vectors": query_vectors.stats(), "results": results.stats(), "generation": _generation}
+
+
+def reset():
+    global _generation
+    for cache in (query_vectors, results):
+        cache.clear()
+        cache.hits = cache.misses = cache.evictions = cache.expired = 0
+    _generation = 0
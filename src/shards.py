@@ -0,0 +1,279 @@
+# src/shards.py
+import hashlib
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from filelock import FileLock
+
+from src import vector_store
+from src.doc_store import STORE_FILE, DocStore
+from src.lexical_index import LexicalIndex, merge_stats, reciprocal_rank_fusion
+from src.metadata_index import MetadataIndex, normalize_value
+from src.vector_store import (
+    HYBRID_CANDIDATES, LEGACY_DOCS_FILE, LEXICAL_WEIGHT, LOCK_FILE, RRF_K,
+    build_index, forget_db, get_doc_store, get_store, ingest_docs, rewrite_docs, write_index,
+)
+
+SHARDS_DIR = "shards"               # db/shards/<company>-<hash>/ holds a full vector store
+UNASSIGNED = "_unassigned"          # docs without a company
+SHARD_SEARCH_WORKERS = 8
+
+_pool = ThreadPoolExecutor(max_workers=SHARD_SEARCH_WORKERS, thread_name_prefix="shard-search")
+
+
+def _root(db_dir):
+    return db_dir or vector_store.DB_DIR
+
+
+def shard_name(company):
+    company = normalize_value("company", company)
+    if not company:
+        return UNASSIGNED
+    slug = re.sub(r"[^\w-]+", "_", company).strip("_")[:40]
+    return f"{slug}-{hashlib.md5(company.encode()).hexdigest()[:8]}"
+
+
+def shard_dir(company, db_dir=None):
+    return os.path.join(_root(db_dir), SHARDS_DIR, shard_name(company))
+
+
+def shard_dirs(db_dir=None):
+    ensure_sharded(db_dir)
+    root = os.path.join(_root(db_dir), SHARDS_DIR)
+    return [os.path.join(root, name) for name in sorted(os.listdir(root))
+            if os.path.isdir(os.path.join(root, name))]
+
+
+def group_by_shard(docs):
+    groups = {}
+    for doc in docs:
+        groups.setdefault(shard_name(doc.get("metadata", {}).get("company")), []).append(doc)
+    return groups
+
+
+def ensure_sharded(db_dir=None):
+    """Split a single-index database (db/docs.sqlite or docs.jsonl) into company shards once.
+
+    Vectors are copied out of the old index when it can reconstruct them;
+    otherwise the shard indexes are rebuilt from their docs on first use.
+    The old files are left in place as a backup.
+    """
+    root = _root(db_dir)
+    shards_root = os.path.join(root, SHARDS_DIR)
+    if os.path.isdir(shards_root):
+        return
+    os.makedirs(root, exist_ok=True)
+    with FileLock(os.path.join(root, LOCK_FILE)):
+        if os.path.isdir(shards_root):
+            return
+        has_legacy = any(os.path.exists(os.path.join(root, f)) for f in (STORE_FILE, LEGACY_DOCS_FILE))
+        if not has_legacy:
+            os.makedirs(shards_root)
+            return
+
+        vector_store.migrate_legacy_docs(root)
+        store = get_doc_store(root)
+        docs = list(store.iter_docs())
+        index, _ = vector_store._read_index(root, store)
+        vectors = None
+        if index is not None and index.ntotal == len(docs):
+            try:
+                vectors = index.reconstruct_n(0, index.ntotal)
+            except RuntimeError:
+                vectors = None
+
+        tmp_root = f"{shards_root}.tmp"
+        shutil.rmtree(tmp_root, ignore_errors=True)
+        rows_by_shard = {}
+        for row, doc in enumerate(docs):
+            rows_by_shard.setdefault(shard_name(doc["metadata"].get("company")), []).append(row)
+        for name, rows in rows_by_shard.items():
+            target = os.path.join(tmp_root, name)
+            os.makedirs(target)
+            shard_docs = [docs[r] for r in rows]
+            shard_store = DocStore(os.path.join(target, STORE_FILE))
+            shard_store.append(shard_docs)
+            shard_store.close()
+            if vectors is not None:
+                write_index(build_index(vectors[rows]), MetadataIndex.from_docs(shard_docs), target)
+        os.makedirs(tmp_root, exist_ok=True)
+        os.replace(tmp_root, shards_root)
+        print(f"🧩 Split {len(docs)} docs into {len(rows_by_shard)} company shard(s) under {shards_root}")
+
+
+def ingest_sharded(docs, db_dir=None, rebuild=False):
+    """`ingest_docs` per company shard; only the shards receiving docs are touched.
+
+    `rebuild=True` compacts and re-embeds every shard. Returns `(new_docs, total)`.
+    """
+    ensure_sharded(db_dir)
+    # Ids are content hashes: a chunk already stored in any shard is not added again.
+    seen = existing_ids([d["id"] for d in docs], db_dir)
+    groups = group_by_shard(d for d in docs if d["id"] not in seen)
+    targets = {name: os.path.join(_root(db_dir), SHARDS_DIR, name) for name in groups}
+    if rebuild:
+        for path in shard_dirs(db_dir):
+            targets.setdefault(os.path.basename(path), path)
+
+    new_docs = []
+    for name, path in sorted(targets.items()):
+        added, _ = ingest_docs(groups.get(name, []), db_dir=path, rebuild=rebuild)
+        new_docs.extend(added)
+    return new_docs, total_docs(db_dir)
+
+
+def existing_ids(ids, db_dir=None):
+    """The subset of `ids` stored in any shard."""
+    found = set()
+    for path in shard_dirs(db_dir):
+        found |= get_doc_store(path).existing_ids(ids)
+    return found
+
+
+def total_docs(db_dir=None):
+    return sum(get_doc_store(path).count() for path in shard_dirs(db_dir))
+
+
+def read_all_docs(db_dir=None):
+    docs = []
+    for path in shard_dirs(db_dir):
+        docs.extend(get_doc_store(path).iter_docs())
+    return docs
+
+
+def rewrite_sharded(docs, db_dir=None):
+    """Replace the whole corpus with `docs`; shards left without docs are deleted."""
+    groups = group_by_shard(docs)
+    for path in shard_dirs(db_dir):
+        if os.path.basename(path) not in groups:
+            forget_db(path)
+            shutil.rmtree(path)
+    for name, shard_docs in groups.items():
+        rewrite_docs(shard_docs, os.path.join(_root(db_dir), SHARDS_DIR, name))
+
+
+def _stores_for(company, db_dir):
+    if company:
+        path = shard_dir(company, db_dir)
+        ensure_sharded(db_dir)
+        return [get_store(path)] if os.path.isdir(path) else []
+    return [get_store(path) for path in shard_dirs(db_dir)]
+
+
+def _fan_out(fn, stores):
+    """Run `fn` per shard; in the thread pool when there is more than one."""
+    if len(stores) <= 1:
+        return [fn(store) for store in stores]
+    return list(_pool.map(fn, stores))
+
+
+def index_version(company=None, db_dir=None):
+    """Changes whenever any shard a search for `company` reads is rewritten."""
+    return tuple((os.path.basename(store.db_dir), store._disk_stamp()) for store in _stores_for(company, db_dir))
+
+
+def lexical_stats(queries, db_dir=None):
+    """BM25 corpus statistics per query, summed over every shard.
+
+    Shards score with these instead of their own document counts, term
+    frequencies and lengths, so their BM25 scores share one scale and rank
+    exactly as they would in a single store.
+    """
+    stores = [get_doc_store(path) for path in shard_dirs(db_dir)]
+    per_shard = _fan_out(lambda store: [LexicalIndex(store).stats(q) for q in queries], stores)
+    return [merge_stats(shard[i] for shard in per_shard) for i in range(len(queries))]
+
+
+def search_shards(query, query_vector=None, k=5, lexical_weight=LEXICAL_WEIGHT,
+                  role=None, company=None, statement=None, fiscal_year=None, db_dir=None):
+    """Hybrid search over one company's shard, or every shard concurrently.
+
+    Each shard returns its vector candidates and its BM25 candidates scored
+    with corpus-wide statistics (`lexical_stats`); they are merged into
+    global rankings and fused with the same weighted reciprocal rank fusion,
+    so results match a single store holding every shard's docs. Returns
+    `(fused_score, distance, doc)` best-first.
+    """
+    stores = _stores_for(company, db_dir)
+    n = k * HYBRID_CANDIDATES
+    stats = lexical_stats([query], db_dir)[0] if lexical_weight > 0 and stores else None
+    results = _fan_out(
+        lambda store: store.candidates(query, query_vector, n, lexical_weight, role, company, statement,
+                                       fiscal_year, stats),
+        stores,
+    )
+    return _fuse([snap for snap, _, _ in results], [(vec, lex) for _, vec, lex in results], k, lexical_weight)
+
+
+def search_shards_batch(requests, query_vectors, db_dir=None):
+    """`search_shards` for many requests at once, with identical results.
+
+    `requests` are dicts with `query`, `k`, `lexical_weight`, `role`,
+    `company`, `statement` and `fiscal_year`; `query_vectors[i]` belongs to
+    request i. Requests with the same filter share one shard lookup and one
+    FAISS search per shard. Returns one hit list per request.
+    """
+    groups = {}
+    for i, req in enumerate(requests):
+        key = (normalize_value("company", req.get("company")), str(req.get("role")),
+               req.get("statement"), req.get("fiscal_year"))
+        groups.setdefault(key, []).append(i)
+
+    out = [None] * len(requests)
+    for members in groups.values():
+        first = requests[members[0]]
+        role, company = first.get("role"), first.get("company")
+        statement, fiscal_year = first.get("statement"), first.get("fiscal_year")
+        queries = [requests[i]["query"] for i in members]
+        vectors = [query_vectors[i] for i in members]
+        ns = [requests[i].get("k", 5) * HYBRID_CANDIDATES for i in members]
+        weights = [requests[i].get("lexical_weight", LEXICAL_WEIGHT) for i in members]
+
+        stores = _stores_for(company, db_dir)
+        stats = lexical_stats(queries, db_dir) if stores and any(w > 0 for w in weights) else None
+        results = _fan_out(
+            lambda store: store.candidates_batch(queries, vectors, ns, weights, role, company, statement,
+                                                 fiscal_year, stats),
+            stores,
+        )
+        snaps = [snap for snap, _, _ in results]
+        for pos, i in enumerate(members):
+            per_shard = [(vec[pos], lex[pos]) for _, vec, lex in results]
+            out[i] = _fuse(snaps, per_shard, requests[i].get("k", 5), weights[pos])
+    return out
+
+
+def _fuse(snaps, per_shard, k, lexical_weight):
+    """Merge per-shard `(vector_hits, lexical_hits)` into `(fused_score, distance, doc)`."""
+    n = k * HYBRID_CANDIDATES
+    vector_hits, lexical_hits = [], []
+    for shard, (vec, lex) in enumerate(per_shard):
+        vector_hits.extend((dist, (shard, row)) for row, dist in vec)
+        lexical_hits.extend((-score, (shard, row)) for row, score in lex)
+    vector_hits.sort()
+    lexical_hits.sort()
+    distances = {key: dist for dist, key in vector_hits}
+
+    fused = reciprocal_rank_fusion(
+        [[key for _, key in vector_hits[:n]], [key for _, key in lexical_hits[:n]]],
+        [1 - lexical_weight, lexical_weight], RRF_K,
+    )[:k]
+
+    rows_by_shard = {}
+    for (shard, row), _ in fused:
+        rows_by_shard.setdefault(shard, []).append(row)
+    by_key = {}
+    for shard, rows in rows_by_shard.items():
+        for row, doc in zip(rows, snaps[shard].store.get_rows(rows)):
+            by_key[shard, row] = doc
+    return [(score, distances.get(key), by_key[key]) for key, score in fused if key in by_key]
+
+
+def filter_shards(role=None, company=None, statement=None, fiscal_year=None, db_dir=None):
+    docs = []
+    for shard_docs in _fan_out(lambda store: store.filter_docs(role, company, statement, fiscal_year),
+                               _stores_for(company, db_dir)):
+        docs.extend(shard_docs)
+    return docs
@@ -0,0 +1,143 @@
+# src/table_parser.py
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+TABLE_CACHE_SIZE = 512
+DEFAULT_UNIT = "crore"     # amounts in the corpus are ₹ crore unless the header says otherwise
+UNIT_IN_CRORE = {"crore": 1.0, "lakh": 0.01}
+
+UNIT_ALIASES = {
+    "cr": "crore", "crs": "crore", "crore": "crore", "crores": "crore",
+    "lakh": "lakh", "lakhs": "lakh", "lac": "lakh", "lacs": "lakh", "l": "lakh",
+}
+HEADER_UNIT_RE = re.compile(r"\b(cr|crs|crores?|lakhs?|lacs?)\b\.?", re.I)
+NUMBER_RE = re.compile(
+    r"^(?P<sign>[-+])?(?P<open>\()?(?P<sign2>[-+])?(?:₹|rs\.?|inr)?"
+    r"(?P<num>\d[\d,]*(?:\.\d+)?|\.\d+)"
+    r"\)?(?P<unit>%|x|cr|crs|crores?|lakhs?|lacs?|l|mn|million|bn|billion)?\)?$"
+)
+EMPTY_CELLS = {"", "-", "—", "–", "na", "n/a", "nil"}
+SEPARATOR_RE = re.compile(r"^\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?$")
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def clean_cell(cell):
+    """Drop markdown emphasis and surrounding whitespace."""
+    return cell.replace("**", "").replace("__", "").strip()
+
+
+def column_unit(header):
+    """`crore` or `lakh` when the header names one, e.g. `FY2023–24 (₹ Cr)`."""
+    match = HEADER_UNIT_RE.search(header)
+    return UNIT_ALIASES[match.group(1).lower()] if match else None
+
+
+def parse_number(cell, unit=DEFAULT_UNIT):
+    """Parse a financial cell into a float expressed in `unit`.
+
+    Handles `₹`, Indian digit grouping, `**bold**`, Unicode minus, a leading
+    `+`, parentheses for negatives and `%`/`x` suffixes. A `Cr`/`lakh` suffix
+    on the cell is converted into `unit`. Returns None for non-numeric cells.
+    """
+    text = clean_cell(cell).lower()
+    if text in EMPTY_CELLS:
+        return None
+    text = text.replace("−", "-").replace("–", "-").replace("—", "-").replace(" ", "")
+    match = NUMBER_RE.match(text)
+    if not match:
+        return None
+    value = float(match.group("num").replace(",", ""))
+    if match.group("sign") == "-" or match.group("sign2") == "-" or match.group("open"):
+        value = -value
+    cell_unit = UNIT_ALIASES.get(match.group("unit"))
+    if cell_unit and unit in UNIT_IN_CRORE and cell_unit != unit:
+        value = value * UNIT_IN_CRORE[cell_unit] / UNIT_IN_CRORE[unit]
+    return value
+
+
+def _split_row(line):
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|"):
+        line = line[:-1]
+    return [c.strip() for c in line.split("|")]
+
+
+def parse_table(markdown):
+    """Turn the first markdown pipe table in a chunk into a typed DataFrame.
+
+    The first column keeps the row labels as text. Other columns become
+    float64 when at least half of their non-empty cells are numbers (the rest
+    turn into NaN); otherwise they stay text. Returns None if the chunk has
+    no table.
+    """
+    lines = [l.strip() for l in markdown.splitlines()]
+    for i in range(1, len(lines)):
+        if SEPARATOR_RE.match(lines[i]) and "|" in lines[i - 1]:
+            break
+    else:
+        return None
+
+    header = [clean_cell(c) for c in _split_row(lines[i - 1])]
+    width = len(header)
+    rows = []
+    for line in lines[i + 1:]:
+        if "|" not in line:
+            break
+        cells = _split_row(line)
+        rows.append((cells + [""] * width)[:width])
+    if not rows or width < 2:
+        return None
+
+    columns = []
+    for c, name in enumerate(header):
+        cells = [r[c] for r in rows]
+        if c == 0:
+            columns.append([clean_cell(v) for v in cells])
+            continue
+        unit = column_unit(name) or DEFAULT_UNIT
+        numbers = [parse_number(v, unit) for v in cells]
+        filled = sum(1 for v in cells if clean_cell(v).lower() not in EMPTY_CELLS)
+        parsed = sum(1 for v in numbers if v is not None)
+        if filled and parsed * 2 >= filled:
+            columns.append(np.array([np.nan if v is None else v for v in numbers], dtype="float64"))
+        else:
+            columns.append([clean_cell(v) for v in cells])
+
+    # Built positionally so repeated or blank header names survive.
+    return pd.DataFrame(dict(enumerate(columns))).set_axis(header, axis=1)
+
+
+def cached_table(markdown, chunk_id=None, maxsize=None):
+    """`parse_table` behind an LRU keyed by chunk id (content hash if no id).
+
+    Returns a shallow copy, so callers may add or replace columns freely.
+    """
+    key = chunk_id or hashlib.md5(markdown.encode()).hexdigest()
+    maxsize = TABLE_CACHE_SIZE if maxsize is None else maxsize
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            df = _cache[key]
+            return None if df is None else df.copy(deep=False)
+
+    df = parse_table(markdown)
+    with _cache_lock:
+        _cache[key] = df
+        _cache.move_to_end(key)
+        while len(_cache) > maxsize:
+            _cache.popitem(last=False)
+    return None if df is None else df.copy(deep=False)
+
+
+def clear_table_cache():
+    with _cache_lock:
+        _cache.clear()
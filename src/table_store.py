@@ -0,0 +1,89 @@
+# src/table_store.py
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from src.table_parser import TABLE_CACHE_SIZE, parse_table
+from src.vector_store import DB_DIR
+
+TABLES_DIR = "tables"      # db/tables/<doc id>.parquet
+
+_frames = OrderedDict()
+_frames_lock = threading.Lock()
+
+
+def table_path(doc_id, db_dir=None):
+    return os.path.join(db_dir or DB_DIR, TABLES_DIR, f"{doc_id}.parquet")
+
+
+def _unique_columns(columns):
+    seen = {}
+    out = []
+    for name in columns:
+        name = name or "column"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        out.append(name)
+    return out
+
+
+def save_tables(docs, db_dir=None, overwrite=False):
+    """Parse the table in each doc and store it as Parquet keyed by doc id.
+
+    Doc ids are content hashes, so an existing file is already up to date
+    and is skipped unless `overwrite` is set. Returns the ids written.
+    """
+    os.makedirs(os.path.join(db_dir or DB_DIR, TABLES_DIR), exist_ok=True)
+    written = []
+    for doc in docs:
+        path = table_path(doc["id"], db_dir)
+        if not overwrite and os.path.exists(path):
+            continue
+        df = parse_table(doc["content"])
+        if df is None:
+            continue
+        df.columns = _unique_columns(list(df.columns))
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        written.append(doc["id"])
+    return written
+
+
+def load_table(doc_id, db_dir=None):
+    """The pre-typed frame stored for `doc_id`, or None if it has no table.
+
+    Frames are kept in an LRU keyed by file and mtime; callers get a shallow
+    copy they may modify.
+    """
+    path = table_path(doc_id, db_dir)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    key = (os.path.abspath(path), mtime)
+    with _frames_lock:
+        df = _frames.get(key)
+        if df is not None:
+            _frames.move_to_end(key)
+            return df.copy(deep=False)
+
+    df = pd.read_parquet(path)
+    with _frames_lock:
+        _frames[key] = df
+        while len(_frames) > TABLE_CACHE_SIZE:
+            _frames.popitem(last=False)
+    return df.copy(deep=False)
+
+
+def remove_tables(doc_ids, db_dir=None):
+    for doc_id in doc_ids:
+        try:
+            os.remove(table_path(doc_id, db_dir))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,231 @@
+# src/tracing.py
+import bisect
+import contextvars
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+# Upper bounds in seconds, Prometheus style (+Inf is implicit).
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RECENT_TRACES = 500
+SLOW_REQUEST_SECONDS = 1.0
+METRIC_PREFIX = "balance_sheet_gpt"
+
+log = logging.getLogger("balance_sheet_gpt.trace")
+if not log.handlers:
+    # One JSON object per finished request on stderr.
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(_handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+_current = contextvars.ContextVar("trace", default=None)
+_histograms = {}
+_recent = deque(maxlen=RECENT_TRACES)
+_lock = threading.Lock()
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, as Prometheus expects."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (None if empty)."""
+        if not self.count:
+            return None
+        target, seen = q * self.count, 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+
+class Trace:
+    """One user request: an id, its name and attributes, and the spans inside it."""
+
+    def __init__(self, name, **attrs):
+        self.request_id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.attrs = attrs
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration = None
+        self.error = None
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add_span(self, stage, offset, seconds, error=None):
+        with self._lock:
+            self.spans.append({"stage": stage, "offset": round(offset, 6),
+                               "seconds": round(seconds, 6), "error": error})
+
+    def stages(self):
+        """Total seconds per stage name."""
+        totals = {}
+        for span in self.spans:
+            totals[span["stage"]] = totals.get(span["stage"], 0.0) + span["seconds"]
+        return totals
+
+    def to_dict(self):
+        return {
+            "request_id": self.request_id,
+            "name": self.name,
+            "attrs": self.attrs,
+            "started_at": self.started_at,
+            "seconds": None if self.duration is None else round(self.duration, 6),
+            "error": self.error,
+            "stages": {stage: round(s, 6) for stage, s in self.stages().items()},
+            "spans": list(self.spans),
+        }
+
+
+def observe(metric, seconds, **labels):
+    """Add one observation to the histogram for `metric` and `labels`."""
+    key = (metric, tuple(sorted(labels.items())))
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = Histogram()
+        hist.observe(seconds)
+
+
+def record_stage(stage, seconds, started=None, error=None):
+    """Record a stage timed by the caller, e.g. across the yields of a stream.
+
+    `started` is the stage's `time.perf_counter()` start; by default the
+    stage is taken to have just ended.
+    """
+    observe("stage_seconds", seconds, stage=stage)
+    current = _current.get()
+    if current is not None:
+        started = time.perf_counter() - seconds if started is None else started
+        current.add_span(stage, max(started - current.start, 0.0), seconds, error)
+
+
+def current_request_id():
+    current = _current.get()
+    return current.request_id if current is not None else None
+
+
+@contextmanager
+def span(stage):
+    """Time a stage of the current request (or just the histogram if there is none)."""
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        record_stage(stage, time.perf_counter() - start, start, error)
+
+
+@contextmanager
+def trace(name, **attrs):
+    """Start a request with its own id; nested calls join the outer request."""
+    if _current.get() is not None:
+        with span(name):
+            yield _current.get()
+        return
+
+    current = Trace(name, **attrs)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        _current.reset(token)
+        current.duration = time.perf_counter() - current.start
+        observe("request_seconds", current.duration, request=name)
+        record = current.to_dict()
+        with _lock:
+            _recent.append(record)
+        log.info(json.dumps(record, default=str))
+
+
+def bind(fn):
+    """Wrap `fn` so it runs in the caller's request, e.g. on a worker thread."""
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.run(fn, *args, **kwargs)
+
+
+def recent_traces(limit=None):
+    with _lock:
+        traces = list(_recent)
+    return traces[-limit:] if limit else traces
+
+
+def slow_requests(min_seconds=SLOW_REQUEST_SECONDS, limit=50):
+    """Recent requests slower than `min_seconds`, slowest first."""
+    slow = [t for t in recent_traces() if (t["seconds"] or 0) >= min_seconds]
+    return sorted(slow, key=lambda t: -t["seconds"])[:limit]
+
+
+def histogram_summary():
+    """`{metric: {label: {count, sum, p50, p95, p99}}}` for display."""
+    with _lock:
+        items = list(_histograms.items())
+    summary = {}
+    for (metric, labels), hist in items:
+        label = ",".join(f"{k}={v}" for k, v in labels) or "all"
+        summary.setdefault(metric, {})[label] = {
+            "count": hist.count,
+            "sum": round(hist.sum, 6),
+            "p50": hist.quantile(0.50),
+            "p95": hist.quantile(0.95),
+            "p99": hist.quantile(0.99),
+        }
+    return summary
+
+
+def _labels(pairs):
+    return ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in pairs)
+
+
+def prometheus_text():
+    """All histograms in the Prometheus text exposition format."""
+    with _lock:
+        items = sorted(_histograms.items())
+        snapshot = [(metric, labels, list(h.buckets), list(h.counts), h.count, h.sum)
+                    for (metric, labels), h in items]
+
+    lines, declared = [], set()
+    for metric, labels, buckets, counts, count, total in snapshot:
+        name = f"{METRIC_PREFIX}_{metric}"
+        if name not in declared:
+            declared.add(name)
+            lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for bound, n in zip(buckets + ["+Inf"], counts):
+            cumulative += n
+            le = bound if bound == "+Inf" else repr(float(bound))
+            lines.append(f"{name}_bucket{{{_labels(labels + (('le', le),))}}} {cumulative}")
+        suffix = f"{{{_labels(labels)}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {total}")
+        lines.append(f"{name}_count{suffix} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _recent.clear()
@@ -0,0 +1,434 @@
+# src/vector_store.py
+import json
+import os
+import threading
+from collections import namedtuple
+
+import faiss
+import numpy as np
+from filelock import FileLock
+
+from src.doc_store import STORE_FILE, DocStore, migrate_jsonl
+from src.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from src.metadata_index import MetadataIndex
+
+DB_DIR = "db"
+INDEX_FILE = "vector_index.faiss"
+META_FILE = "metadata_index.json"
+# BM25 postings used to be a JSON file; they now live in docs.sqlite.
+LEGACY_LEXICAL_FILE = "lexical_index.json"
+LOCK_FILE = ".write.lock"
+# Pre-SQLite layout, migrated on first use (see tools/migrate_docs_jsonl.py).
+LEGACY_DOCS_FILE = "docs.jsonl"
+LEGACY_IDS_FILE = "doc_ids.json"
+
+# `meta` maps metadata tags to FAISS rows; `store` resolves rows to docs;
+# `lexical` is the BM25 index over the same rows, read from `store`.
+Snapshot = namedtuple("Snapshot", ["index", "meta", "store", "stamp", "lexical"])
+
+# Any faiss.index_factory string: "Flat" (exact), "SQfp16"/"SQ8" (2x/4x smaller),
+# "PQ32" (product quantisation), "IVF1024,SQ8" or "HNSW32" (sub-linear search).
+# Applies to fresh builds and --rebuild; existing indexes keep their type.
+INDEX_SPEC = "Flat"
+MAX_TRAIN_POINTS = 100_000
+IVF_NPROBE = 16
+HNSW_EF_SEARCH = 64
+# Readers map the index file instead of copying it, so worker processes share pages.
+MMAP_FLAGS = faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+
+LEXICAL_WEIGHT = 0.5        # share of the fused score from BM25; 0 = vector only
+RRF_K = 60
+HYBRID_CANDIDATES = 4       # each ranker contributes k * this many candidates
+
+_doc_stores = {}
+_doc_stores_lock = threading.Lock()
+
+
+def _atomic_write(path, write):
+    tmp_path = f"{path}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def migrate_legacy_docs(db_dir=DB_DIR):
+    """Convert db/docs.jsonl into the SQLite doc store if that has not happened yet."""
+    jsonl_path = os.path.join(db_dir, LEGACY_DOCS_FILE)
+    store_path = os.path.join(db_dir, STORE_FILE)
+    if os.path.exists(store_path) or not os.path.exists(jsonl_path):
+        return 0
+
+    ids_path = os.path.join(db_dir, LEGACY_IDS_FILE)
+    order = None
+    if os.path.exists(ids_path):
+        with open(ids_path, "r", encoding="utf-8") as f:
+            order = json.load(f)
+
+    tmp_path = f"{store_path}.tmp"
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(tmp_path + suffix):
+            os.remove(tmp_path + suffix)
+    tmp_store = DocStore(tmp_path)
+    count = migrate_jsonl(jsonl_path, tmp_store, order)
+    tmp_store.close()
+    os.replace(tmp_path, store_path)
+    print(f"📦 Migrated {count} docs from {jsonl_path} to {store_path}")
+    return count
+
+
+def get_doc_store(db_dir=DB_DIR):
+    db_dir = os.path.abspath(db_dir)
+    with _doc_stores_lock:
+        store = _doc_stores.get(db_dir)
+        if store is None:
+            if not os.path.exists(os.path.join(db_dir, STORE_FILE)) and os.path.exists(
+                os.path.join(db_dir, LEGACY_DOCS_FILE)
+            ):
+                os.makedirs(db_dir, exist_ok=True)
+                with FileLock(os.path.join(db_dir, LOCK_FILE)):
+                    migrate_legacy_docs(db_dir)
+            store = _doc_stores[db_dir] = DocStore(os.path.join(db_dir, STORE_FILE))
+        return store
+
+
+def write_index(index, meta, db_dir=DB_DIR):
+    """Persist the FAISS index with its metadata index.
+
+    The index file is written last, so readers that see a new index also
+    see the metadata index that goes with it. BM25 postings are written
+    with the docs themselves.
+    """
+    os.makedirs(db_dir, exist_ok=True)
+    meta.save(os.path.join(db_dir, META_FILE))
+    _atomic_write(os.path.join(db_dir, INDEX_FILE), lambda path: faiss.write_index(index, path))
+
+
+def build_flat_index(vectors):
+    vectors = np.asarray(vectors, dtype="float32")
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+    return index
+
+
+def build_index(vectors, spec=None):
+    """Build a `spec` index (default `INDEX_SPEC`), training it on `vectors` if needed.
+
+    Falls back to a flat index when there are too few vectors to train.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    spec = spec or INDEX_SPEC
+    if spec == "Flat":
+        return build_flat_index(vectors)
+    index = faiss.index_factory(vectors.shape[1], spec, faiss.METRIC_L2)
+    if not index.is_trained:
+        try:
+            index.train(vectors[:MAX_TRAIN_POINTS])
+        except RuntimeError as e:
+            print(f"⚠️ Not enough vectors to train {spec} ({len(vectors)}), using Flat: {e}")
+            return build_flat_index(vectors)
+    index.add(vectors)
+    configure_search(index)
+    return index
+
+
+def configure_search(index):
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = IVF_NPROBE
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+    return index
+
+
+def read_index_file(path, mmap=False):
+    if mmap:
+        try:
+            return configure_search(faiss.read_index(path, MMAP_FLAGS))
+        except RuntimeError:
+            pass
+    return configure_search(faiss.read_index(path))
+
+
+def index_docs(docs, db_dir=DB_DIR):
+    """Embed `docs` and write a fresh index whose rows follow their order.
+
+    Vectors come from the embedding cache; only unseen contents hit the model.
+    """
+    from src.embedding_cache import encode_cached
+
+    index = build_index(encode_cached([d["content"] for d in docs]))
+    write_index(index, MetadataIndex.from_docs(docs), db_dir)
+    return index
+
+
+def read_docs(db_dir=DB_DIR):
+    return list(get_doc_store(db_dir).iter_docs())
+
+
+def rewrite_docs(docs, db_dir=DB_DIR):
+    """Replace the whole corpus with `docs` and re-embed it."""
+    os.makedirs(db_dir, exist_ok=True)
+    with FileLock(os.path.join(db_dir, LOCK_FILE)):
+        get_doc_store(db_dir).replace_all(docs)
+        if docs:
+            index_docs(docs, db_dir)
+
+
+def _read_index(db_dir, store, mmap=False):
+    index_path = os.path.join(db_dir, INDEX_FILE)
+    meta_path = os.path.join(db_dir, META_FILE)
+    if not os.path.exists(index_path):
+        return None, None
+    index = read_index_file(index_path, mmap)
+    if os.path.exists(meta_path):
+        meta = MetadataIndex.load(meta_path)
+    else:
+        # Indexes written before the metadata index: rows follow the doc store.
+        meta = MetadataIndex.from_docs(store.iter_docs())
+        meta.save(meta_path)
+    return index, meta
+
+
+def _read_lexical(db_dir, store):
+    # Stores written before postings lived in docs.sqlite get them once.
+    if store.index_terms():
+        legacy = os.path.join(db_dir, LEGACY_LEXICAL_FILE)
+        if os.path.exists(legacy):
+            os.remove(legacy)
+    return LexicalIndex(store)
+
+
+def _unique_new(docs, existing_ids):
+    seen = set(existing_ids)
+    fresh = []
+    for doc in docs:
+        if doc["id"] not in seen:
+            seen.add(doc["id"])
+            fresh.append(doc)
+    return fresh
+
+
+def ingest_docs(docs, db_dir=DB_DIR, rebuild=False):
+    """Add `{"id", "content", "metadata"}` docs whose id is not stored yet.
+
+    By default only the new docs are embedded: they are appended to the doc
+    store and added to the existing index, so earlier rows keep their FAISS
+    ids. `rebuild=True` rewrites the store and re-embeds the whole corpus
+    (compaction), reading unchanged contents' vectors from the embedding
+    cache. Returns `(new_docs, total)`.
+
+    BM25 postings are inserted with the new docs. The FAISS and metadata
+    files are still rewritten whole, so callers should ingest a job's docs
+    in one call rather than range by range.
+    """
+    from src.embedding_cache import encode_cached
+
+    os.makedirs(db_dir, exist_ok=True)
+    store = get_doc_store(db_dir)
+    with FileLock(os.path.join(db_dir, LOCK_FILE)):
+        index, meta = _read_index(db_dir, store)
+        count = store.count()
+        if rebuild or (index is None and count) or (index is not None and index.ntotal > count):
+            existing = list(store.iter_docs())
+            new_docs = _unique_new(docs, {d["id"] for d in existing})
+            all_docs = existing + new_docs
+            store.replace_all(all_docs)
+            if all_docs:
+                index_docs(all_docs, db_dir)
+            return new_docs, len(all_docs)
+
+        new_docs = _unique_new(docs, store.existing_ids(d["id"] for d in docs))
+        # Rows appended by a writer that died before saving the index.
+        pending = list(store.iter_docs(index.ntotal)) if index is not None else []
+        if not new_docs and not pending:
+            return [], count
+
+        _read_lexical(db_dir, store)
+        if new_docs:
+            store.append(new_docs)
+        vectors = encode_cached([d["content"] for d in pending + new_docs])
+        if index is None:
+            first_row = 0
+            index, meta = build_index(vectors), MetadataIndex()
+        else:
+            first_row = index.ntotal
+            index.add(vectors)
+        for offset, doc in enumerate(pending + new_docs):
+            meta.add(first_row + offset, doc["metadata"])
+        write_index(index, meta, db_dir)
+        return new_docs, index.ntotal
+
+
+class VectorStore:
+    """Read side of the persisted vector DB, reloaded only when files change."""
+
+    def __init__(self, db_dir=DB_DIR):
+        self.db_dir = db_dir
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def path(self, name):
+        return os.path.join(self.db_dir, name)
+
+    def _disk_stamp(self):
+        stamp = []
+        for name in (META_FILE, INDEX_FILE):
+            try:
+                st = os.stat(self.path(name))
+                stamp.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def snapshot(self):
+        stamp = self._disk_stamp()
+        current = self._snapshot
+        if current is not None and current.stamp == stamp:
+            return current
+
+        with self._lock:
+            current = self._snapshot
+            if current is not None and current.stamp == stamp:
+                return current
+            loaded = self._load(stamp)
+            if loaded is not None:
+                self._snapshot = loaded
+            return self._snapshot
+
+    def _load(self, stamp):
+        store = get_doc_store(self.db_dir)
+        if stamp[1] is None:
+            if self._snapshot is not None:
+                # A writer is between files; keep serving the last good snapshot.
+                return None
+            docs = list(store.iter_docs())
+            if not docs:
+                return Snapshot(None, MetadataIndex(), store, stamp, LexicalIndex(store))
+            print("⚠️ Vector index missing, rebuilding from the doc store.")
+            index_docs(docs, self.db_dir)
+            stamp = self._disk_stamp()
+
+        index, meta = _read_index(self.db_dir, store, mmap=True)
+        return Snapshot(index, meta, store, stamp, _read_lexical(self.db_dir, store))
+
+    def filter_docs(self, role=None, company=None, statement=None, fiscal_year=None):
+        snap = self.snapshot()
+        if snap.index is None:
+            return []
+        rows = snap.meta.rows_for(role, company, statement, fiscal_year)
+        if rows is None:
+            rows = range(snap.index.ntotal)
+        return snap.store.get_rows(r for r in rows if r < snap.index.ntotal)
+
+    def candidates(self, query, query_vector=None, n=20, lexical_weight=LEXICAL_WEIGHT,
+                   role=None, company=None, statement=None, fiscal_year=None, lexical_stats=None):
+        """Up to `n` vector and BM25 candidates from one snapshot.
+
+        Returns `(snapshot, [(row, distance)], [(row, bm25_score)])`, each
+        best-first; a ranker with zero weight contributes nothing. BM25 uses
+        `lexical_stats` (corpus statistics, see `src/shards.py`) when given.
+        """
+        snap, vector_hits, lexical_hits = self.candidates_batch(
+            [query], [query_vector], [n], [lexical_weight], role, company, statement, fiscal_year,
+            None if lexical_stats is None else [lexical_stats],
+        )
+        return snap, vector_hits[0], lexical_hits[0]
+
+    def candidates_batch(self, queries, query_vectors, ns, lexical_weights,
+                         role=None, company=None, statement=None, fiscal_year=None, lexical_stats=None):
+        """`candidates` for many queries sharing one filter.
+
+        The filter is resolved once and all query vectors go through a single
+        FAISS search for the largest `n`; each query keeps its own top `n`.
+        Returns `(snapshot, [vector_hits per query], [lexical_hits per query])`.
+        """
+        snap = self.snapshot()
+        vector_hits = [[] for _ in queries]
+        lexical_hits = [[] for _ in queries]
+        if snap.index is None or not snap.index.ntotal:
+            return snap, vector_hits, lexical_hits
+        ntotal = snap.index.ntotal
+        rows = snap.meta.rows_for(role, company, statement, fiscal_year)
+        if rows is not None:
+            rows = rows[rows < ntotal]
+            if not len(rows):
+                return snap, vector_hits, lexical_hits
+
+        dense = [i for i, weight in enumerate(lexical_weights) if weight < 1]
+        if dense:
+            matrix = np.vstack([np.asarray(query_vectors[i], dtype="float32").reshape(1, -1) for i in dense])
+            n = max(ns[i] for i in dense)
+            if rows is None:
+                D, I = snap.index.search(matrix, min(n, ntotal))
+            else:
+                D, I = self._search_rows(snap.index, matrix, rows, min(n, len(rows)))
+            for pos, i in enumerate(dense):
+                hits = [(int(r), float(d)) for d, r in zip(D[pos], I[pos]) if r >= 0]
+                vector_hits[i] = hits[:ns[i]]
+
+        for i, (query, n, weight) in enumerate(zip(queries, ns, lexical_weights)):
+            if weight > 0:
+                stats = lexical_stats[i] if lexical_stats is not None else None
+                lexical_hits[i] = [(r, s) for s, r in snap.lexical.search(query, n, rows, stats) if r < ntotal]
+        return snap, vector_hits, lexical_hits
+
+    def hybrid_search(self, query, query_vector=None, k=5, lexical_weight=LEXICAL_WEIGHT,
+                      role=None, company=None, statement=None, fiscal_year=None):
+        """Fuse BM25 and vector rankings with weighted reciprocal rank fusion.
+
+        `lexical_weight` is BM25's share of the fused score (0 = vector only,
+        1 = BM25 only; `query_vector` may be None then). Returns a list of
+        `(fused_score, distance, doc)` best-first; `distance` is None for
+        docs found only lexically.
+        """
+        snap, vector_hits, lexical_hits = self.candidates(
+            query, query_vector, k * HYBRID_CANDIDATES, lexical_weight, role, company, statement, fiscal_year
+        )
+        distances = dict(vector_hits)
+        fused = reciprocal_rank_fusion(
+            [[r for r, _ in vector_hits], [r for r, _ in lexical_hits]], [1 - lexical_weight, lexical_weight], RRF_K
+        )[:k]
+        hit_rows = [row for row, _ in fused]
+        by_row = {doc_row: doc for doc_row, doc in zip(hit_rows, snap.store.get_rows(hit_rows))}
+        return [(score, distances.get(row), by_row[row]) for row, score in fused if row in by_row]
+
+    @staticmethod
+    def _search_rows(index, query_vectors, rows, k):
+        if isinstance(index, faiss.IndexFlatCodes):
+            # Flat, SQ and PQ codes: brute force over just the tenant's decoded
+            # vectors, so cost follows the match count.
+            D, I = faiss.knn(query_vectors, index.reconstruct_batch(rows), k)
+            return D, np.where(I >= 0, rows[np.maximum(I, 0)], -1)
+
+        sel = faiss.IDSelectorBatch(rows)
+        # IVF and HNSW indexes only accept their own parameter types.
+        if faiss.try_extract_index_ivf(index) is not None:
+            params = faiss.SearchParametersIVF(sel=sel, nprobe=IVF_NPROBE)
+        elif hasattr(index, "hnsw"):
+            params = faiss.SearchParametersHNSW(sel=sel, efSearch=max(HNSW_EF_SEARCH, k))
+        else:
+            params = faiss.SearchParameters(sel=sel)
+        return index.search(query_vectors, k, params=params)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(db_dir=DB_DIR):
+    db_dir = os.path.abspath(db_dir)
+    with _stores_lock:
+        store = _stores.get(db_dir)
+        if store is None:
+            store = _stores[db_dir] = VectorStore(db_dir)
+        return store
+
+
+def forget_db(db_dir):
+    """Drop the cached store and doc store for `db_dir`, e.g. before deleting it."""
+    db_dir = os.path.abspath(db_dir)
+    with _stores_lock:
+        _stores.pop(db_dir, None)
+    with _doc_stores_lock:
+        store = _doc_stores.pop(db_dir, None)
+    if store is not None:
+        store.close()
@@ -0,0 +1,45 @@
+import hashlib
+import re
+
+import numpy as np
+import pytest
+
+from src import answer_cache, embedder, embedding_cache, query_cache
+
+
+class FakeEmbedder:
+    """Deterministic bag-of-words embedder standing in for MiniLM in tests."""
+
+    def __init__(self, dim=32):
+        self.dim = dim
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32):
+        texts = list(texts)
+        self.encoded.extend(texts)
+        out = np.zeros((len(texts), self.dim), dtype="float32")
+        for row, text in enumerate(texts):
+            for token in re.findall(r"\w+", text.lower()):
+                h = int(hashlib.md5(token.encode()).hexdigest(), 16)
+                out[row, h % self.dim] += 1.0
+            norm = np.linalg.norm(out[row])
+            if norm:
+                out[row] /= norm
+        return out
+
+
+@pytest.fixture
+def fake_embedder(tmp_path_factory, monkeypatch):
+    embedder.clear_embedders()
+    # Fake vectors must never land in the real embedding cache.
+    monkeypatch.setattr(embedding_cache, "CACHE_DIR", str(tmp_path_factory.mktemp("embeddings")))
+    embedding_cache.clear_cache_state()
+    query_cache.reset()
+    answer_cache.reset()
+    model = FakeEmbedder()
+    embedder.register_embedder(model)
+    yield model
+    embedder.clear_embedders()
+    embedding_cache.clear_cache_state()
+    query_cache.reset()
+    answer_cache.reset()
@@ -0,0 +1,123 @@
+from types import SimpleNamespace
+
+from src import answer_cache, pdf_parser
+from src.answer_cache import answer_cache_stats, lookup, store
+from src.chat_over_vector_db import search_chunks
+from src.context_packer import pack_context
+from src.pdf_parser import save_to_vector_db
+from src.shards import read_all_docs, rewrite_sharded
+from tests.test_chat_stream import FakeStreamingClient
+
+CONTEXT = "| Metric | FY2023-24 |\n|---|---|\n| Net Profit | 79,020 |"
+SOURCES = [{"id": "np", "content": CONTEXT}]
+CHUNKS = [
+    "| Metric | FY2023-24 (₹ Cr) |\n|---|---|\n| Net Profit | 79,020 |\n| EPS (Basic) | 102.90 |",
+    "| Metric | FY2023-24 (₹ Cr) |\n|---|---|\n| Revenue from Operations | 9,01,064 |\n| EBITDA | 1,78,677 |",
+    "| Segment | FY2023-24 (₹ Cr) |\n|---|---|\n| Retail segment revenue | 3,06,478 |\n| O2C segment revenue | 5,64,749 |",
+    "| Item | FY2023-24 (₹ Cr) |\n|---|---|\n| Raw Materials | 18,770 |\n| Finished Goods | 20,274 |",
+]
+
+
+class FakeCompletionClient:
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(complete=self._complete)
+
+    def _complete(self, model, messages):
+        self.calls += 1
+        message = SimpleNamespace(content=f"Answer {self.calls}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_similar_question_reuses_answer_within_scope(fake_embedder, monkeypatch):
+    monkeypatch.setattr(answer_cache, "SIMILARITY_THRESHOLD", 0.7)
+    store("what was net profit in FY24?", "analyst", None, SOURCES, "₹79,020 Cr")
+
+    hit = lookup("FY24 net profit?", "analyst", None, SOURCES)
+
+    assert hit["answer"] == "₹79,020 Cr" and hit["question"] == "what was net profit in FY24?"
+    assert lookup("FY24 net profit?", "ceo", "Jio Platforms", SOURCES) is None
+    assert lookup("inventory of stores and spares", "analyst", None, SOURCES) is None
+    # Non-CEO roles do not retrieve by company, so they share one scope
+    assert lookup("FY24 net profit?", "analyst", "Jio Platforms", SOURCES)["answer"] == "₹79,020 Cr"
+
+
+def test_different_years_or_figures_never_share_an_answer(fake_embedder, monkeypatch):
+    monkeypatch.setattr(answer_cache, "SIMILARITY_THRESHOLD", 0.0)
+    store("revenue FY24", "owner", None, SOURCES, "FY24 answer")
+
+    assert lookup("revenue FY23", "owner", None, SOURCES) is None
+    assert lookup("revenue", "owner", None, SOURCES) is None
+    assert lookup("revenue for FY24", "owner", None, SOURCES)["answer"] == "FY24 answer"
+
+
+def test_paraphrase_over_the_same_chunks_reuses_the_answer(fake_embedder, monkeypatch, tmp_path):
+    monkeypatch.setattr(answer_cache, "SIMILARITY_THRESHOLD", 0.7)
+    monkeypatch.chdir(tmp_path)
+    save_to_vector_db("\n\n".join(CHUNKS), {"role": "analyst"})
+
+    first_text, first = pack_context(search_chunks("what was net profit in FY24?", role="analyst", k=8))
+    second_text, second = pack_context(search_chunks("FY24 net profit?", role="analyst", k=8))
+    # Same chunks, packed in another order
+    assert first_text != second_text and {h["id"] for h in first} == {h["id"] for h in second}
+
+    store("what was net profit in FY24?", "analyst", None, first, "₹79,020 Cr")
+    assert lookup("FY24 net profit?", "analyst", None, second)["answer"] == "₹79,020 Cr"
+    assert lookup("what was net profit in FY24?", "analyst", None, first)["answer"] == "₹79,020 Cr"
+    stats = answer_cache_stats()
+    assert (stats["hits"], stats["stale"], stats["entries"]) == (2, 0, 1)
+
+
+def test_entry_is_dropped_only_when_its_chunks_change(fake_embedder, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    save_to_vector_db("\n\n".join(CHUNKS), {"role": "ceo", "company": "Jio Platforms"})
+    docs = read_all_docs()
+    store("FY24 net profit?", "ceo", "Jio Platforms", docs[:1], "₹79,020 Cr")
+
+    # Other chunks retrieved: a plain miss that keeps the entry
+    assert lookup("FY24 net profit?", "ceo", "Jio Platforms", docs[:2]) is None
+    assert lookup("FY24 net profit?", "ceo", "Jio Platforms", docs[:1])["answer"] == "₹79,020 Cr"
+
+    rewrite_sharded(docs[1:])
+    assert lookup("FY24 net profit?", "ceo", "Jio Platforms", docs[1:2]) is None
+    assert answer_cache_stats()["stale"] == 1
+    assert lookup("FY24 net profit?", "ceo", "Jio Platforms", docs[:1]) is None
+
+
+def test_least_recently_used_answer_is_evicted(fake_embedder, monkeypatch):
+    monkeypatch.setattr(answer_cache, "MAX_ENTRIES_PER_SCOPE", 2)
+    store("net profit", "owner", None, SOURCES, "a")
+    store("total assets", "owner", None, SOURCES, "b")
+    store("segment revenue", "owner", None, SOURCES, "c")
+
+    assert lookup("net profit", "owner", None, SOURCES) is None
+    assert lookup("total assets", "owner", None, SOURCES)["answer"] == "b"
+    assert answer_cache_stats()["evicted"] == 1
+
+
+def test_chat_with_context_calls_the_model_once(fake_embedder, monkeypatch):
+    client = FakeCompletionClient()
+    monkeypatch.setattr(pdf_parser, "get_client", lambda: client)
+
+    first = pdf_parser.chat_with_context("FY24 net profit?", CONTEXT, role="analyst")
+    again = pdf_parser.chat_with_context("FY24 net profit?", CONTEXT, role="analyst")
+    uncached = pdf_parser.chat_with_context("FY24 net profit?", CONTEXT)
+
+    assert first == again == "Answer 1"
+    assert uncached == "Answer 2"
+    assert client.calls == 2
+
+
+def test_streamed_answers_share_the_cache(fake_embedder):
+    client = FakeStreamingClient(["₹79,020 ", "Cr"])
+    timings = {}
+    streamed = "".join(pdf_parser.chat_with_context_stream("FY24 net profit?", CONTEXT, client=client,
+                                                           timings=timings, role="ceo", company="Jio Platforms"))
+    assert streamed == "₹79,020 Cr" and "cached" not in timings
+
+    again = {}
+    assert "".join(pdf_parser.chat_with_context_stream("FY24 net profit?", CONTEXT, client=client,
+                                                       timings=again, role="ceo", company="Jio Platforms")) == streamed
+    assert again["cached"]["question"] == "FY24 net profit?"
+    assert pdf_parser.chat_with_context("FY24 net profit?", CONTEXT, role="ceo", company="Jio Platforms") == streamed
+    assert len(client.calls) == 1
@@ -0,0 +1,57 @@
+import pytest
+
+from src import query_cache, vector_store
+from src.chat_over_vector_db import find_relevant_chunks, find_relevant_chunks_batch, search_chunks, search_chunks_batch
+from src.pdf_parser import save_to_vector_db
+from tools.bench_scaling import QUERIES, generate_chunks
+
+ROLES = [("ceo", "Jio Platforms"), ("ceo", "Reliance Industries"), ("analyst", None),
+         ("owner", None), ("inventory_manager", None), ("ceo", "Nobody Ltd")]
+
+
+@pytest.fixture
+def corpus(fake_embedder, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    for chunk in generate_chunks(120, seed=5):
+        save_to_vector_db(chunk["content"], chunk["metadata"])
+    query_cache.reset()
+    return fake_embedder
+
+
+def test_batch_matches_single_queries(corpus):
+    requests = [(q, role, company, k) for q in QUERIES for (role, company), k in zip(ROLES, (3, 5, 8, 5, 2, 5))]
+    batch = search_chunks_batch(requests)
+    batch_lexical = search_chunks_batch(requests[:12], lexical_weight=1.0)
+    batch_dense = search_chunks_batch(requests[:12], lexical_weight=0.0)
+    query_cache.reset()
+
+    for req, hits in zip(requests, batch):
+        single = search_chunks(*req)
+        assert [h["id"] for h in hits] == [h["id"] for h in single]
+        assert [h["score"] for h in hits] == pytest.approx([h["score"] for h in single])
+        assert [h["distance"] for h in hits] == pytest.approx([h["distance"] for h in single], rel=1e-5)
+    for req, hits in zip(requests[:12], batch_lexical):
+        assert [h["id"] for h in hits] == [h["id"] for h in search_chunks(*req, lexical_weight=1.0)]
+    for req, hits in zip(requests[:12], batch_dense):
+        assert [h["id"] for h in hits] == [h["id"] for h in search_chunks(*req, lexical_weight=0.0)]
+
+
+def test_one_encode_and_one_search_per_shard_and_filter(corpus, monkeypatch):
+    searched = []
+    real = vector_store.VectorStore.candidates_batch
+    monkeypatch.setattr(vector_store.VectorStore, "candidates_batch",
+                        lambda self, queries, *a, **kw: searched.append(len(queries)) or real(self, queries, *a, **kw))
+    calls = []
+    real_encode = corpus.encode
+    monkeypatch.setattr(corpus, "encode", lambda texts, **kw: calls.append(list(texts)) or real_encode(texts, **kw))
+
+    requests = [(q, "ceo", "Jio Platforms", 5) for q in QUERIES] + [("summary", "ceo", "Reliance Industries", 5)]
+    results = find_relevant_chunks_batch(requests)
+
+    # One forward pass over the distinct queries
+    assert len(calls) == 1 and sorted(calls[0]) == sorted(set(QUERIES) | {"summary"})
+    assert searched == [len(QUERIES), 1]
+    assert results[-1] == find_relevant_chunks("summary", "ceo", "Reliance Industries")
+    # Served from the shared result cache afterwards.
+    searched.clear()
+    assert find_relevant_chunks_batch(requests) == results and searched == []
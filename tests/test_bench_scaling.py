@@ -0,0 +1,30 @@
+from src import query_cache
+from tools.bench_scaling import STATEMENTS, generate_chunks, indian_format, run_scale
+
+
+def test_indian_format():
+    assert indian_format(1755986) == "17,55,986"
+    assert indian_format(-16646) == "-16,646"
+    assert indian_format(770) == "770"
+
+
+def test_generate_chunks_is_deterministic_and_varied():
+    chunks = generate_chunks(120, seed=3)
+
+    assert chunks == generate_chunks(120, seed=3)
+    assert len({c["content"] for c in chunks}) == 120
+    assert {c["metadata"]["statement"] for c in chunks} == set(STATEMENTS)
+    assert len({c["metadata"]["company"] for c in chunks}) > 3
+    assert len({c["metadata"]["fiscal_year"] for c in chunks}) > 3
+
+
+def test_run_scale_reports_ingest_and_latency(fake_embedder, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    result = run_scale(60, queries=10)
+
+    assert result["ingested"] == 60
+    assert result["query_p50_ms"] <= result["query_p99_ms"]
+    assert 0 < result["index_bytes"] < result["db_bytes"]
+    # Every timed query is a real retrieval, not a cached result
+    assert query_cache.cache_metrics()["results"]["hits"] == 0
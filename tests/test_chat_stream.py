@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+
+from src import pdf_parser
+
+
+class FakeStreamingClient:
+    """Local stand-in for `Mistral.chat.stream`."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.calls = []
+        self.chat = SimpleNamespace(stream=self._stream)
+
+    def _stream(self, model, messages):
+        self.calls.append(messages)
+        yield SimpleNamespace(data=SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=""))]))
+        for token in self.tokens:
+            yield SimpleNamespace(data=SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))]))
+        yield SimpleNamespace(data=SimpleNamespace(choices=[]))
+
+
+def test_tokens_stream_and_timings_are_recorded():
+    client = FakeStreamingClient(["Net ", "profit ", "was ", "₹79,020 Cr."])
+    timings = {}
+
+    stream = pdf_parser.chat_with_context_stream("FY24 net profit?", "| Net Profit | 79,020 |", client=client, timings=timings)
+    first = next(stream)
+    assert first == "Net "
+    assert "ttft" in timings and "total" not in timings
+
+    answer = first + "".join(stream)
+
+    assert answer == "Net profit was ₹79,020 Cr."
+    assert timings["total"] >= timings["ttft"]
+    assert timings["chars"] == len(answer)
+    assert pdf_parser.chat_timings[-1] == timings
+    assert client.calls[0][-1] == {"role": "user", "content": "FY24 net profit?"}
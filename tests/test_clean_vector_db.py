@@ -0,0 +1,53 @@
+import random
+
+import numpy as np
+
+from src.embedder import encode
+from tools.clean_vector_db import SIMILARITY_THRESHOLD, find_merge_clusters, hash_chunk
+
+
+def greedy_reference(docs, threshold=SIMILARITY_THRESHOLD):
+    """The original pairwise keep-first loop, kept here as the oracle."""
+    kept, seen = [], set()
+    for pos, doc in enumerate(docs):
+        content = doc["content"]
+        if hash_chunk(content) in seen:
+            continue
+        duplicated = False
+        for k in kept:
+            other = docs[k]["content"]
+            v1, v2 = encode([content, other])
+            if content.strip() == other.strip() or np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2)) >= threshold:
+                duplicated = True
+                break
+        if not duplicated:
+            seen.add(hash_chunk(content))
+            kept.append(pos)
+    return kept
+
+
+def test_matches_pairwise_greedy(fake_embedder):
+    rng = random.Random(7)
+    words = ["revenue", "ebitda", "assets", "equity", "inventory", "retail", "jio", "o2c", "capex", "eps"]
+    docs = []
+    for _ in range(120):
+        picked = rng.sample(words, 3)
+        text = " ".join(picked)
+        if rng.random() < 0.3:
+            text = "  " + " ".join(reversed(picked)) + " "
+        docs.append({"id": str(len(docs)), "content": text, "metadata": {}})
+
+    kept, merged = find_merge_clusters(docs)
+
+    assert kept == greedy_reference(docs)
+    assert sorted(kept + [m for ms in merged.values() for m in ms]) == list(range(len(docs)))
+
+
+def test_each_distinct_text_is_embedded_once(fake_embedder):
+    docs = [{"id": str(i), "content": t, "metadata": {}} for i, t in enumerate(["a b", "a b ", "c d", "a b"])]
+
+    kept, merged = find_merge_clusters(docs)
+
+    assert kept == [0, 2]
+    assert merged == {0: [1, 3]}
+    assert fake_embedder.encoded == ["a b", "c d"]
@@ -0,0 +1,59 @@
+from src.context_packer import compact_table_whitespace, count_tokens, pack_context
+
+PADDED = (
+    "| Item                    | FY2023–24 (₹ Cr) |\n"
+    "|-------------------------|------------------|\n"
+    "| Raw Materials           | 18,770           |\n"
+    "| Work in Progress        | 58,936           |\n"
+    "| Finished Goods          | 20,274           |\n"
+    "| **Total Inventory**     | **1,52,770**     |"
+)
+
+
+def test_table_padding_is_compacted():
+    assert compact_table_whitespace(PADDED) == (
+        "| Item | FY2023–24 (₹ Cr) |\n"
+        "| --- | --- |\n"
+        "| Raw Materials | 18,770 |\n"
+        "| Work in Progress | 58,936 |\n"
+        "| Finished Goods | 20,274 |\n"
+        "| **Total Inventory** | **1,52,770** |"
+    )
+    assert count_tokens(compact_table_whitespace(PADDED)) < count_tokens(PADDED)
+
+
+def test_duplicates_dropped_and_order_follows_score():
+    hits = [
+        {"content": "- Debt/EBITDA improved to 0.89x\n- Net profit up 6.6%", "distance": 0.9},
+        {"content": PADDED, "distance": 0.2},
+        {"content": PADDED.replace("  ", " "), "distance": 0.3},
+        {"content": PADDED.replace("18,770", "18,771"), "distance": 0.4},
+    ]
+
+    text, packed = pack_context(hits, budget_tokens=1000)
+
+    assert [h["distance"] for h in packed] == [0.2, 0.9]
+    assert text.startswith("| Item |")
+    assert text.endswith("Net profit up 6.6%")
+
+
+def test_only_whole_chunks_within_budget():
+    small = {"content": "- ARPU ₹181.90", "distance": 0.1}
+    hits = [small, {"content": PADDED, "distance": 0.5}]
+    budget = count_tokens(compact_table_whitespace(small["content"]))
+
+    text, packed = pack_context(hits, budget_tokens=budget)
+
+    assert packed == [small]
+    assert text == "- ARPU ₹181.90"
+
+
+def test_oversized_best_chunk_is_cut_at_a_row():
+    table = compact_table_whitespace(PADDED)
+    rows = table.splitlines()
+    budget = count_tokens("\n".join(rows[:3])) + 1
+
+    text, packed = pack_context([{"content": PADDED, "distance": 0.1}], budget_tokens=budget)
+
+    assert text == "\n".join(rows[:3])
+    assert len(packed) == 1
@@ -0,0 +1,48 @@
+import os
+
+from src import dashboard_views
+from src.dashboard_views import affected_views, load_view, view_path
+from src.pdf_parser import save_to_vector_db
+
+JIO = "| Metric | Value |\n|---|---|\n| Revenue | ₹1,19,791 Cr |\n| EBITDA | ₹50,586 Cr |\n| Customers | 481.8 million |"
+RETAIL = "| Metric | Value |\n|---|---|\n| Revenue | ₹3,06,848 Cr |\n| EBITDA | ₹23,082 Cr |\n| Stores | 18,836 |"
+INVENTORY = "| Item | FY2023–24 (₹ Cr) |\n|---|---|\n| Raw Materials | 18,770 |\n| Finished Goods | 20,274 |"
+
+
+def test_views_are_built_at_ingest_and_read_without_search(fake_embedder, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    save_to_vector_db(JIO, {"role": "ceo", "company": "Jio Platforms"})
+    assert os.path.exists(view_path("ceo", "Jio Platforms"))
+
+    fake_embedder.encoded.clear()
+    view = load_view("ceo", "Jio Platforms")
+    assert [c["content"] for c in view["chunks"]] == [JIO]
+    assert fake_embedder.encoded == []
+    assert load_view("ceo", None) is None and load_view("analyst") is None
+
+
+def test_only_affected_views_are_rebuilt(fake_embedder, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    save_to_vector_db(JIO, {"role": "ceo", "company": "Jio Platforms"})
+    save_to_vector_db(INVENTORY, {"role": "inventory_manager", "company": "Reliance Industries"})
+    jio_mtime = os.stat(view_path("ceo", "Jio Platforms")).st_mtime_ns
+    inventory_mtime = os.stat(view_path("inventory_manager")).st_mtime_ns
+
+    built = []
+    real = dashboard_views.build_view
+    monkeypatch.setattr(dashboard_views, "build_view", lambda role, company=None: built.append((role, company)) or real(role, company))
+    save_to_vector_db(RETAIL, {"role": ["ceo", "owner"], "company": "Reliance Retail Ventures"})
+
+    assert sorted(built, key=str) == [("ceo", "Reliance Retail Ventures"), ("owner", None)]
+    assert os.stat(view_path("ceo", "Jio Platforms")).st_mtime_ns == jio_mtime
+    assert os.stat(view_path("inventory_manager")).st_mtime_ns == inventory_mtime
+    assert [c["content"] for c in load_view("ceo", "Reliance Retail Ventures")["chunks"]] == [RETAIL]
+
+
+def test_affected_views_respect_company_scope():
+    docs = [
+        {"metadata": {"role": ["ceo", "analyst"], "company": "Jio Platforms"}},
+        {"metadata": {"role": "inventory_manager", "company": "Reliance Industries"}},
+        {"metadata": {"role": "ceo"}},
+    ]
+    assert affected_views(docs) == {("ceo", "Jio Platforms"), ("inventory_manager", None)}
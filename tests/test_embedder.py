@@ -0,0 +1,34 @@
+import threading
+
+from src import embedder
+from tests.conftest import FakeEmbedder
+
+
+def test_model_is_loaded_once_across_threads(monkeypatch):
+    embedder.clear_embedders()
+    loads = []
+
+    def fake_load(model_path, device):
+        loads.append(model_path)
+        return FakeEmbedder()
+
+    monkeypatch.setattr(embedder, "_load_model", fake_load)
+
+    threads = [threading.Thread(target=embedder.encode, args=(["revenue"],)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert loads == [embedder.DEFAULT_MODEL_PATH]
+    metrics = embedder.embedder_metrics()[f"{embedder.DEFAULT_MODEL_PATH}@cpu"]
+    assert metrics["loads"] == 1
+    assert metrics["encode_calls"] == 8
+    assert metrics["encoded_texts"] == 8
+    embedder.clear_embedders()
+
+
+def test_encode_returns_float32_matrix(fake_embedder):
+    vectors = embedder.encode(["net profit", "total assets"])
+    assert vectors.shape == (2, fake_embedder.dim)
+    assert vectors.dtype == "float32"
@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+
+from src import embedding_cache
+from src.embedding_cache import cache_stats, clear_cache_state, encode_cached, model_dir
+
+
+def test_only_missing_texts_are_encoded(fake_embedder):
+    first = encode_cached(["raw materials", "finished goods"])
+    fake_embedder.encoded.clear()
+
+    again = encode_cached(["finished goods", "stock-in-trade", "raw materials", "stock-in-trade"])
+
+    assert fake_embedder.encoded == ["stock-in-trade"]
+    np.testing.assert_array_equal(again[0], first[1])
+    np.testing.assert_array_equal(again[2], first[0])
+    np.testing.assert_array_equal(again[1], again[3])
+    assert cache_stats()["hits"] == 2 and cache_stats()["misses"] == 3
+
+
+def test_vectors_persist_across_processes(fake_embedder):
+    expected = encode_cached(["total assets", "borrowings"])
+    clear_cache_state()  # as if a new process opened the cache
+    fake_embedder.encoded.clear()
+
+    assert np.array_equal(encode_cached(["borrowings", "total assets"]), expected[::-1])
+    assert fake_embedder.encoded == []
+
+
+def test_rows_from_an_interrupted_write_are_ignored(fake_embedder):
+    encode_cached(["ebitda"])
+    path = model_dir()
+    with open(os.path.join(path, embedding_cache.VECTORS_FILE), "ab") as f:
+        f.write(b"\0" * 40)  # vector bytes whose id line was never written
+    clear_cache_state()
+
+    vectors = encode_cached(["arpu", "ebitda"])
+
+    assert os.path.getsize(os.path.join(path, embedding_cache.VECTORS_FILE)) == 2 * fake_embedder.dim * 4
+    assert np.array_equal(vectors[0], fake_embedder.encode(["arpu"])[0])
+
+
+def test_empty_input_keeps_the_matrix_shape(fake_embedder):
+    assert encode_cached([]).shape == (0, fake_embedder.dim)
+    encode_cached(["ebitda"])
+    fake_embedder.encoded.clear()
+
+    assert encode_cached([]).shape == (0, fake_embedder.dim)
+    assert fake_embedder.encoded == []
@@ -0,0 +1,57 @@
+import faiss
+import pytest
+
+from src import vector_store
+from src.chat_over_vector_db import search_chunks
+from src.pdf_parser import save_to_vector_db
+from src.shards import shard_dir
+from src.vector_store import build_index, get_store
+
+COMPANIES = ["Reliance Industries", "Jio Platforms", "Reliance Retail Ventures"]
+
+
+def seed(n=24):
+    for i in range(n):
+        company = COMPANIES[i % len(COMPANIES)]
+        text = f"| Metric | FY20{10 + i}-{11 + i} |\n|---|---|\n| Revenue line {i} {company} | {1000 + i * 37:,} |"
+        save_to_vector_db(text, {"role": "ceo", "company": company})
+
+
+@pytest.mark.parametrize("spec, kind", [
+    ("SQfp16", faiss.IndexScalarQuantizer),
+    ("SQ8", faiss.IndexScalarQuantizer),
+    ("PQ4x2", faiss.IndexPQ),
+    ("IVF4,Flat", faiss.IndexIVFFlat),
+    ("HNSW8", faiss.IndexHNSWFlat),
+])
+def test_configured_index_types_search_with_filters(fake_embedder, monkeypatch, tmp_path, spec, kind):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(vector_store, "INDEX_SPEC", spec)
+    seed()
+    save_to_vector_db("", rebuild=True)
+
+    index = get_store(shard_dir("Jio Platforms")).snapshot().index
+    assert isinstance(index, kind) and index.ntotal == 8
+
+    hits = search_chunks("Revenue line 4 Jio Platforms", role="ceo", company="Jio Platforms", k=3, lexical_weight=0)
+    assert hits and all(h["metadata"]["company"] == "Jio Platforms" for h in hits)
+    assert hits[0]["content"].count("Revenue line 4 ") == 1
+
+
+def test_untrainable_spec_falls_back_to_flat():
+    vectors = faiss.rand((10, 8))
+    index = build_index(vectors, spec="IVF64,Flat")
+    assert isinstance(index, faiss.IndexFlatL2) and index.ntotal == 10
+
+
+def test_readers_memory_map_the_index(fake_embedder, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    seed(6)
+    opened = []
+    real = faiss.read_index
+    monkeypatch.setattr(faiss, "read_index", lambda path, *flags: opened.append(flags) or real(path, *flags))
+    save_to_vector_db("| Metric | FY2024-25 |\n|---|---|\n| Revenue line extra | 9,999 |", {"role": "ceo", "company": "Jio Platforms"})
+    get_store(shard_dir("Jio Platforms")).snapshot()
+
+    # The writer opens the index normally to append; readers map it.
+    assert opened == [(), (vector_store.MMAP_FLAGS,)]
@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+
+import pytest
+
+from src import ingest_jobs, parse_cache, pdf_parser
+from src.ingest_jobs import EXTRACTING, FAILED, INDEXED, resume_jobs, retry_job, submit_job, wait_for
+from src.shards import read_all_docs
+from tests.test_page_ranges import FakeMistral, make_pdf
+
+
+class BrokenMistral(FakeMistral):
+    def _complete(self, model, messages):
+        raise RuntimeError("OCR unavailable")
+
+
+@pytest.fixture
+def jobs_env(fake_embedder, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(parse_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(pdf_parser, "PAGES_PER_RANGE", 4)
+    monkeypatch.setattr(ingest_jobs, "_pool", None)
+    # Blank test pages have no text layer; send them all to the (fake) OCR.
+    monkeypatch.setattr(pdf_parser, "extract_local", lambda data: [
+        {"page": n, "status": "fallback", "markdown": "", "statement": None}
+        for n in range(pdf_parser.count_pdf_pages(data))
+    ])
+    client = FakeMistral()
+    monkeypatch.setattr(pdf_parser, "get_client", lambda: client)
+    return monkeypatch
+
+
+def pdf_bytes(pages, tag=b""):
+    return make_pdf(pages).getvalue() + tag
+
+
+def test_submit_returns_at_once_and_job_gets_indexed(jobs_env):
+    job_id = submit_job("report.pdf", pdf_bytes(10), metadata={"role": "analyst"}, user="analyst1")
+
+    job = wait_for(job_id)
+    assert job["status"] == INDEXED
+    assert job["done"] == job["total"] == 3 and job["new_chunks"] == 3
+    assert len(read_all_docs()) == 3
+    assert os.path.exists(ingest_jobs.markdown_path(job_id))
+    assert not os.path.exists(ingest_jobs._pdf_path(job_id))
+    # Indexed jobs are not reused, so the PDF can be ingested again after a rebuild.
+    again = submit_job("report.pdf", pdf_bytes(10), user="analyst1")
+    assert again != job_id and wait_for(again)["new_chunks"] == 0
+
+
+def test_resubmitting_reuses_the_users_unfinished_job(jobs_env):
+    jobs_env.setattr(ingest_jobs, "_schedule", lambda job_id: False)
+    job_id = submit_job("report.pdf", pdf_bytes(3), user="analyst1")
+    assert submit_job("report.pdf", pdf_bytes(3), user="analyst1") == job_id
+
+    ingest_jobs._update(job_id, status=FAILED, error="boom")
+    assert submit_job("report.pdf", pdf_bytes(3), user="analyst1") == job_id
+    assert [j["status"] for j in ingest_jobs.list_jobs(user="analyst1")] == [FAILED]
+
+    other = submit_job("report.pdf", pdf_bytes(3), user="analyst2")
+    assert other != job_id
+    assert [j["id"] for j in ingest_jobs.list_jobs(user="analyst2")] == [other]
+
+
+def test_unfinished_jobs_resume_after_restart(jobs_env):
+    schedule = ingest_jobs._schedule
+    jobs_env.setattr(ingest_jobs, "_schedule", lambda job_id: False)  # the process dies before running it
+    job_id = submit_job("report.pdf", pdf_bytes(6))
+    ingest_jobs._update(job_id, status=EXTRACTING, done=1, total=2)
+    jobs_env.setattr(ingest_jobs, "_schedule", schedule)
+
+    assert resume_jobs() == [job_id]
+    assert wait_for(job_id)["status"] == INDEXED
+
+
+def test_failed_ranges_fail_the_job_until_retried(jobs_env):
+    jobs_env.setattr(pdf_parser, "get_client", lambda: BrokenMistral())
+    job_id = submit_job("report.pdf", pdf_bytes(5))
+
+    job = wait_for(job_id)
+    assert job["status"] == FAILED
+    assert len(job["failed_ranges"]) == 2 and "OCR unavailable" in job["failed_ranges"][0]["error"]
+
+    client = FakeMistral()
+    jobs_env.setattr(pdf_parser, "get_client", lambda: client)
+    assert retry_job(job_id)
+    assert wait_for(job_id)["status"] == INDEXED
+
+
+def test_a_failed_range_keeps_the_job_retryable(jobs_env):
+    class FlakyMistral(FakeMistral):
+        def _complete(self, model, messages):
+            if "pages_4_7" in messages[0]["content"][1]["document_url"]:
+                raise RuntimeError("429 rate limited")
+            return super()._complete(model, messages)
+
+    jobs_env.setattr(pdf_parser, "get_client", lambda: FlakyMistral())
+    job_id = submit_job("report.pdf", pdf_bytes(10))
+
+    job = wait_for(job_id)
+    assert job["status"] == FAILED and job["new_chunks"] == 2
+    assert [r["pages"] for r in job["failed_ranges"]] == ["5–8"]
+    assert os.path.exists(ingest_jobs._pdf_path(job_id))
+
+    client = FakeMistral()
+    jobs_env.setattr(pdf_parser, "get_client", lambda: client)
+    assert retry_job(job_id)
+    job = wait_for(job_id)
+    assert job["status"] == INDEXED and job["failed_ranges"] == []
+    # Only the missing range went back to OCR
+    assert list(client.pages_seen.values()) == [4]
+    assert len(read_all_docs()) == 3
+
+
+def test_workers_are_bounded(jobs_env):
+    jobs_env.setattr(ingest_jobs, "MAX_INGEST_WORKERS", 1)
+    active, peak, lock = [0], [0], threading.Lock()
+    real = ingest_jobs.run_job
+
+    def tracked(job_id):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        try:
+            real(job_id)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    jobs_env.setattr(ingest_jobs, "run_job", tracked)
+    ids = [submit_job(f"report{i}.pdf", pdf_bytes(2, tag=bytes([i]))) for i in range(3)]
+
+    assert [wait_for(i)["status"] for i in ids] == [INDEXED] * 3
+    assert peak[0] == 1
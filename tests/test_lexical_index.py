@@ -0,0 +1,78 @@
+import sqlite3
+
+from src.chat_over_vector_db import search_chunks
+from src.doc_store import DocStore
+from src.lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+from src.pdf_parser import save_to_vector_db
+from src.shards import shard_dir
+from src.vector_store import get_doc_store, get_store
+
+EPS = "| Metric | 2023–24 (₹ Cr) |\n|---|---|\n| Profit for the Year | 79,020 |\n| EPS (Basic) | ₹102.90 |"
+RATIOS = "| Ratio | FY2023–24 |\n|---|---|\n| Debt/EBITDA | 1.1x |\n| Return on Equity | 9.2% |"
+INVENTORY = "| Item | FY2022–23 (₹ Cr) |\n|---|---|\n| Stock-in-Trade | 26,654 |\n| Finished Goods | 27,885 |"
+
+
+def test_tokenize_keeps_financial_terms():
+    terms = tokenize("Debt/EBITDA and Stock-in-Trade for FY2023–24 were ₹1,52,770 Cr (+12.5%)")
+    assert {"debt/ebitda", "debt", "ebitda", "stock-in-trade", "trade"} <= set(terms)
+    assert {"fy2023-24", "2023-24", "152770", "12.5%"} <= set(terms)
+    assert "in" not in terms and "for" not in terms
+
+
+def test_bm25_prefers_the_rarer_exact_term(tmp_path):
+    store = DocStore(str(tmp_path / "docs.sqlite"))
+    store.append([{"id": str(i), "content": c, "metadata": {}} for i, c in enumerate((EPS, RATIOS, INVENTORY))])
+    lexical = LexicalIndex(store)
+    assert lexical.search("Debt/EBITDA ratio", 2)[0][1] == 1
+    assert [row for _, row in lexical.search("EPS", 3)] == [0]
+    assert lexical.search("EPS", 3, rows=[1, 2]) == []
+
+
+def test_rrf_weights_move_the_ranking():
+    assert reciprocal_rank_fusion([[1, 2], [2, 3]], [0.5, 0.5])[0][0] == 2
+    assert [r for r, _ in reciprocal_rank_fusion([[1, 2], [3]], [1.0, 0.0])] == [1, 2]
+
+
+def test_hybrid_search_finds_exact_metric_names(fake_embedder, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    for chunk in (EPS, RATIOS, INVENTORY):
+        save_to_vector_db(chunk, {"role": "analyst", "company": "Reliance Industries"})
+    assert get_doc_store(shard_dir("Reliance Industries")).term_stats(["eps"])[2] == {"eps": 1}
+
+    for query, expected in (("EPS", EPS), ("Debt/EBITDA", RATIOS), ("Stock-in-Trade", INVENTORY)):
+        hits = search_chunks(query, role="analyst", k=1, lexical_weight=1.0)
+        assert hits[0]["content"] == expected
+        fused = search_chunks(query, role="analyst", k=3)
+        assert fused[0]["content"] == expected
+        assert fused[0]["score"] >= fused[-1]["score"]
+
+    assert search_chunks("EPS", role="ceo", k=3) == []
+
+
+def test_postings_are_backfilled_for_older_databases(fake_embedder, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    save_to_vector_db(EPS, {"role": "analyst"})
+    # Stores written before postings lived in docs.sqlite
+    conn = sqlite3.connect(get_doc_store(shard_dir(None)).path)
+    with conn:
+        conn.execute("DELETE FROM postings")
+        conn.execute("DELETE FROM doc_lengths")
+    conn.close()
+    save_to_vector_db(RATIOS, {"role": "analyst"})
+
+    lexical = get_store(shard_dir(None)).snapshot().lexical
+    assert lexical.stats("EPS")["docs"] == 2
+    assert [r for _, r in lexical.search("EPS", 2)] == [0]
+
+
+def test_appends_insert_postings_without_rewriting_them(fake_embedder, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    save_to_vector_db(EPS, {"role": "analyst"})
+    store = get_doc_store(shard_dir(None))
+    before = store.postings("eps")
+
+    save_to_vector_db(RATIOS, {"role": "analyst"})
+
+    assert store.postings("eps") == before
+    assert [row for row, _, _ in store.postings("debt/ebitda")] == [1]
+    assert not list(tmp_path.glob("db/**/lexical_index.json"))
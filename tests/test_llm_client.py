@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+from mistralai.models import SDKError
+
+from src.fake_mistral_server import FAKE_ANSWER, FakeMistralServer
+from src.llm_client import PooledMistral, TokenBucket
+
+
+@pytest.fixture
+def server():
+    with FakeMistralServer(seed=0) as s:
+        yield s
+
+
+def _client(server, **kwargs):
+    kwargs.setdefault("rate", 1000)
+    kwargs.setdefault("burst", 1000)
+    kwargs.setdefault("backoff_base", 0.001)
+    return PooledMistral(api_key="test", server_url=server.url, **kwargs)
+
+
+def test_extraction_calls_round_trip_through_the_sdk(server, tmp_path):
+    server.error_rate = 0.3
+    client = _client(server, max_retries=10)
+    pdf = tmp_path / "q3.pdf"
+    pdf.write_bytes(b"%PDF-1.4 fake")
+    with open(pdf, "rb") as f:
+        upload = client.files.upload(file={"file_name": "q3.pdf", "content": f}, purpose="ocr")
+    url = client.files.get_signed_url(file_id=upload.id).url
+    response = client.chat.complete(model="m", messages=[{"role": "user", "content": url}])
+
+    assert upload.filename == "q3.pdf"
+    assert upload.size_bytes > len(b"%PDF-1.4 fake")  # whole file re-sent on retry
+    assert url.endswith(upload.id)
+    assert response.choices[0].message.content == FAKE_ANSWER
+
+
+def test_stream_yields_the_whole_answer(server):
+    client = _client(server)
+    tokens = [e.data.choices[0].delta.content for e in client.chat.stream(model="m", messages=[{"role": "user", "content": "q"}])]
+    assert "".join(tokens) == FAKE_ANSWER
+    assert client.metrics.summary()["chat.stream"]["errors"] == 0
+
+
+def test_retryable_errors_are_retried_and_recorded(server):
+    server.error_rate = 0.5
+    client = _client(server, max_retries=10)
+    for _ in range(10):
+        client.chat.complete(model="m", messages=[{"role": "user", "content": "q"}])
+
+    summary = client.metrics.summary()["chat.complete"]
+    assert server.failures > 0
+    assert summary["errors"] == server.failures
+    assert summary["calls"] == 10 + server.failures
+    assert summary["p50"] is not None
+
+
+def test_non_retryable_errors_raise_immediately(server):
+    server.error_rate, server.error_status = 1.0, 400
+    client = _client(server)
+    with pytest.raises(SDKError):
+        client.chat.complete(model="m", messages=[{"role": "user", "content": "q"}])
+    assert server.requests == 1
+
+
+def test_concurrency_is_capped_and_connections_are_reused(server):
+    server.latency = 0.05
+    client = _client(server, max_concurrent=2, pool_connections=2)
+    active, peak, lock = [0], [0], threading.Lock()
+    send = client.sdk.chat.complete
+
+    def tracked(**kwargs):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        try:
+            return send(**kwargs)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    client.sdk.chat.complete = tracked
+    threads = [
+        threading.Thread(target=client.chat.complete, kwargs={"model": "m", "messages": [{"role": "user", "content": "q"}]})
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert peak[0] == 2
+    assert server.requests == 8
+    assert len(server.connections) <= 2
+
+
+def test_token_bucket_limits_sustained_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.09
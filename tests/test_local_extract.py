@@ -0,0 +1,96 @@
+import io
+
+import fitz  # PyMuPDF
+
+from src import local_extract, parse_cache, pdf_parser
+from src.shards import read_all_docs
+from tests.test_page_ranges import FakeMistral
+
+ROWS = [
+    ["Particulars", "FY2023-24", "FY2022-23"],
+    ["Total Assets", "17,55,986", "16,07,431"],
+    ["Total Equity", "9,25,788", "8,28,881"],
+    ["Total Liabilities", "8,30,198", "7,78,550"],
+]
+
+
+def draw_table(page, rows, top=100):
+    xs = [50, 250, 400, 550]
+    y = top
+    for row in rows:
+        for x, cell in zip(xs, row):
+            page.insert_text((x + 5, y + 15), cell, fontsize=10)
+        page.draw_line((xs[0], y), (xs[-1], y))
+        y += 25
+    page.draw_line((xs[0], y), (xs[-1], y))
+    for x in xs:
+        page.draw_line((x, top), (x, y))
+
+
+def make_report():
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((50, 60), "Consolidated Balance Sheet as at 31st March, 2024", fontsize=12)
+    draw_table(page, ROWS)
+    doc.new_page().insert_text((50, 60), "Chairman's message: a year of steady growth and investment.", fontsize=12)
+    doc.new_page().insert_text((50, 60), "Consolidated Statement of Cash Flows (see scanned annexure)", fontsize=12)
+    doc.new_page()
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_pages_are_classified():
+    pages = local_extract.extract_local(make_report())
+
+    assert [p["status"] for p in pages] == ["parsed", "fallback", "fallback", "empty"]
+    assert pages[0]["statement"] == "balance_sheet"
+    assert pages[0]["markdown"].splitlines()[:3] == [
+        "| Particulars | FY2023-24 | FY2022-23 |",
+        "|---|---|---|",
+        "| Total Assets | 17,55,986 | 16,07,431 |",
+    ]
+
+
+def test_multi_batch_pdfs_parse_in_spawned_workers(monkeypatch):
+    monkeypatch.setattr(local_extract, "PAGES_PER_TASK", 2)
+
+    pages = local_extract.extract_local(make_report(), max_workers=2)
+
+    assert [(p["page"], p["status"]) for p in pages] == [
+        (0, "parsed"), (1, "fallback"), (2, "fallback"), (3, "empty"),
+    ]
+
+
+def test_narrative_table_is_not_confident():
+    assert not local_extract.is_confident_table([["Name", "Role"], ["A. Kumar", "Director"], ["B. Shah", "CFO"]])
+    assert local_extract.is_confident_table(ROWS)
+
+
+def test_merged_line_items_are_not_confident():
+    assert not local_extract.is_confident_table(ROWS[:1] + [["Total Assets", "17,55,986 16,07,431", ""]] + ROWS[2:])
+    assert not local_extract.is_confident_table(ROWS[:1] + [["Assets\nEquity\nLiabilities", "17,55,986", "16,07,431"]] + ROWS[2:])
+    assert not local_extract.is_confident_table(ROWS + [[None, "6,766", None], [None, "7,86,715", None]])
+
+
+def test_garbled_statement_pages_fall_back_to_ocr():
+    with open("output/pages_0_3.pdf", "rb") as f:
+        pages = local_extract.extract_local(f.read())
+
+    assert [p["status"] for p in pages] == ["fallback"] * 4
+
+
+def test_only_unparsed_pages_go_to_remote(fake_embedder, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(parse_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    client = FakeMistral()
+    upload = io.BytesIO(make_report())
+    upload.name = "report.pdf"
+
+    results = list(pdf_parser.extract_pdf_in_ranges(upload, local_first=True, client=client))
+
+    # The narrative page goes to OCR too; only the blank page is skipped
+    assert [(r["pages"], r["source"]) for r in results] == [("1", "local"), ("2–3", "remote")]
+    assert list(client.pages_seen.values()) == [2]
+    statements = {d["metadata"]["pages"]: d["metadata"].get("statement") for d in read_all_docs()}
+    assert statements == {"1": "balance_sheet", "2–3": None}
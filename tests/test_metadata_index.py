@@ -0,0 +1,31 @@
+from src.metadata_index import MetadataIndex, normalize_roles
+
+
+def test_scalar_and_list_roles_normalise_the_same():
+    assert normalize_roles("ceo") == ["ceo"]
+    assert normalize_roles(["ceo", " analyst "]) == ["ceo", "analyst"]
+    assert normalize_roles(None) == []
+
+
+def test_role_filter_is_exact_not_substring():
+    meta = MetadataIndex.from_docs([
+        {"metadata": {"role": "inventory_manager"}},
+        {"metadata": {"role": ["manager", "analyst"]}},
+    ])
+    assert meta.rows_for(role="manager").tolist() == [1]
+    assert meta.rows_for(role="inventory_manager").tolist() == [0]
+
+
+def test_filters_intersect_and_fiscal_years_normalise():
+    meta = MetadataIndex.from_docs([
+        {"metadata": {"role": ["ceo"], "company": "Jio Platforms", "fiscal_year": "2023–24"}},
+        {"metadata": {"role": ["ceo"], "company": "Reliance Industries", "fiscal_year": "2023-24"}},
+        {"metadata": {"role": ["owner"], "company": "Reliance Industries", "fiscal_year": "FY2022-23"}},
+    ])
+    assert meta.rows_for(role="ceo", fiscal_year="FY2023-24").tolist() == [0, 1]
+    assert meta.rows_for(role="ceo", company="Reliance Industries").tolist() == [1]
+    assert meta.rows_for(company="All").tolist() == []
+    assert meta.rows_for() is None
+
+    reloaded = MetadataIndex(meta.to_json())
+    assert reloaded.rows_for(fiscal_year="2022-23").tolist() == [2]
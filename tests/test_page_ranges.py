@@ -0,0 +1,94 @@
+import io
+import threading
+import time
+from types import SimpleNamespace
+
+from PyPDF2 import PdfReader, PdfWriter
+
+from src import parse_cache, pdf_parser
+from src.shards import read_all_docs
+
+
+class FakeMistral:
+    """Local stand-in for the Mistral SDK surface used by the extractor."""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.pages_seen = {}
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self.files = SimpleNamespace(upload=self._upload, get_signed_url=self._signed_url)
+        self.chat = SimpleNamespace(complete=self._complete)
+
+    def _upload(self, file, purpose):
+        pages = len(PdfReader(file["content"]).pages)
+        file_id = file["file_name"]
+        self.pages_seen[file_id] = pages
+        return SimpleNamespace(id=file_id)
+
+    def _signed_url(self, file_id):
+        return SimpleNamespace(url=f"local://{file_id}")
+
+    def _complete(self, model, messages):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        url = messages[0]["content"][1]["document_url"]
+        text = f"| Source | Pages |\n|---|---|\n| {url} | extracted financial table rows |"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+def make_pdf(pages):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    buf = io.BytesIO()
+    writer.write(buf)
+    upload = io.BytesIO(buf.getvalue())
+    upload.name = "annual_report.pdf"
+    return upload
+
+
+def test_split_pdf_pages_uses_inclusive_ranges():
+    parts = pdf_parser.split_pdf_pages(make_pdf(10).getvalue(), pages_per_range=4)
+    assert [(first, last) for first, last, _ in parts] == [(0, 3), (4, 7), (8, 9)]
+    assert [len(PdfReader(io.BytesIO(b)).pages) for _, _, b in parts] == [4, 4, 2]
+
+
+def test_ranges_are_extracted_concurrently_and_indexed(fake_embedder, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(parse_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    client = FakeMistral()
+
+    results = list(pdf_parser.extract_pdf_in_ranges(
+        make_pdf(10), metadata={"role": "analyst"}, pages_per_range=4, max_workers=2, client=client
+    ))
+
+    assert sorted(r["pages"] for r in results) == ["1–4", "5–8", "9–10"]
+    assert all(r["error"] is None and len(r["new_docs"]) == 1 for r in results)
+    assert sorted(client.pages_seen.values()) == [2, 4, 4]
+    assert client.peak == 2
+    stored = sorted(d["metadata"]["pages"] for d in read_all_docs())
+    assert stored == ["1–4", "5–8", "9–10"]
+
+    # A re-upload is answered from the parse cache, range by range.
+    again = list(pdf_parser.extract_pdf_in_ranges(make_pdf(10), pages_per_range=4, client=FakeMistral()))
+    assert all(r["new_docs"] == [] for r in again)
+
+
+def test_failed_ranges_leave_no_temp_files(monkeypatch, tmp_path):
+    monkeypatch.setattr(parse_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(pdf_parser.tempfile, "gettempdir", lambda: str(tmp_path))
+
+    class RateLimited(FakeMistral):
+        def _complete(self, model, messages):
+            raise RuntimeError("429 rate limited")
+
+    results = list(pdf_parser.extract_pdf_in_ranges(make_pdf(6), pages_per_range=4, client=RateLimited(), index=False))
+
+    assert all("429" in str(r["error"]) for r in results)
+    assert not list(tmp_path.glob("upload_*.pdf"))
@@ -0,0 +1,43 @@
+import io
+import os
+
+from src import parse_cache, pdf_parser
+
+
+class Upload(io.BytesIO):
+    name = "annual_report.pdf"
+
+
+def test_second_upload_is_served_from_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(parse_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    calls = []
+
+    def fake_remote(pdf_bytes, file_name, prompt_text, model):
+        calls.append(pdf_bytes)
+        return "| Metric | Value |", str(tmp_path / "upload.pdf")
+
+    monkeypatch.setattr(pdf_parser, "_extract_remote", fake_remote)
+
+    first = pdf_parser.extract_text_from_pdf(Upload(b"%PDF-1 report"))
+    second = pdf_parser.extract_text_from_pdf(Upload(b"%PDF-1 report"))
+    other_prompt = pdf_parser.extract_text_from_pdf(Upload(b"%PDF-1 report"), prompt_text="Only KPIs")
+
+    assert first[0] == second[0] == "| Metric | Value |"
+    assert second[1].endswith(".md")
+    assert len(calls) == 2
+    assert other_prompt[0] == "| Metric | Value |"
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache_dir = str(tmp_path)
+    keys = [parse_cache.cache_key(bytes([i]), "p", "m") for i in range(3)]
+    for n, key in enumerate(keys):
+        path = parse_cache.put(key, "x" * 100, cache_dir=cache_dir)
+        os.utime(path, (n, n))
+    parse_cache.get(keys[0], cache_dir=cache_dir)
+
+    parse_cache.evict(cache_dir, max_bytes=250)
+
+    assert parse_cache.get(keys[0], cache_dir=cache_dir) is not None
+    assert parse_cache.get(keys[1], cache_dir=cache_dir) is None
+    assert parse_cache.get(keys[2], cache_dir=cache_dir) is not None
@@ -0,0 +1,68 @@
+from src import chat_over_vector_db, query_cache
+from src.chat_over_vector_db import search_chunks
+from src.pdf_parser import save_to_vector_db
+from src.query_cache import TTLCache
+from src.shards import read_all_docs, rewrite_sharded
+
+JIO = "| Metric | Value |\n|---|---|\n| Revenue | ₹1,19,791 Cr |\n| EBITDA | ₹50,586 Cr |\n| Customers | 481.8 million |"
+RETAIL = "| Metric | Value |\n|---|---|\n| Revenue | ₹3,06,848 Cr |\n| EBITDA | ₹23,082 Cr |\n| Stores | 18,836 |"
+
+
+def count_searches(monkeypatch):
+    calls = []
+    real = chat_over_vector_db.search_shards
+    monkeypatch.setattr(chat_over_vector_db, "search_shards", lambda *a, **kw: calls.append(a[0]) or real(*a, **kw))
+    return calls
+
+
+def test_repeated_queries_are_served_from_cache(fake_embedder, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    save_to_vector_db(JIO, {"role": "ceo", "company": "Jio Platforms"})
+    searches = count_searches(monkeypatch)
+    fake_embedder.encoded.clear()
+
+    first = search_chunks("revenue", role="ceo", company="Jio Platforms")
+    first[0]["content"] = "edited by caller"
+    second = search_chunks("revenue", role="ceo", company="Jio Platforms")
+
+    assert searches == ["revenue"]
+    assert fake_embedder.encoded == ["revenue"]
+    assert second[0]["content"] == JIO
+    assert query_cache.cache_metrics()["results"]["hits"] == 1
+
+
+def test_ingest_invalidates_results_but_keeps_query_vectors(fake_embedder, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    save_to_vector_db(JIO, {"role": "owner", "company": "Jio Platforms"})
+    assert len(search_chunks("revenue", role="owner")) == 1
+    fake_embedder.encoded.clear()
+
+    save_to_vector_db(RETAIL, {"role": "owner", "company": "Reliance Retail Ventures"})
+
+    assert len(search_chunks("revenue", role="owner")) == 2
+    assert "revenue" not in fake_embedder.encoded
+
+
+def test_rewrites_outside_save_to_vector_db_change_the_index_version(fake_embedder, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    save_to_vector_db(f"{JIO}\n\n{RETAIL}", {"role": "owner", "company": "Jio Platforms"})
+    assert len(search_chunks("revenue", role="owner")) == 2
+
+    rewrite_sharded([d for d in read_all_docs() if d["content"] == JIO])
+
+    assert [h["content"] for h in search_chunks("revenue", role="owner")] == [JIO]
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None and cache.get("a") == 1
+    now[0] = 11
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1 and cache.stats()["expired"] == 1
@@ -0,0 +1,77 @@
+import math
+
+import pytest
+
+from src import table_parser
+from src.display import markdown_to_df
+from src.table_parser import cached_table, parse_number, parse_table
+
+CHUNK = """| Item                    | FY2023–24 (₹ Cr) | FY2022–23 (₹ Lakh) |
+|-------------------------|------------------|------------------|
+| Raw Materials           | 18,770           | 13,75,800        |
+| Net Cash from Investing | −1,14,301        | (91,235)         |
+| Growth                  | +12.5%           | -                |
+| **Total Inventory**     | **1,52,770**     | **₹14,000 Cr**   |"""
+
+
+@pytest.mark.parametrize("cell, unit, expected", [
+    ("17,55,986", "crore", 1755986.0),
+    ("**1,52,770**", "crore", 152770.0),
+    ("₹1,19,791 Cr", "crore", 119791.0),
+    ("−16,646", "crore", -16646.0),
+    ("+4.2%", "crore", 4.2),
+    ("(1,234)", "crore", -1234.0),
+    ("₹50 lakh", "crore", 0.5),
+    ("₹2 Cr", "lakh", 200.0),
+    ("481.8 million", "crore", 481.8),
+])
+def test_parse_number(cell, unit, expected):
+    assert parse_number(cell, unit) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("cell", ["", "—", "N/A", "Jio Platforms", "2023–24"])
+def test_non_numbers_are_none(cell):
+    assert parse_number(cell) is None
+
+
+def test_parse_table_types_columns_and_normalises_units():
+    df = parse_table("Inventory note\n\n" + CHUNK)
+
+    assert list(df.columns) == ["Item", "FY2023–24 (₹ Cr)", "FY2022–23 (₹ Lakh)"]
+    assert df["Item"].tolist()[-1] == "Total Inventory"
+    assert str(df.dtypes.iloc[1]) == "float64" and str(df.dtypes.iloc[2]) == "float64"
+    assert df.iloc[:, 1].tolist() == [18770.0, -114301.0, 12.5, 152770.0]
+    lakh = df.iloc[:, 2].tolist()
+    assert lakh[:2] == [1375800.0, -91235.0] and math.isnan(lakh[2])
+    assert lakh[3] == pytest.approx(1400000.0)  # ₹14,000 Cr in a lakh column
+
+
+def test_text_columns_stay_text():
+    df = parse_table("| Segment | Status |\n|---|---|\n| Jio | **Growing** |\n| Retail | Stable |")
+    assert df["Status"].tolist() == ["Growing", "Stable"]
+    assert parse_table("No table here, just prose.") is None
+
+
+def test_cache_is_keyed_by_chunk_id_and_bounded(monkeypatch):
+    table_parser.clear_table_cache()
+    calls = []
+    real = table_parser.parse_table
+    monkeypatch.setattr(table_parser, "parse_table", lambda md: calls.append(md) or real(md))
+
+    first = cached_table(CHUNK, "doc-1", maxsize=2)
+    first["extra"] = 1.0  # callers may mutate their copy
+    again = cached_table(CHUNK, "doc-1", maxsize=2)
+    assert len(calls) == 1 and "extra" not in again.columns
+
+    cached_table(CHUNK, "doc-2", maxsize=2)
+    cached_table(CHUNK, "doc-3", maxsize=2)
+    cached_table(CHUNK, "doc-1", maxsize=2)
+    assert len(calls) == 4
+    table_parser.clear_table_cache()
+
+
+def test_markdown_to_df_uses_the_parser():
+    table_parser.clear_table_cache()
+    df = markdown_to_df(CHUNK, "doc-x")
+    assert df.iloc[0, 1] == 18770.0
+    assert markdown_to_df("plain text") is None
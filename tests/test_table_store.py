@@ -0,0 +1,42 @@
+from src import table_parser, table_store
+from src.display import markdown_to_df
+from src.pdf_parser import save_to_vector_db
+from src.table_store import load_table, remove_tables, table_path
+from src.shards import read_all_docs
+
+INVENTORY = """| Item                    | FY2023–24 (₹ Cr) | FY2022–23 (₹ Cr) |
+|-------------------------|------------------|------------------|
+| Raw Materials           | 18,770           | 13,758           |
+| **Total Inventory**     | **1,52,770**     | **1,40,008**     |"""
+NOTE = "Inventories are valued at the lower of cost and net realisable value, on a weighted average basis."
+
+
+def test_ingest_stores_typed_tables_by_doc_id(fake_embedder, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    save_to_vector_db(f"{INVENTORY}\n\n{NOTE}", {"role": "inventory_manager", "company": "Reliance Industries"})
+    table_doc, note_doc = sorted(read_all_docs(), key=lambda d: d["content"] != INVENTORY)
+
+    df = load_table(table_doc["id"])
+    assert df["Item"].tolist() == ["Raw Materials", "Total Inventory"]
+    assert df.iloc[:, 1].tolist() == [18770.0, 152770.0]
+    assert load_table(note_doc["id"]) is None
+
+    remove_tables([table_doc["id"]])
+    assert not (tmp_path / table_path(table_doc["id"])).exists()
+
+
+def test_dashboard_loads_stored_frames_without_parsing(fake_embedder, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    save_to_vector_db(INVENTORY, {"role": "inventory_manager"})
+    doc_id = read_all_docs()[0]["id"]
+    table_parser.clear_table_cache()
+
+    def fail(md):
+        raise AssertionError("dashboard re-parsed a stored table")
+
+    monkeypatch.setattr(table_parser, "parse_table", fail)
+    monkeypatch.setattr(table_store, "parse_table", fail)
+    df = markdown_to_df(INVENTORY, doc_id)
+    df["extra"] = 0.0
+    assert df.iloc[1, 2] == 140008.0
+    assert "extra" not in markdown_to_df(INVENTORY, doc_id).columns
@@ -0,0 +1,62 @@
+import json
+import threading
+
+import pytest
+
+from src import tracing
+from src.chat_over_vector_db import search_chunks
+from src.pdf_parser import save_to_vector_db
+from src.tracing import bind, prometheus_text, slow_requests, span, trace
+
+JIO = "| Metric | Value |\n|---|---|\n| Revenue | ₹1,19,791 Cr |\n| EBITDA | ₹50,586 Cr |\n| Customers | 481.8 million |"
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    tracing.reset()
+    yield
+    tracing.reset()
+
+
+def test_request_records_stages_and_logs_json(fake_embedder, monkeypatch, tmp_path, caplog):
+    monkeypatch.chdir(tmp_path)
+    save_to_vector_db(JIO, {"role": "ceo", "company": "Jio Platforms"})
+    monkeypatch.setattr(tracing.log, "propagate", True)
+
+    with caplog.at_level("INFO", logger=tracing.log.name):
+        with trace("chat", role="ceo") as request:
+            search_chunks("revenue", role="ceo", company="Jio Platforms")
+
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["request_id"] == request.request_id
+    assert {"encode", "search"} <= set(record["stages"])
+    assert record["attrs"] == {"role": "ceo"}
+    assert slow_requests(0.0)[0]["request_id"] == request.request_id
+
+
+def test_worker_threads_join_the_callers_request():
+    with trace("upload") as request:
+        thread = threading.Thread(target=bind(lambda: tracing.record_stage("ocr_upload", 0.2)))
+        thread.start()
+        thread.join()
+    assert "ocr_upload" in request.stages()
+
+
+def test_errors_are_recorded_and_reraised():
+    with pytest.raises(ValueError), trace("dashboard") as request:
+        with span("load_view"):
+            raise ValueError("boom")
+    assert request.error == "ValueError"
+    assert request.spans[0]["error"] == "ValueError"
+
+
+def test_prometheus_histogram_is_cumulative():
+    for seconds in (0.003, 0.2, 0.2, 7.0):
+        tracing.observe("stage_seconds", seconds, stage="search")
+
+    text = prometheus_text()
+    assert "# TYPE balance_sheet_gpt_stage_seconds histogram" in text
+    assert 'balance_sheet_gpt_stage_seconds_bucket{stage="search",le="0.005"} 1' in text
+    assert 'balance_sheet_gpt_stage_seconds_bucket{stage="search",le="0.25"} 3' in text
+    assert 'balance_sheet_gpt_stage_seconds_bucket{stage="search",le="+Inf"} 4' in text
+    assert 'balance_sheet_gpt_stage_seconds_count{stage="search"} 4' in text
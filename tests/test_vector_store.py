@@ -0,0 +1,154 @@
+import json
+import os
+
+import faiss
+
+from src.chat_over_vector_db import find_relevant_chunks, search_chunks
+from src.pdf_parser import save_to_vector_db
+from src.shards import read_all_docs, shard_dir, shard_dirs
+from src.vector_store import build_flat_index, get_doc_store
+from tests.conftest import FakeEmbedder
+
+INVENTORY = "| Item | FY2023-24 |\n|---|---|\n| Raw Materials | 18,770 |\n| Finished Goods inventory | 20,274 |"
+BALANCE = "| Metric | FY2023-24 |\n|---|---|\n| Total Assets | 17,55,986 |\n| Total Equity balance sheet | 9,25,788 |"
+SEGMENT = "| Segment | Revenue |\n|---|---|\n| Retail segment revenue | 3,06,478 |\n| O2C segment revenue | 5,00,279 |"
+
+
+def seed(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    save_to_vector_db(INVENTORY, {"role": "inventory_manager", "company": "Reliance Industries"})
+    save_to_vector_db(BALANCE, {"role": ["ceo", "analyst"], "company": "Reliance Industries"})
+    save_to_vector_db(SEGMENT, {"role": ["owner"], "company": "All"})
+
+
+def test_query_encodes_only_the_query(fake_embedder, monkeypatch, tmp_path):
+    seed(monkeypatch, tmp_path)
+    fake_embedder.encoded.clear()
+
+    hits = search_chunks("finished goods inventory", role="inventory_manager", k=5)
+
+    assert [h["content"] for h in hits] == [INVENTORY]
+    assert fake_embedder.encoded == ["finished goods inventory"]
+
+
+def test_role_and_company_filter_on_stored_index(fake_embedder, monkeypatch, tmp_path):
+    seed(monkeypatch, tmp_path)
+
+    assert find_relevant_chunks("total assets", role="ceo", company="Reliance Industries") == [BALANCE]
+    assert find_relevant_chunks("total assets", role="ceo", company="Jio Platforms") == []
+    assert find_relevant_chunks("revenue", role="owner", k=5) == [SEGMENT]
+
+
+def test_store_reloads_after_ingest(fake_embedder, monkeypatch, tmp_path):
+    seed(monkeypatch, tmp_path)
+    assert len(search_chunks("revenue", role="analyst", k=10)) == 1
+
+    extra = "| Metric | Value |\n|---|---|\n| ARPU analyst revenue | 181.90 |\n| Customers | 481.8 Mn |"
+    save_to_vector_db(extra, {"role": "analyst", "company": "Jio Platforms"})
+
+    assert len(search_chunks("revenue", role="analyst", k=10)) == 2
+
+
+def test_append_embeds_only_new_chunks(fake_embedder, monkeypatch, tmp_path):
+    seed(monkeypatch, tmp_path)
+    fake_embedder.encoded.clear()
+
+    extra = "| Metric | Value |\n|---|---|\n| ARPU | 181.90 |\n| Customers | 481.8 Mn |"
+    new_docs = save_to_vector_db(f"{INVENTORY}\n\n{extra}", {"role": "analyst"})
+
+    assert [d["content"] for d in new_docs] == [extra]
+    assert fake_embedder.encoded == [extra]
+    assert get_doc_store(shard_dir(None)).ids() == [new_docs[0]["id"]]
+
+
+def test_rebuild_reads_vectors_from_the_embedding_cache(fake_embedder, monkeypatch, tmp_path):
+    seed(monkeypatch, tmp_path)
+    fake_embedder.encoded.clear()
+
+    save_to_vector_db("", rebuild=True)
+
+    assert fake_embedder.encoded == []
+    assert find_relevant_chunks("raw materials", role="inventory_manager") == [INVENTORY]
+
+
+def test_legacy_docs_jsonl_is_migrated_into_company_shards(fake_embedder, monkeypatch, tmp_path):
+    docs = [
+        {"id": "inv", "content": INVENTORY, "metadata": {"role": "inventory_manager", "company": "Reliance Industries"}},
+        {"id": "bal", "content": BALANCE, "metadata": {"role": ["ceo", "analyst"], "company": "Reliance Industries"}},
+        {"id": "seg", "content": SEGMENT, "metadata": {"role": ["owner"], "company": "All"}},
+    ]
+    # The pre-SQLite, pre-shard layout: docs.jsonl in index order plus one FAISS file.
+    db = tmp_path / "db"
+    db.mkdir()
+    faiss.write_index(build_flat_index(FakeEmbedder().encode([d["content"] for d in docs])), str(db / "vector_index.faiss"))
+    with open(db / "docs.jsonl", "w", encoding="utf-8") as f:
+        for doc in docs + docs[:1]:
+            f.write(json.dumps(doc) + "\n")
+    monkeypatch.chdir(tmp_path)
+    fake_embedder.encoded.clear()
+
+    assert find_relevant_chunks("raw materials", role="inventory_manager") == [INVENTORY]
+    # Vectors are copied out of the old index, not re-embedded.
+    assert fake_embedder.encoded == ["raw materials"]
+    assert len(shard_dirs()) == 2
+    assert get_doc_store(shard_dir("Reliance Industries")).ids() == ["inv", "bal"]
+    assert sorted(d["id"] for d in read_all_docs()) == ["bal", "inv", "seg"]
+
+
+def test_company_queries_touch_one_shard_and_others_fan_out(fake_embedder, monkeypatch, tmp_path):
+    seed(monkeypatch, tmp_path)
+    extra = "| Metric | Value |\n|---|---|\n| Jio total assets | 5,00,000 |\n| Customers | 481.8 Mn |"
+    save_to_vector_db(extra, {"role": ["ceo", "analyst"], "company": "Jio Platforms"})
+    assert len(shard_dirs()) == 3
+
+    from src import vector_store
+    searched = []
+    real = vector_store.VectorStore.candidates
+    monkeypatch.setattr(vector_store.VectorStore, "candidates",
+                        lambda self, *a, **kw: searched.append(self.db_dir) or real(self, *a, **kw))
+
+    assert find_relevant_chunks("total assets", role="ceo", company="Jio Platforms") == [extra]
+    assert searched == [os.path.abspath(shard_dir("Jio Platforms"))]
+
+    searched.clear()
+    hits = search_chunks("total assets", role="analyst", k=5, lexical_weight=0)
+    assert len(searched) == 3
+    assert sorted(h["content"] for h in hits) == sorted([BALANCE, extra])
+    assert [h["distance"] for h in hits] == sorted(h["distance"] for h in hits)
+
+
+def test_ingest_only_rewrites_the_changed_shard(fake_embedder, monkeypatch, tmp_path):
+    seed(monkeypatch, tmp_path)
+    untouched = os.path.join(shard_dir("All"), "vector_index.faiss")
+    before = os.stat(untouched).st_mtime_ns
+
+    extra = "| Metric | Value |\n|---|---|\n| Jio total assets | 5,00,000 |\n| Customers | 481.8 Mn |"
+    save_to_vector_db(extra, {"role": "ceo", "company": "Reliance Industries"})
+
+    assert os.stat(untouched).st_mtime_ns == before
+    assert get_doc_store(shard_dir("Reliance Industries")).count() == 3
+
+
+def test_sharded_search_matches_a_single_store(fake_embedder, monkeypatch, tmp_path):
+    from src.chat_over_vector_db import query_vector
+    from src.embedding_cache import content_hash
+    from src.shards import ingest_sharded, search_shards, shard_name
+    from src.vector_store import get_store, ingest_docs
+    from tools.bench_scaling import QUERIES, generate_chunks
+
+    monkeypatch.chdir(tmp_path)
+    docs = [{"id": content_hash(c["content"]), **c} for c in generate_chunks(150, seed=5)]
+    # Same row order in both layouts, so equal scores break ties the same way
+    docs.sort(key=lambda d: shard_name(d["metadata"].get("company")))
+    ingest_docs(docs, db_dir="single")
+    ingest_sharded(docs, db_dir="sharded")
+    assert len(shard_dirs("sharded")) > 3
+
+    single = get_store("single")
+    for query in QUERIES:
+        vector = query_vector(query)
+        for weight in (0.0, 0.5, 1.0):
+            expected = single.hybrid_search(query, vector, k=5, lexical_weight=weight)
+            found = search_shards(query, vector, k=5, lexical_weight=weight, db_dir="sharded")
+            assert [d["id"] for _, _, d in found] == [d["id"] for _, _, d in expected], (query, weight)
+            assert [s for s, _, _ in found] == [s for s, _, _ in expected]
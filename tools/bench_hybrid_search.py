@@ -0,0 +1,64 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from load_initial_vectordb import chunks, build_vector_db
+from src import query_cache
+from src.chat_over_vector_db import search_chunks
+
+# (query, text that the right chunk contains)
+QUERIES = [
+    ("EPS", "EPS (Basic)"),
+    ("What was the basic EPS?", "EPS (Basic)"),
+    ("ARPU", "ARPU"),
+    ("Jio ARPU per month", "ARPU"),
+    ("Debt/EBITDA", "Debt/EBITDA"),
+    ("net debt to EBITDA ratio", "Debt/EBITDA"),
+    ("Stock-in-Trade", "Stock-in-Trade"),
+    ("Programming/Film Rights", "Programming/Film Rights"),
+    ("closing cash and equivalents", "Closing Cash"),
+    ("total inventory FY2023-24", "Total Inventory"),
+    ("KG-D6 litigation", "KG-D6"),
+    ("net cash from investing", "Net Cash from Investing"),
+]
+
+
+def bench(k=5, weights=(0.0, 0.5, 1.0), repeat=20):
+    """Hit rate@k and latency of vector-only, hybrid and BM25-only search on the seeded corpus."""
+    results = {}
+    for weight in weights:
+        hits, latencies = 0, []
+        for query, expected in QUERIES:
+            found = search_chunks(query, role=None, k=k, lexical_weight=weight)
+            hits += any(expected in h["content"] for h in found)
+            for _ in range(repeat):
+                query_cache.reset()  # time retrieval, not a cached result
+                start = time.perf_counter()
+                search_chunks(query, role=None, k=k, lexical_weight=weight)
+                latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        results[f"lexical_weight={weight}"] = {
+            "hit_rate": round(hits / len(QUERIES), 3),
+            "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+            "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 3),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark hybrid BM25 + vector retrieval on the seeded corpus.")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--weights", type=float, nargs="+", default=[0.0, 0.5, 1.0])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)  # seed a throwaway db/ instead of the real one
+        build_vector_db(chunks)
+        print("🔎 Benchmarking retrieval...")
+        print(json.dumps(bench(args.k, args.weights, args.repeat), indent=2))
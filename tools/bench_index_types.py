@@ -0,0 +1,87 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.vector_store import build_index, read_index_file
+
+DEFAULT_SPECS = ["Flat", "SQfp16", "SQ8", "PQ48", "IVF1024,Flat", "IVF1024,SQ8", "HNSW32"]
+
+
+def _rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def synthetic_vectors(n, dim=384, clusters=200, seed=0):
+    """Unit vectors around `clusters` topics, roughly like MiniLM chunk embeddings."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype("float32")
+    vectors = centers[rng.integers(0, clusters, n)] + 0.35 * rng.standard_normal((n, dim)).astype("float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def bench(vectors, queries, specs, k=10):
+    """Recall@k against exact search, per-query latency, file size and mapped RSS per index spec."""
+    _, truth = faiss.knn(queries, vectors, k)
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for spec in specs:
+            start = time.perf_counter()
+            index = build_index(vectors, spec)
+            build_seconds = time.perf_counter() - start
+            path = os.path.join(workdir, "index.faiss")
+            faiss.write_index(index, path)
+            del index
+
+            before = _rss_mb()
+            index = read_index_file(path, mmap=True)
+            loaded_rss = _rss_mb() - before
+
+            latencies = []
+            found = np.empty_like(truth)
+            for i, query in enumerate(queries):
+                t = time.perf_counter()
+                _, found[i:i + 1] = index.search(query[None, :], k)
+                latencies.append(time.perf_counter() - t)
+            latencies.sort()
+            recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+            results[spec] = {
+                "recall_at_k": round(float(recall), 4),
+                "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+                "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 3),
+                "index_mb": round(os.path.getsize(path) / 1e6, 2),
+                "rss_after_load_mb": round(loaded_rss, 2),
+                "build_seconds": round(build_seconds, 2),
+            }
+            print(f"📏 {spec}: {results[spec]}")
+            del index
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare FAISS index types against the flat baseline.")
+    parser.add_argument("--n", type=int, default=100_000, help="Synthetic corpus size")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--specs", nargs="+", default=DEFAULT_SPECS)
+    parser.add_argument("--out", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    data = synthetic_vectors(args.n + args.queries, args.dim)
+    results = bench(data[:args.n], data[args.n:], args.specs, args.k)
+    report = {"n": args.n, "dim": args.dim, "k": args.k, "results": results}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Results written to {args.out}")
+    else:
+        print(json.dumps(report, indent=2))
@@ -0,0 +1,196 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Everything stays local: the bundled model_cache and a fake Mistral server.
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+SCALES = [1_000, 10_000, 100_000, 1_000_000]
+INGEST_BATCH = 500          # chunks per save_to_vector_db call, like one extracted page range
+QUERY_COUNT = 300
+
+COMPANIES = ["Reliance Industries", "Jio Platforms", "Reliance Retail Ventures", "Reliance New Energy",
+             "Network18 Media", "Reliance Life Sciences", "All"]
+FISCAL_YEARS = [f"{y}–{str(y + 1)[2:]}" for y in range(2012, 2025)]
+# statement -> (roles, row labels), modelled on tools/load_initial_vectordb.py
+STATEMENTS = {
+    "inventory": (["inventory_manager"], ["Raw Materials", "Work in Progress", "Finished Goods",
+                                          "Stores and Spares", "Stock-in-Trade", "Programming/Film Rights"]),
+    "balance_sheet": (["ceo", "analyst"], ["Total Assets", "Equity (including non-controlling)",
+                                           "Total Liabilities", "Borrowings", "Trade Payables"]),
+    "profit_and_loss": (["ceo", "analyst"], ["Revenue from Operations", "Other Income", "Total Income",
+                                             "EBITDA", "Profit for the Year", "EPS (Basic)"]),
+    "cash_flow": (["analyst"], ["Net Cash from Operating Activities", "Net Cash from Investing",
+                                "Net Cash from Financing", "Closing Cash and Equivalents"]),
+    "segment": (["owner"], ["O2C", "Oil and Gas", "Retail", "Digital Services", "Media", "New Energy"]),
+    "kpi": (["ceo"], ["ARPU", "Customers", "Debt/EBITDA", "Footfalls", "Store Count", "Data Traffic"]),
+}
+QUERIES = ["total inventory", "summary", "segment revenue", "EPS", "Debt/EBITDA", "net cash from investing",
+           "ARPU per month", "profit for the year", "stock-in-trade", "closing cash and equivalents"]
+
+
+def indian_format(value):
+    """1755986 -> '17,55,986'."""
+    sign, digits = ("-" if value < 0 else ""), str(abs(int(value)))
+    if len(digits) <= 3:
+        return sign + digits
+    head, tail = digits[:-3], digits[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    return sign + ",".join([head] + groups + [tail]) if head else sign + ",".join(groups + [tail])
+
+
+def generate_chunks(n, seed=0):
+    """`n` distinct markdown table chunks with varied company, role, statement and fiscal year."""
+    rng = random.Random(seed)
+    names = list(STATEMENTS)
+    chunks = []
+    for i in range(n):
+        statement = names[i % len(names)]
+        roles, labels = STATEMENTS[statement]
+        company = rng.choice(COMPANIES)
+        year = rng.choice(FISCAL_YEARS)
+        prev = f"{int(year[:4]) - 1}–{year[2:4]}"
+        rows = rng.sample(labels, k=min(len(labels), rng.randint(3, len(labels))))
+        lines = [f"| Item ({company} #{i}) | FY{year} (₹ Cr) | FY{prev} (₹ Cr) |", "|---|---|---|"]
+        for label in rows:
+            lines.append(f"| {label} | {indian_format(rng.randint(-50_000, 20_00_000))} | "
+                         f"{indian_format(rng.randint(-50_000, 20_00_000))} |")
+        chunks.append({
+            "content": "\n".join(lines),
+            "metadata": {"role": roles if len(roles) > 1 else roles[0], "company": company,
+                         "statement": statement, "fiscal_year": year},
+        })
+    return chunks
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))] if values else None
+
+
+def _dir_bytes(path, suffix=""):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files if f.endswith(suffix))
+    return total
+
+
+def run_scale(n, queries=QUERY_COUNT, seed=0):
+    """Ingest `n` synthetic chunks into ./db and time retrieval; run inside a scratch directory."""
+    from src.pdf_parser import save_to_vector_db
+    from src import query_cache
+    from src.chat_over_vector_db import find_relevant_chunks
+
+    chunks = generate_chunks(n, seed)
+    batches = {}
+    for chunk in chunks:
+        key = json.dumps(chunk["metadata"], sort_keys=True)
+        batches.setdefault(key, []).append(chunk["content"])
+
+    start = time.perf_counter()
+    ingested = 0
+    for key, contents in batches.items():
+        metadata = json.loads(key)
+        for i in range(0, len(contents), INGEST_BATCH):
+            ingested += len(save_to_vector_db("\n\n".join(contents[i:i + INGEST_BATCH]), metadata))
+    ingest_seconds = time.perf_counter() - start
+
+    rng = random.Random(seed + 1)
+    latencies = []
+    for _ in range(queries):
+        statement = rng.choice(list(STATEMENTS))
+        role = rng.choice(STATEMENTS[statement][0])
+        company = rng.choice(COMPANIES) if role == "ceo" else None
+        query_cache.reset()  # time retrieval, not a cached result
+        t = time.perf_counter()
+        find_relevant_chunks(rng.choice(QUERIES), role=role, company=company)
+        latencies.append(time.perf_counter() - t)
+
+    return {
+        "docs": n,
+        "ingested": ingested,
+        "ingest_seconds": round(ingest_seconds, 3),
+        "ingest_docs_per_second": round(ingested / ingest_seconds, 1) if ingest_seconds else None,
+        "query_p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+        "query_p95_ms": round(_percentile(latencies, 0.95) * 1000, 3),
+        "query_p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "index_bytes": _dir_bytes("db", ".faiss"),
+        "db_bytes": _dir_bytes("db"),
+    }
+
+
+def _single(n, queries, hash_embedder):
+    """One scale in this process, so peak RSS belongs to that scale alone."""
+    from src import embedder
+    from src.fake_mistral_server import FakeMistralServer
+
+    if hash_embedder:
+        # Only for machines without the model weights; numbers are not comparable.
+        from tests.conftest import FakeEmbedder
+        embedder.register_embedder(FakeEmbedder(dim=384))
+    else:
+        embedder.warm_up()  # loads ./model_cache before leaving the repo root
+
+    with FakeMistralServer() as llm, tempfile.TemporaryDirectory() as workdir:
+        os.environ["MISTRAL_SERVER_URL"] = llm.url
+        os.chdir(workdir)
+        result = run_scale(n, queries)
+    print(json.dumps(result))
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest and retrieval scaling benchmark on a synthetic corpus.")
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES)
+    parser.add_argument("--queries", type=int, default=QUERY_COUNT)
+    parser.add_argument("--out", help="Write results JSON here (e.g. bench/scaling-<commit>.json)")
+    parser.add_argument("--hash-embedder", action="store_true", help="Use a hashing embedder instead of MiniLM")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        _single(args.single, args.queries, args.hash_embedder)
+        sys.exit(0)
+
+    report = {"commit": _git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": []}
+    for n in args.scales:
+        print(f"🏗️ Benchmarking {n:,} docs...")
+        cmd = [sys.executable, os.path.abspath(__file__), "--single", str(n), "--queries", str(args.queries)]
+        if args.hash_embedder:
+            cmd.append("--hash-embedder")
+        proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(proc.stderr[-2000:])
+            report["results"].append({"docs": n, "error": proc.stderr.strip().splitlines()[-1:]})
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"   {result}")
+        report["results"].append(result)
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Results written to {args.out}")
+    else:
+        print(json.dumps(report, indent=2))
@@ -0,0 +1,75 @@
+import os
+import sys
+import json
+import time
+import argparse
+from io import StringIO
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.table_parser import cached_table, clear_table_cache, parse_table
+from src.shards import read_all_docs
+
+SAMPLE_CHUNK = """| Item                    | FY2023–24 (₹ Cr) | FY2022–23 (₹ Cr) |
+|-------------------------|------------------|------------------|
+| Raw Materials           | 18,770           | 13,758           |
+| Work in Progress        | 58,936           | 51,282           |
+| Finished Goods          | 20,274           | 27,885           |
+| Stores and Spares       | 12,054           | 14,538           |
+| Stock-in-Trade          | 32,526           | 26,654           |
+| Net Cash from Investing | −1,14,301        | -91,235          |
+| **Total Inventory**     | **1,52,770**     | **1,40,008**     |"""
+
+
+def legacy_markdown_to_df(md):
+    """The previous read_csv parser plus the dashboard's per-column coercion."""
+    try:
+        lines = [l for l in md.split('\n') if '|' in l]
+        if len(lines) < 3:
+            return None
+        csv = "\n".join([lines[0]] + lines[2:])
+        df = pd.read_csv(StringIO(csv), sep="|", engine="python")
+        df = df.dropna(axis=1, how="all")
+        df.columns = [c.strip() for c in df.columns]
+    except Exception:
+        return None
+    for col in df.columns[1:]:
+        df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', ''), errors='coerce')
+    return df
+
+
+def _time(fn, chunks, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for i, chunk in enumerate(chunks):
+            fn(chunk, i)
+    return (time.perf_counter() - start) / (repeat * len(chunks)) * 1e6
+
+
+def bench(chunks, repeat=50):
+    """Microseconds per chunk for the legacy parser, the new parser, and a warm cache."""
+    clear_table_cache()
+    for i, chunk in enumerate(chunks):
+        cached_table(chunk, str(i))
+    legacy_nan = sum(int(df.iloc[:, 1:].isna().sum().sum()) for df in map(legacy_markdown_to_df, chunks) if df is not None)
+    new_nan = sum(int(df.iloc[:, 1:].isna().sum().sum()) for df in map(parse_table, chunks) if df is not None)
+    return {
+        "chunks": len(chunks),
+        "legacy_us": round(_time(lambda c, i: legacy_markdown_to_df(c), chunks, repeat), 1),
+        "parse_us": round(_time(lambda c, i: parse_table(c), chunks, repeat), 1),
+        "cached_us": round(_time(lambda c, i: cached_table(c, str(i)), chunks, repeat), 1),
+        "legacy_unparsed_cells": legacy_nan,
+        "parse_unparsed_cells": new_nan,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the markdown table parsers.")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--sample", action="store_true", help="Use the bundled sample chunk instead of db/")
+    args = parser.parse_args()
+
+    chunks = [SAMPLE_CHUNK] if args.sample else [d["content"] for d in read_all_docs()] or [SAMPLE_CHUNK]
+    print("⏱️ Benchmarking table parsers...")
+    print(json.dumps(bench(chunks, args.repeat), indent=2))
@@ -1,81 +1,133 @@
 import os
+import sys
 import json
+import argparse
 import hashlib
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from tqdm import tqdm
 
-VECTOR_PATH = "db/vector_index.faiss"
-DOCS_PATH = "db/docs.jsonl"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.embedding_cache import encode_cached
+from src.shards import read_all_docs, rewrite_sharded
+from src.table_store import remove_tables, save_tables
+from src.dashboard_views import clear_views
+
 SIMILARITY_THRESHOLD = 0.97  # Cosine similarity threshold to merge similar chunks
+SEARCH_BATCH = 1024  # Queries per FAISS range search, bounds result memory
 
 def hash_chunk(content):
     return hashlib.md5(content.strip().encode()).hexdigest()
 
-def read_docs():
-    if not os.path.exists(DOCS_PATH):
-        return []
-    with open(DOCS_PATH, "r", encoding="utf-8") as f:
-        return [json.loads(line.strip()) for line in f]
-
-def write_docs(docs):
-    with open(DOCS_PATH, "w", encoding="utf-8") as f:
-        for doc in docs:
-            f.write(json.dumps(doc) + "\n")
-
 def is_duplicate_text(text1, text2):
     return text1.strip() == text2.strip()
 
-def is_similar_text(text1, text2, model, threshold=SIMILARITY_THRESHOLD):
-    v1, v2 = model.encode([text1, text2])
-    dot = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
-    return dot >= threshold
+def embed_normalized(texts):
+    vectors = np.ascontiguousarray(encode_cached(texts), dtype="float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+def similar_pairs(vectors, threshold=SIMILARITY_THRESHOLD):
+    """For each row i, the earlier rows j < i with cosine(i, j) >= threshold, ascending."""
+    index = faiss.IndexFlatIP(vectors.shape[1])
+    index.add(vectors)
+    neighbours = []
+    for start in range(0, len(vectors), SEARCH_BATCH):
+        lims, _, I = index.range_search(vectors[start:start + SEARCH_BATCH], threshold)
+        for offset in range(len(lims) - 1):
+            row = start + offset
+            hits = I[lims[offset]:lims[offset + 1]]
+            neighbours.append(np.sort(hits[hits < row]))
+    return neighbours
+
+def find_merge_clusters(docs, threshold=SIMILARITY_THRESHOLD):
+    """Greedy keep-first dedupe over `docs`.
+
+    Each doc is compared only with docs kept before it: exact duplicates
+    (after strip) and chunks at or above `threshold` cosine similarity are
+    merged into the first such kept doc. Every distinct text is embedded
+    once and all pairs come from batched FAISS range searches.
+    Returns `(kept, merged)`: kept positions in order and a
+    `{kept_pos: [merged_pos, ...]}` map.
+    """
+    # Identical texts share a hash; embed each distinct text once.
+    slots = {}
+    text_of = [slots.setdefault(hash_chunk(doc["content"]), len(slots)) for doc in docs]
+    unique_texts = {}
+    for pos, slot in enumerate(text_of):
+        unique_texts.setdefault(slot, docs[pos]["content"])
+
+    neighbours = similar_pairs(embed_normalized([unique_texts[s] for s in range(len(slots))]), threshold)
+
+    kept = []
+    merged = {}
+    kept_by_text = {}  # text slot -> position of the doc kept for it
+    for pos in tqdm(range(len(docs))):
+        slot = text_of[pos]
+        if slot in kept_by_text:
+            merged.setdefault(kept_by_text[slot], []).append(pos)
+            continue
+        # Earlier distinct texts are exactly the slots below this one.
+        target = next((kept_by_text[j] for j in neighbours[slot] if j in kept_by_text), None)
+        if target is None:
+            kept_by_text[slot] = pos
+            kept.append(pos)
+        else:
+            merged.setdefault(target, []).append(pos)
 
-def clean_vector_db():
+    return kept, merged
+
+def clean_vector_db(dry_run=False, threshold=SIMILARITY_THRESHOLD, report_path=None):
     print("🔍 Cleaning vector DB...")
-    docs = read_docs()
+    docs = read_all_docs()
     if not docs:
         print("📭 No records to clean.")
         return
 
-    model = SentenceTransformer("all-MiniLM-L6-v2")
+    kept, merged = find_merge_clusters(docs, threshold)
+
+    clusters = [
+        {
+            "keep": docs[k]["id"],
+            "merge": [docs[m]["id"] for m in members],
+        }
+        for k, members in sorted(merged.items())
+    ]
+    for cluster in clusters:
+        for doc_id in cluster["merge"]:
+            print(f"↺ Merging similar chunk: {doc_id} -> {cluster['keep']}")
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump({"threshold": threshold, "clusters": clusters}, f, indent=2)
+        print(f"📝 Merge report written to {report_path}")
+
+    removed = len(docs) - len(kept)
+    if dry_run:
+        print(f"🧪 Dry run: {removed} of {len(docs)} entries would be removed in {len(clusters)} cluster(s).")
+        return clusters
+
+    old_ids = {d["id"] for d in docs}
     cleaned = []
-    seen_hashes = set()
-
-    for i, doc in enumerate(tqdm(docs)):
-        content = doc["content"]
-        doc_id = hash_chunk(content)
+    for pos in kept:
+        doc = docs[pos]
+        doc["id"] = hash_chunk(doc["content"])
+        cleaned.append(doc)
 
-        if doc_id in seen_hashes:
-            continue
+    print(f"🧹 Cleaned duplicate/similar entries: {removed} removed")
 
-        duplicated = False
-        for c in cleaned:
-            if is_duplicate_text(content, c["content"]):
-                duplicated = True
-                break
-            elif is_similar_text(content, c["content"], model):
-                # Optionally merge or keep the latest copy
-                print(f"↺ Merging similar chunk: {doc_id}")
-                duplicated = True
-                break
-
-        if not duplicated:
-            seen_hashes.add(doc_id)
-            doc["id"] = doc_id
-            cleaned.append(doc)
-
-    print(f"🧹 Cleaned duplicate/similar entries: {len(docs) - len(cleaned)} removed")
-    write_docs(cleaned)
-
-    print("📦 Rebuilding FAISS index...")
-    vectors = model.encode([doc["content"] for doc in cleaned])
-    index = faiss.IndexFlatL2(vectors.shape[1])
-    index.add(np.array(vectors).astype("float32"))
-    faiss.write_index(index, VECTOR_PATH)
+    print("📦 Rebuilding doc store and FAISS index...")
+    rewrite_sharded(cleaned)
+    save_tables(cleaned)
+    remove_tables(old_ids - {d["id"] for d in cleaned})
+    clear_views()
 
     print(f"✅ Vector DB cleaned and rebuilt with {len(cleaned)} unique chunks.")
+    return clusters
 
 if __name__ == "__main__":
-    clean_vector_db()
+    parser = argparse.ArgumentParser(description="Remove duplicate and near-duplicate chunks.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the merges that would be applied")
+    parser.add_argument("--threshold", type=float, default=SIMILARITY_THRESHOLD)
+    parser.add_argument("--report", help="Write the merge clusters to this JSON file")
+    args = parser.parse_args()
+    clean_vector_db(dry_run=args.dry_run, threshold=args.threshold, report_path=args.report)
@@ -1,10 +1,8 @@
 # tools/load_initial_vectordb.py
 
 import os
-import json
-import faiss
-import numpy as np
-from sentence_transformers import SentenceTransformer
+import sys
+import hashlib
 
 # Create your chunks — pre-assigned by role/company
 chunks = [
@@ -256,69 +254,43 @@ chunks = [
 
 ]
 
-import os, json, hashlib
-import faiss
-import numpy as np
-from sentence_transformers import SentenceTransformer
-
-VECTOR_PATH = "db/vector_index.faiss"
-DOCS_PATH = "db/docs.jsonl"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.shards import ingest_sharded, read_all_docs
+from src.table_store import save_tables
+from src.dashboard_views import clear_views, refresh_views
 
 def generate_id(content):
     return hashlib.md5(content.encode()).hexdigest()
 
 def load_existing_docs():
-    if not os.path.exists(DOCS_PATH):
-        return []
-    with open(DOCS_PATH, "r", encoding="utf-8") as f:
-        return [json.loads(line) for line in f]
-
-def write_final_docs(docs):
-    with open(DOCS_PATH, "w", encoding="utf-8") as f:
-        for doc in docs:
-            f.write(json.dumps(doc) + "\n")
-
-def build_vector_db(new_chunks):
-    os.makedirs("db", exist_ok=True)
-
-    # Load existing docs
-    existing_docs = load_existing_docs()
-    existing_ids = {doc["id"] for doc in existing_docs}
-
-    # Build new chunk list by excluding duplicates
-    clean_new_docs = []
-    for chunk in new_chunks:
-        chunk_id = generate_id(chunk["content"])
-        if chunk_id not in existing_ids:
-            clean_new_docs.append({
-                "id": chunk_id,
-                "content": chunk["content"],
-                "metadata": chunk["metadata"]
-            })
-            existing_ids.add(chunk_id)
-
-    final_docs = existing_docs + clean_new_docs
+    return read_all_docs()
+
+def build_vector_db(new_chunks, rebuild=False):
+    docs = [
+        {"id": generate_id(chunk["content"]), "content": chunk["content"], "metadata": chunk["metadata"]}
+        for chunk in new_chunks
+    ]
+
+    # Only unseen chunks are embedded unless a full rebuild is requested
+    clean_new_docs, total = ingest_sharded(docs, rebuild=rebuild)
+    # Parse each table once here; the dashboard loads the typed frames directly
+    tables = save_tables(read_all_docs() if rebuild else docs, overwrite=rebuild)
+    print(f"📊 Stored {len(tables)} typed table(s).")
+    if rebuild:
+        clear_views()
+    else:
+        views = refresh_views(clean_new_docs)
+        print(f"🗂️ Refreshed {len(views)} dashboard view(s).")
 
     if not clean_new_docs:
         print("🟡 No new documents added to vector DB.")
     else:
         print(f"✅ Added {len(clean_new_docs)} new document(s).")
 
-    # Save updated docs.jsonl
-    write_final_docs(final_docs)
-
-    # Create new vector index from scratch
-    embedder = SentenceTransformer("all-MiniLM-L6-v2")
-    texts = [doc["content"] for doc in final_docs]
-    vectors = embedder.encode(texts)
-    dim = vectors.shape[1]
-    index = faiss.IndexFlatL2(dim)
-    index.add(np.array(vectors).astype("float32"))
-    faiss.write_index(index, VECTOR_PATH)
-
-    print("📦 Vector DB rebuilt successfully.")
-    print(f"🧠 Total vector chunks: {len(final_docs)}")
+    if rebuild:
+        print("📦 Vector DB rebuilt successfully.")
+    print(f"🧠 Total vector chunks: {total}")
 
 
 if __name__ == "__main__":  # replace or inline your `chunks = [...]` here
-    build_vector_db(chunks)
+    build_vector_db(chunks, rebuild="--rebuild" in sys.argv)
@@ -0,0 +1,63 @@
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.fake_mistral_server import FakeMistralServer
+from src.llm_client import PooledMistral, REQUESTS_PER_SECOND, BURST, MAX_CONCURRENT_CALLS
+
+
+def _session(client, stream):
+    messages = [{"role": "user", "content": "What was FY24 net profit?"}]
+    if stream:
+        return "".join(e.data.choices[0].delta.content or "" for e in client.chat.stream(model="fake", messages=messages))
+    return client.chat.complete(model="fake", messages=messages).choices[0].message.content
+
+
+def load_test(sessions=50, users=10, latency=0.2, error_rate=0.1, stream=False,
+              rate=REQUESTS_PER_SECOND, burst=BURST, max_concurrent=MAX_CONCURRENT_CALLS):
+    """Drive the pooled client against the local fake server and report throughput and latency."""
+    with FakeMistralServer(latency=latency, error_rate=error_rate, error_status=429) as server:
+        client = PooledMistral(api_key="load-test", server_url=server.url, rate=rate, burst=burst,
+                               max_concurrent=max_concurrent)
+        start = time.perf_counter()
+        failed = 0
+        with ThreadPoolExecutor(max_workers=users) as pool:
+            for future in [pool.submit(_session, client, stream) for _ in range(sessions)]:
+                try:
+                    future.result()
+                except Exception:
+                    failed += 1
+        elapsed = time.perf_counter() - start
+        client.close()
+
+        return {
+            "sessions": sessions,
+            "failed_sessions": failed,
+            "seconds": round(elapsed, 3),
+            "sessions_per_second": round(sessions / elapsed, 2),
+            "server_requests": server.requests,
+            "server_errors": server.failures,
+            "connections_opened": len(server.connections),
+            "calls": client.metrics.summary(),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the pooled Mistral client against a local fake server.")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--users", type=int, default=10, help="Concurrent chat sessions")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds added to every fake response")
+    parser.add_argument("--error-rate", type=float, default=0.1, help="Share of requests answered with 429")
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--rate", type=float, default=REQUESTS_PER_SECOND)
+    parser.add_argument("--max-concurrent", type=int, default=MAX_CONCURRENT_CALLS)
+    args = parser.parse_args()
+
+    print("🚦 Running load test...")
+    result = load_test(args.sessions, args.users, args.latency, args.error_rate, args.stream,
+                       rate=args.rate, max_concurrent=args.max_concurrent)
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,42 @@
+# tools/migrate_docs_jsonl.py
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.doc_store import STORE_FILE
+from src.shards import SHARDS_DIR, ensure_sharded
+from src.vector_store import DB_DIR, LEGACY_DOCS_FILE, migrate_legacy_docs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert db/docs.jsonl into the SQLite doc store and company shards.")
+    parser.add_argument("--db-dir", default=DB_DIR, help="Vector DB directory (default: db)")
+    parser.add_argument("--force", action="store_true", help=f"Replace an existing {STORE_FILE}")
+    args = parser.parse_args()
+
+    jsonl_path = os.path.join(args.db_dir, LEGACY_DOCS_FILE)
+    store_path = os.path.join(args.db_dir, STORE_FILE)
+    shards_path = os.path.join(args.db_dir, SHARDS_DIR)
+    if os.path.isdir(shards_path):
+        # Only the shards are read now; a fresh docs.sqlite here would be ignored.
+        print(f"🟡 {shards_path} already exists, so {jsonl_path} is no longer read. Nothing to migrate.")
+        return
+    if not os.path.exists(jsonl_path):
+        print(f"📭 Nothing to migrate: {jsonl_path} not found.")
+        return
+    if os.path.exists(store_path):
+        if not args.force:
+            print(f"🟡 {store_path} already exists. Use --force to migrate again.")
+            return
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(store_path + suffix):
+                os.remove(store_path + suffix)
+
+    migrate_legacy_docs(args.db_dir)
+    ensure_sharded(args.db_dir)
+    print(f"✅ Done. Docs are in {shards_path}; {jsonl_path} and {store_path} are no longer read and can be archived.")
+
+
+if __name__ == "__main__":
+    main()